@@ -1,6 +1,9 @@
 from fastapi.routing import APIRouter
 
-from booking_api.api.v1 import events, movies, locations, bookings
+from booking_api.api.v1 import (
+    admin, analytics, events, movies, locations, bookings, waiting_room,
+    metrics
+)
 
 router = APIRouter(prefix="/v1")
 
@@ -8,3 +11,7 @@ router.include_router(events.router)
 router.include_router(locations.router)
 router.include_router(movies.router)
 router.include_router(bookings.router)
+router.include_router(waiting_room.router)
+router.include_router(metrics.router)
+router.include_router(admin.router)
+router.include_router(analytics.router)
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends
+
+from booking_api.models.schemas import PartitionRestoreResult
+from booking_api.services.partitions import PartitionService
+from booking_api.utils.authentication import check_admin, security
+from db.utils.postgres import engine
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+@router.post(
+    "/partitions/{partition}/restore",
+    response_model=PartitionRestoreResult,
+    summary="Restore an archived booking partition",
+)
+async def restore_partition(
+        partition: str, token=Depends(security)
+) -> PartitionRestoreResult:
+    """
+    Load the archived bookings of the month back and attach the partition,
+    it's kept attached for `PARTITIONS_RESTORED_DAYS` before it's archived
+    again. Bookings of the events, seats and guests deleted since the
+    archiving are dropped:
+
+    - **partition**: partition name, e.g. booking_y2023m01
+    """
+    check_admin(token)
+    async with engine.connect() as conn:
+        restored, dropped, restored_until = await PartitionService.restore(
+            conn, partition
+        )
+    return PartitionRestoreResult(
+        partition=partition,
+        restored=restored,
+        dropped=dropped,
+        restored_until=restored_until,
+    )
@@ -0,0 +1,42 @@
+from datetime import date
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from booking_api.models.schemas import (
+    OccupancyBucket, OccupancyDimension, OccupancyGranularity
+)
+from booking_api.services.analytics import AnalyticsService
+from booking_api.utils.authentication import check_authorization, security
+from db.utils.postgres import get_db
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+
+@router.get(
+    "/occupancy",
+    response_model=list[OccupancyBucket],
+    summary="Get occupancy of the host's events by time buckets",
+)
+async def occupancy(
+        date_from: date,
+        date_to: date,
+        granularity: OccupancyGranularity = OccupancyGranularity.DAY,
+        group_by: list[OccupancyDimension] = Query(default=[]),
+        session: AsyncSession = Depends(get_db),
+        token=Depends(security),
+) -> list[OccupancyBucket]:
+    """
+    Get the occupancy of the events starting within the period:
+
+    - **granularity**: hour, day, week or month of the event start
+    - **group_by**: location, movie, event (hourly only) and/or seat_type
+    - **seats**, **occupied**: seats of the events and the taken ones
+    - **reserved**, **booked**, **released**: bookings made,
+      confirmed and deleted
+    - **fill_rate**: share of the taken seats
+    """
+    user_id = check_authorization(token)
+    return await AnalyticsService.get_occupancy(
+        session, user_id, granularity, date_from, date_to, group_by
+    )
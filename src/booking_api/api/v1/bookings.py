@@ -1,15 +1,24 @@
 import uuid
+from datetime import datetime
 from http import HTTPStatus
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from starlette.responses import JSONResponse
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
 
 from booking_api.models.schemas import (
-    BookingInput, BookingSchema, BookingDetails
+    BookingInput, BookingSchema, BookingDetails, BookingPage, BookingPeriod,
+    ExportFormat, SeatBlock, SeatBlockInput
 )
 from booking_api.services.booking import BookingService
+from booking_api.services.events import EventService
+from booking_api.services.export import BookingExportService
 from booking_api.utils.authentication import check_authorization, security
+from booking_api.utils.caching import conditional_response, latest, make_etag
+from booking_api.utils.exceptions import BadRequestException, BookingNotFound
+from booking_api.utils.export import ENCODERS, is_available
+from config.base import settings
 from db.utils.postgres import get_db
 
 router = APIRouter(prefix="/bookings", tags=["bookings"])
@@ -20,31 +29,139 @@ async def create_booking(
         booking: BookingInput,
         session: AsyncSession = Depends(get_db),
         token=Depends(security),
+        admission_token: str | None = Header(
+            default=None, alias="X-Admission-Token"
+        ),
 ):
     user_id = check_authorization(token)
     return await BookingService.create(session=session, data=booking,
-                                       user_id=user_id)
+                                       user_id=user_id,
+                                       admission_token=admission_token)
+
+
+@router.post(
+    "/best_seats", response_model=SeatBlock,
+    summary="Find and optionally book the best seats together"
+)
+async def best_seats(
+        block: SeatBlockInput,
+        session: AsyncSession = Depends(get_db),
+        token=Depends(security),
+        admission_token: str | None = Header(
+            default=None, alias="X-Admission-Token"
+        ),
+) -> SeatBlock:
+    """
+    Find the best block of adjacent free seats in a row:
+
+    - **event_id**: event to book
+    - **count**: number of seats together
+    - **seat_types**: preferred seat types, the block may still have others
+    - **reserve**: book the found block at once, either all seats or none
+    """
+    user_id = check_authorization(token)
+    return await BookingService.find_best_seats(
+        session, block, user_id, admission_token=admission_token
+    )
+
+
+@router.get("/export", summary="Export bookings of the host's events")
+async def export_bookings(
+        event_id: uuid.UUID | None = None,
+        date_from: datetime | None = None,
+        date_to: datetime | None = None,
+        export_format: ExportFormat = Query(
+            default=ExportFormat.CSV, alias="format"
+        ),
+        session: AsyncSession = Depends(get_db),
+        token=Depends(security),
+) -> StreamingResponse:
+    """
+    Stream the bookings of an event or of the events within a period:
+
+    - **event_id**: event of the host
+    - **date_from**, **date_to**: events starting within the period
+    - **format**: csv, ndjson or parquet
+    """
+    user_id = check_authorization(token)
+    if not event_id and not (date_from and date_to):
+        raise BadRequestException(
+            message="Either event_id or date_from and date_to should be set"
+        )
+    if event_id:
+        await EventService.validate_user(session, event_id, user_id)
+    if not is_available(export_format.value):
+        raise BadRequestException(
+            message=f"Export to {export_format.value} isn't available"
+        )
+
+    encoder = ENCODERS[export_format.value]()
+    filters = BookingExportService.get_filters(
+        user_id, event_id=event_id, date_from=date_from, date_to=date_to
+    )
+    return StreamingResponse(
+        BookingExportService.stream(filters, encoder),
+        media_type=encoder.media_type,
+        headers={
+            "Content-Disposition":
+                f'attachment; filename="bookings.{encoder.extension}"',
+        },
+    )
 
 
 @router.get("/{booking_id}", response_model=BookingDetails,
             summary="Get booking")
 async def get_booking(
         booking_id: uuid.UUID,
+        request: Request,
+        response: Response,
         session: AsyncSession = Depends(get_db),
         token=Depends(security),
 ) -> BookingDetails:
     check_authorization(token)
-    return await BookingService.get_booking(session, booking_id)
+    version = await BookingService.get_version(session, booking_id)
+    if not version:
+        raise BookingNotFound(booking_id)
+
+    not_modified = conditional_response(
+        request, response,
+        etag=make_etag(*version),
+        last_modified=latest(*version),
+        cache_control=settings.private_cache_control,
+    )
+    if not_modified:
+        return not_modified
+
+    return await BookingService.get_booking(
+        session, booking_id, version=tuple(version)
+    )
 
 
-@router.get("/", response_model=list[BookingDetails],
-            summary="Get all user bookings")
+@router.get("/", response_model=BookingPage,
+            summary="Get user bookings page by page")
 async def get_bookings(
+        period: BookingPeriod = BookingPeriod.ALL,
+        status: int | None = None,
+        cursor: str | None = None,
+        limit: int = Query(20, ge=1, le=100),
         session: AsyncSession = Depends(get_db),
         token=Depends(security),
-) -> list[BookingDetails]:
+) -> BookingPage:
+    """
+    - **period**: `upcoming` from the soonest, `past` or `all` from the latest
+    - **status**: only the bookings with this status
+    - **cursor**: `next_cursor` of the previous page
+    - **limit**: bookings per page
+    """
     user_id = check_authorization(token)
-    return await BookingService.get_bookings(session, user_id=user_id)
+    return await BookingService.get_bookings(
+        session,
+        user_id=user_id,
+        period=period,
+        status=status,
+        cursor=cursor,
+        limit=limit,
+    )
 
 
 @router.delete("/{booking_id}", summary="Delete booking")
@@ -84,9 +201,13 @@ async def update_booking(
         new_booking: BookingInput,
         session: AsyncSession = Depends(get_db),
         token=Depends(security),
+        admission_token: str | None = Header(
+            default=None, alias="X-Admission-Token"
+        ),
 ):
     user_id = check_authorization(token)
     booking = await BookingService.edit(
-        session=session, new_data=new_booking, _id=booking_id, user_id=user_id
+        session=session, new_data=new_booking, _id=booking_id, user_id=user_id,
+        admission_token=admission_token,
     )
     return BookingSchema.from_orm(booking)
@@ -1,17 +1,39 @@
 import uuid
+from datetime import datetime
 from http import HTTPStatus
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from starlette.responses import JSONResponse
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
 
-from booking_api.models.schemas import EventSchema, EventInput, EventDetails
+from booking_api.models.schemas import (
+    EventSchema, EventInput, EventDetails, EventListingItem, EventNearby,
+    EventSearchResult, EventSeriesInput, EventSeriesResult,
+    EventCompactDetails, SeatFormat
+)
 from booking_api.services.events import EventService
+from booking_api.services.listing import EventListingService
 from booking_api.utils.authentication import check_authorization, security
+from booking_api.utils.caching import conditional_response, latest, make_etag
+from booking_api.utils.exceptions import EventNotFound
+from config.base import settings
 from db.utils.postgres import get_db
 
 router = APIRouter(prefix="/events", tags=["events"])
 
+COMPACT_MEDIA_TYPE = "application/vnd.booking.compact+json"
+
+
+def get_seat_format(
+        request: Request, seat_format: SeatFormat | None = None
+) -> SeatFormat:
+    if seat_format:
+        return seat_format
+    if COMPACT_MEDIA_TYPE in request.headers.get("accept", ""):
+        return SeatFormat.COMPACT
+    return SeatFormat.VERBOSE
+
 
 @router.post("/", response_model=EventSchema, summary="Create event")
 async def create_event(
@@ -36,14 +58,117 @@ async def create_event(
                                      user_id=user_id)
 
 
+@router.post(
+    "/series", response_model=EventSeriesResult,
+    summary="Create recurring events"
+)
+async def create_event_series(
+        series: EventSeriesInput,
+        session: AsyncSession = Depends(get_db),
+        token=Depends(security)
+) -> EventSeriesResult:
+    """
+    Create an event for every occurrence of the recurrence rule:
+
+    - **event**: event template, its start is the first occurrence
+    - **recurrence**: `frequency` (daily or weekly), `interval`,
+      `count` and/or `until`, optional `weekdays` (0 - Monday)
+    - **skip_conflicts**: create the free occurrences when some are occupied,
+      otherwise nothing is created and the conflicts are returned
+    """
+    user_id = check_authorization(token)
+    return await EventService.create_series(
+        session=session, data=series, user_id=user_id
+    )
+
+
+@router.get(
+    "/search", response_model=list[EventSearchResult],
+    summary="Search events"
+)
+async def search_events(
+        query: str = Query(min_length=2, max_length=200),
+        date_from: datetime | None = None,
+        date_to: datetime | None = None,
+        available: bool | None = None,
+        limit: int = Query(default=20, ge=1, le=100),
+        offset: int = Query(default=0, ge=0),
+        session: AsyncSession = Depends(get_db),
+) -> list[EventSearchResult]:
+    """
+    Search events by name, notes, location name and movie title,
+    tolerating typos and unfinished words:
+
+    - **query**: text to search for
+    - **date_from**: events starting at or after the datetime
+    - **date_to**: events starting at or before the datetime
+    - **available**: only events with (or without) free seats
+    - **limit**, **offset**: pagination of the ranked results
+    """
+    return await EventService.search(
+        session, query, date_from=date_from, date_to=date_to,
+        available=available, limit=limit, offset=offset,
+    )
+
+
+@router.get(
+    "/upcoming", response_model=list[EventListingItem],
+    summary="Get upcoming events with free seats"
+)
+async def upcoming_events(
+        date_from: datetime | None = None,
+        date_to: datetime | None = None,
+        location_id: uuid.UUID | None = None,
+        limit: int = Query(default=20, ge=1, le=100),
+        offset: int = Query(default=0, ge=0),
+        session: AsyncSession = Depends(get_db),
+) -> list[EventListingItem]:
+    """
+    Get upcoming events that still have free seats, the soonest first:
+
+    - **date_from**, **date_to**: events starting within the period
+    - **location_id**: events of the location only
+    - **free_seats_by_type**: free seats per seat type
+    - **limit**, **offset**: pagination of the listing
+    """
+    return await EventListingService.get_upcoming(
+        session, date_from=date_from, date_to=date_to,
+        location_id=location_id, limit=limit, offset=offset,
+    )
+
+
+@router.get(
+    "/nearby", response_model=list[EventNearby],
+    summary="Get upcoming events near the point"
+)
+async def nearby_events(
+        lat: float = Query(ge=-90, le=90),
+        lon: float = Query(ge=-180, le=180),
+        radius_km: float = Query(default=10, gt=0, le=500),
+        date_from: datetime | None = None,
+        limit: int = Query(default=20, ge=1, le=100),
+        session: AsyncSession = Depends(get_db),
+) -> list[EventNearby]:
+    """
+    Get upcoming events at the locations within **radius_km**
+    from the point (**lat**, **lon**), the nearest first
+    """
+    return await EventService.get_nearby(
+        session, lat, lon, radius_km, date_from=date_from, limit=limit
+    )
+
+
 @router.get(
-    "/{event_id}", response_model=EventDetails,
+    "/{event_id}", response_model=EventDetails | EventCompactDetails,
     summary="Get detailed information about event"
 )
 async def event_details(
         event_id: uuid.UUID,
+        request: Request,
+        response: Response,
+        seat_format: SeatFormat = Depends(get_seat_format),
         session: AsyncSession = Depends(get_db)
-) -> EventDetails:
+) -> EventDetails | EventCompactDetails:
     """
     Get all event information:
 
@@ -56,8 +181,35 @@ async def event_details(
     - **participants**: number of participants
     - **notes**: any additional information
     - **seats**: seats that are available for the event
+
+    With `seat_format=compact` (or `Accept: application/vnd.booking.compact+json`)
+    the seats are replaced by **availability**: base64 bitset of free seats
+    ordered as in the location's seat layout of **layout_version**
     """
-    return await EventService.get_event(session, event_id)
+    version = await EventService.get_version(session, event_id)
+    if not version:
+        raise EventNotFound(event_id)
+
+    not_modified = conditional_response(
+        request, response,
+        etag=make_etag(*version, seat_format.value),
+        last_modified=latest(
+            version.modified, version.location_modified,
+            version.bookings_modified,
+        ),
+        cache_control=settings.public_cache_control,
+    )
+    if not_modified:
+        return not_modified
+
+    response.headers["Vary"] = "Accept"
+    if seat_format is SeatFormat.COMPACT:
+        return await EventService.get_event_compact(
+            session, event_id, version=tuple(version)
+        )
+    return await EventService.get_event(
+        session, event_id, version=tuple(version)
+    )
 
 
 @router.put("/{event_id}", response_model=EventSchema, summary="Edit the event")
@@ -100,11 +252,21 @@ async def delete_event(
     )
 
 
-@router.get("/", response_model=list[EventDetails],  summary="Get all events")
+@router.get(
+    "/", response_model=list[EventDetails] | list[EventCompactDetails],
+    summary="Get all events"
+)
 async def get_events(
+        response: Response,
+        seat_format: SeatFormat = Depends(get_seat_format),
         session: AsyncSession = Depends(get_db),
-) -> list[EventDetails]:
+) -> list[EventDetails] | list[EventCompactDetails]:
     """
     Get the detailed information on all events for which bookings are available
+
+    Supports the compact seats format, see event details
     """
+    response.headers["Vary"] = "Accept"
+    if seat_format is SeatFormat.COMPACT:
+        return await EventService.get_events_compact(session)
     return await EventService.get_events(session)
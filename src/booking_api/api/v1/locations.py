@@ -1,16 +1,21 @@
 import uuid
+from datetime import date
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from starlette.responses import JSONResponse
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
 
 from booking_api.models.schemas import (
-    LocationSchema, LocationEdit, LocationInput, LocationDetails,
-    SeatInput
+    FreeSlot, LocationSchema, LocationEdit, LocationInput, LocationDetails,
+    LocationNearby, SeatInput, SeatLayout, SeatSchema
 )
-from booking_api.services.locations import LocationService
+from booking_api.services.locations import LocationLoad, LocationService
+from booking_api.services.seats import SeatService
 from booking_api.utils.authentication import security, check_authorization
+from booking_api.utils.caching import conditional_response, make_etag
 from booking_api.utils.exceptions import LocationNotFound, BadRequestException
+from config.base import settings
 from db.tables import Seat
 from db.utils.postgres import get_db
 
@@ -62,13 +67,37 @@ async def add_location(
     return LocationSchema.from_orm(new_location)
 
 
+@router.get(
+    "/nearby",
+    response_model=list[LocationNearby],
+    summary="Get locations near the point",
+)
+async def nearby_locations(
+    lat: float = Query(ge=-90, le=90),
+    lon: float = Query(ge=-180, le=180),
+    radius_km: float = Query(default=10, gt=0, le=500),
+    limit: int = Query(default=20, ge=1, le=100),
+    session: AsyncSession = Depends(get_db),
+) -> list[LocationNearby]:
+    """
+    Get locations within **radius_km** from the point (**lat**, **lon**),
+    the nearest first
+    """
+    return await LocationService.get_nearby(
+        session, lat, lon, radius_km, limit=limit
+    )
+
+
 @router.get(
     "/{location_id}",
     response_model=LocationDetails,
     summary="Get detailed information about the location",
 )
 async def location_details(
-    location_id: uuid.UUID, session: AsyncSession = Depends(get_db)
+    location_id: uuid.UUID,
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(get_db),
 ) -> LocationDetails:
     """
     Get all location information:
@@ -79,12 +108,108 @@ async def location_details(
     - **close**: close hour
     - **host_id**: location's owner or None
     - **capacity**: maximum capacity of the location
+    - **seats_count**: number of configured seats
     """
-    location = await LocationService.get_by_id(session, location_id)
+    version = await LocationService.get_version(session, location_id)
+    if not version:
+        raise LocationNotFound(location_id)
+
+    not_modified = conditional_response(
+        request, response,
+        etag=make_etag(*version),
+        last_modified=version.modified,
+        cache_control=settings.public_cache_control,
+    )
+    if not_modified:
+        return not_modified
+
+    location = await LocationService.get_details(
+        session, location_id, version=tuple(version)
+    )
+    if not location:
+        raise LocationNotFound(location_id)
+
+    return location
+
+
+@router.get(
+    "/{location_id}/seats",
+    response_model=list[SeatSchema],
+    summary="Get the seat map of the location",
+)
+async def location_seats(
+    location_id: uuid.UUID, session: AsyncSession = Depends(get_db)
+) -> list[SeatSchema]:
+    location = await LocationService.get_by_id(
+        session, location_id, load=LocationLoad.SEAT_MAP
+    )
     if not location:
         raise LocationNotFound(location_id)
 
-    return LocationDetails.from_orm(location)
+    return [SeatSchema.from_orm(seat) for seat in location.seats]
+
+
+@router.get(
+    "/{location_id}/seat_layout",
+    response_model=SeatLayout,
+    summary="Get the compact seat layout of the location",
+)
+async def location_seat_layout(
+    location_id: uuid.UUID,
+    request: Request,
+    response: Response,
+    session: AsyncSession = Depends(get_db),
+) -> SeatLayout:
+    """
+    Get the seats ordered by row and seat number:
+
+    - **version**: layout version, referenced by the compact event details
+    - **rows**: runs of `[row, first seat, number of seats, seat type]`
+    - **seat_ids**: seat ids, the index is the seat ordinal
+      of the events' availability bitsets
+    """
+    version = await LocationService.get_version(session, location_id)
+    if not version:
+        raise LocationNotFound(location_id)
+
+    not_modified = conditional_response(
+        request, response,
+        etag=make_etag("layout", *version),
+        last_modified=version.modified,
+        cache_control=settings.public_cache_control,
+    )
+    if not_modified:
+        return not_modified
+
+    return await SeatService.get_layout(session, location_id)
+
+
+@router.get(
+    "/{location_id}/free_slots",
+    response_model=list[FreeSlot],
+    summary="Get free time windows of the location",
+)
+async def location_free_slots(
+    location_id: uuid.UUID,
+    date_from: date,
+    date_to: date,
+    min_duration: int = Query(
+        default=settings.minimum_time_interval,
+        ge=settings.minimum_time_interval,
+    ),
+    session: AsyncSession = Depends(get_db),
+) -> list[FreeSlot]:
+    """
+    Get the windows an event can be organized in, day by day:
+
+    - **date_from**, **date_to**: days of the period, inclusive
+    - **min_duration**: shortest window to return, s
+    - **start**, **end**: window bounds within the working hours,
+      aligned to the 30 minutes grid
+    """
+    return await LocationService.get_free_slots(
+        session, location_id, date_from, date_to, min_duration
+    )
 
 
 @router.put(
@@ -108,10 +233,10 @@ async def edit_location(
     """
     user_id = check_authorization(token)
 
-    location = await LocationService.edit(
+    await LocationService.edit(
         session=session, new_data=new_location, _id=location_id, user_id=user_id
     )
-    return LocationDetails.from_orm(location)
+    return await LocationService.get_details(session, location_id)
 
 
 @router.put(
@@ -127,10 +252,10 @@ async def rename_location(
 ) -> LocationDetails:
     user_id = check_authorization(token)
 
-    location = await LocationService.rename(
+    await LocationService.rename(
         session=session, new_name=new_name, _id=location_id, user_id=user_id
     )
-    return LocationDetails.from_orm(location)
+    return await LocationService.get_details(session, location_id)
 
 
 @router.delete("/{location_id}", summary="Delete location")
@@ -0,0 +1,87 @@
+from datetime import datetime
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from booking_api.models.schemas import (
+    CircuitBreakerStatus, EventListingStatus, OutboxStatus
+)
+from booking_api.services.listing import EventListingService
+from booking_api.services.outbox import OutboxService
+from booking_api.utils.circuit_breaker import breakers
+from db.utils.postgres import get_db
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get(
+    "/circuit_breakers",
+    response_model=list[CircuitBreakerStatus],
+    summary="Get the state of the worker's circuit breakers",
+)
+async def circuit_breakers() -> list[CircuitBreakerStatus]:
+    """
+    Get the breakers of the outbound dependencies:
+
+    - **state**: closed, open or half_open
+    - **failure_rate**: share of failed calls within the window
+    - **calls**: calls within the window
+    - **rejected**: calls rejected while the breaker was open
+    """
+    return [
+        CircuitBreakerStatus(
+            name=breaker.name,
+            state=breaker.state.value,
+            failure_rate=breaker.failure_rate,
+            calls=len(breaker.outcomes),
+            rejected=breaker.rejected,
+        )
+        for breaker in breakers.values()
+    ]
+
+
+@router.get(
+    "/outbox",
+    response_model=OutboxStatus,
+    summary="Get the lag of the booking outbox relay",
+)
+async def outbox(session: AsyncSession = Depends(get_db)) -> OutboxStatus:
+    """
+    Get the outbox backlog and the relay lag:
+
+    - **pending**: messages not relayed yet
+    - **oldest_age**: age of the oldest pending message, s
+    - **relayed**: messages relayed by the worker
+    - **last_lag**: age of the oldest message of the last relayed batch, s
+    """
+    backlog = await OutboxService.get_backlog(session)
+    return OutboxStatus(
+        pending=backlog.pending,
+        oldest_age=(
+            backlog.oldest and (datetime.now() - backlog.oldest).total_seconds()
+        ),
+        relayed=OutboxService.relayed,
+        last_lag=OutboxService.last_lag,
+    )
+
+
+@router.get(
+    "/event_listing",
+    response_model=EventListingStatus,
+    summary="Get the state of the upcoming events listing",
+)
+async def event_listing(
+        session: AsyncSession = Depends(get_db)
+) -> EventListingStatus:
+    """
+    Get the listing size and the result of the worker's last rebuild:
+
+    - **events**: rows of the listing
+    - **last_rebuild**: end of the last rebuild done by the worker
+    - **last_drift**: rows the rebuild found missing or stale
+    """
+    return EventListingStatus(
+        events=await EventListingService.get_size(session),
+        last_rebuild=EventListingService.last_rebuild,
+        last_drift=EventListingService.last_drift,
+    )
@@ -2,7 +2,17 @@ import uuid
 from typing import List
 from uuid import UUID
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from booking_api.models.schemas import (
+    PurchasedMoviesInput, PurchasedMoviesResult
+)
+from booking_api.services.movies import PurchasedMovieService
+from booking_api.utils.authentication import check_admin, security
+from db.utils.postgres import get_db
+from db.utils.redis import get_redis
 
 FREE_MOVIES = [
     UUID("b4c0bba7-02fc-442a-83df-3e5884571c97"),
@@ -27,3 +37,30 @@ router = APIRouter(prefix="/movies", tags=["movies"])
 )
 async def free_movies() -> List[uuid.UUID]:
     return FREE_MOVIES
+
+
+@router.post(
+    "/purchased",
+    response_model=PurchasedMoviesResult,
+    summary="Bulk add purchased movies of the host"
+)
+async def add_purchased_movies(
+        purchase: PurchasedMoviesInput,
+        session: AsyncSession = Depends(get_db),
+        redis: Redis = Depends(get_redis),
+        token=Depends(security),
+) -> PurchasedMoviesResult:
+    """
+    Grant the host access to the catalogue movies, upserted in batches.
+    Called by the catalogue integration, admins only:
+
+    - **host_id**: host who purchased the movies
+    - **movies**: purchased movies, the name and the release date
+      are recorded for the movies new to the service only
+    """
+    check_admin(token)
+    granted = await PurchasedMovieService.bulk_purchase(
+        session=session, redis=redis, movies=purchase.movies,
+        host_id=purchase.host_id,
+    )
+    return PurchasedMoviesResult(received=len(purchase.movies), granted=granted)
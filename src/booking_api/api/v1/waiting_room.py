@@ -0,0 +1,90 @@
+import uuid
+from http import HTTPStatus
+
+from fastapi import APIRouter, Depends, Query
+from redis.asyncio import Redis
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.responses import JSONResponse
+
+from booking_api.models.schemas import WaitingRoomStatus
+from booking_api.services.events import EventService
+from booking_api.services.waiting_room import WaitingRoomService
+from booking_api.utils.authentication import check_authorization, security
+from db.utils.postgres import get_db
+from db.utils.redis import get_redis
+
+router = APIRouter(prefix="/waiting_room", tags=["waiting room"])
+
+
+@router.post("/{event_id}/open", summary="Open the waiting room of the event")
+async def open_waiting_room(
+        event_id: uuid.UUID,
+        rate: float | None = Query(default=None, gt=0),
+        session: AsyncSession = Depends(get_db),
+        redis: Redis = Depends(get_redis),
+        token=Depends(security),
+) -> JSONResponse:
+    """
+    Make guests queue before booking the event:
+
+    - **rate**: number of guests admitted to booking per second
+    """
+    user_id = check_authorization(token)
+    await EventService.validate_user(session, event_id, user_id)
+    await WaitingRoomService.open(redis, event_id, rate)
+
+    return JSONResponse(
+        status_code=HTTPStatus.OK,
+        content={"message": f"Waiting room for {event_id} was opened"},
+    )
+
+
+@router.delete("/{event_id}", summary="Close the waiting room of the event")
+async def close_waiting_room(
+        event_id: uuid.UUID,
+        session: AsyncSession = Depends(get_db),
+        redis: Redis = Depends(get_redis),
+        token=Depends(security),
+) -> JSONResponse:
+    user_id = check_authorization(token)
+    await EventService.validate_user(session, event_id, user_id)
+    await WaitingRoomService.close(redis, event_id)
+
+    return JSONResponse(
+        status_code=HTTPStatus.OK,
+        content={"message": f"Waiting room for {event_id} was closed"},
+    )
+
+
+@router.post(
+    "/{event_id}", response_model=WaitingRoomStatus,
+    summary="Join the waiting room"
+)
+async def join_waiting_room(
+        event_id: uuid.UUID,
+        redis: Redis = Depends(get_redis),
+        token=Depends(security),
+) -> WaitingRoomStatus:
+    """
+    Take a place in the queue, repeated calls keep the place:
+
+    - **position**: number of guests ahead, including the current one
+    - **eta**: seconds left until the admission
+    - **admission_token**: pass it as the X-Admission-Token header
+      when booking, issued once the guest is admitted
+    """
+    user_id = check_authorization(token)
+    return await WaitingRoomService.join(redis, event_id, user_id)
+
+
+@router.get(
+    "/{event_id}", response_model=WaitingRoomStatus,
+    summary="Get the position in the waiting room"
+)
+async def waiting_room_status(
+        event_id: uuid.UUID,
+        redis: Redis = Depends(get_redis),
+        token=Depends(security),
+) -> WaitingRoomStatus:
+    user_id = check_authorization(token)
+    return await WaitingRoomService.poll(redis, event_id, user_id)
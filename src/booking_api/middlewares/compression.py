@@ -0,0 +1,209 @@
+import gzip
+import threading
+from collections import OrderedDict
+from functools import partial
+from http import HTTPStatus
+from typing import Callable
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config.base import settings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+Encoder = Callable[[bytes], bytes]
+
+UNCOMPRESSED_STATUSES = (HTTPStatus.NO_CONTENT, HTTPStatus.NOT_MODIFIED)
+
+# ZstdCompressor isn't thread safe, the event loop and every worker
+# thread compressing big bodies get their own
+zstd_compressors = threading.local()
+
+
+def zstd_compress(body: bytes) -> bytes:
+    compressor = getattr(zstd_compressors, "compressor", None)
+    if compressor is None:
+        compressor = zstandard.ZstdCompressor(level=settings.compression.zstd_level)
+        zstd_compressors.compressor = compressor
+    return compressor.compress(body)
+
+
+def get_encoders() -> dict[str, Encoder]:
+    """Available encoders in the order of preference."""
+    encoders = {}
+    if zstandard is not None:
+        encoders["zstd"] = zstd_compress
+    if brotli is not None:
+        encoders["br"] = partial(
+            brotli.compress,
+            quality=settings.compression.brotli_quality,
+            mode=brotli.MODE_TEXT,
+        )
+    encoders["gzip"] = partial(
+        gzip.compress, compresslevel=settings.compression.gzip_level, mtime=0
+    )
+    return encoders
+
+
+def negotiate(accept_encoding: str, encodings) -> str | None:
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, *params = (part.strip() for part in item.split(";"))
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name:
+            accepted[name.lower()] = quality
+
+    default = accepted.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for encoding in encodings:
+        quality = accepted.get(encoding, default)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def is_compressible(content_type: str) -> bool:
+    content_type = content_type.split(";")[0].strip()
+    return content_type.startswith("text/") or content_type.endswith("json")
+
+
+class CompressedBodies:
+    """LRU of compressed bodies keyed by the response ETag."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.size = 0
+        self.bodies: OrderedDict[tuple, bytes] = OrderedDict()
+
+    def get(self, key: tuple) -> bytes | None:
+        body = self.bodies.get(key)
+        if body is not None:
+            self.bodies.move_to_end(key)
+        return body
+
+    def set(self, key: tuple, body: bytes):
+        if len(body) > self.max_size:
+            return
+        old = self.bodies.pop(key, None)
+        if old is not None:
+            self.size -= len(old)
+        self.bodies[key] = body
+        self.size += len(body)
+        while self.size > self.max_size:
+            _, evicted = self.bodies.popitem(last=False)
+            self.size -= len(evicted)
+
+
+class CompressionMiddleware:
+    """
+    Compress buffered responses with the best encoding the client accepts.
+
+    Bodies of versioned (ETag) responses are kept compressed, so hot
+    responses are not compressed again; streaming responses without
+    Content-Length are passed as is.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.encoders = get_encoders()
+        self.cache = CompressedBodies(settings.compression.cache_size)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(
+            Headers(scope=scope).get("accept-encoding", ""), self.encoders
+        )
+        start_message: Message | None = None
+        chunks: list[bytes] = []
+
+        async def send_compressed(message: Message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                if not self.should_compress(message):
+                    await send(message)
+                    return
+                MutableHeaders(raw=message["headers"]).add_vary_header(
+                    "Accept-Encoding"
+                )
+                if encoding is None:
+                    await send(message)
+                    return
+                start_message = message
+                return
+
+            if start_message is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+
+            body = await self.compress(
+                scope, start_message, encoding, b"".join(chunks)
+            )
+            headers = MutableHeaders(raw=start_message["headers"])
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
+
+    @staticmethod
+    def should_compress(message: Message) -> bool:
+        if message["status"] in UNCOMPRESSED_STATUSES:
+            return False
+
+        headers = Headers(raw=message["headers"])
+        try:
+            content_length = int(headers.get("content-length", ""))
+        except ValueError:
+            return False
+        return (
+            "content-encoding" not in headers
+            and content_length >= settings.compression.minimum_size
+            and is_compressible(headers.get("content-type", ""))
+        )
+
+    async def compress(
+            self, scope: Scope, message: Message, encoding: str, body: bytes
+    ) -> bytes:
+        etag = Headers(raw=message["headers"]).get("etag")
+        key = None
+        if etag and message["status"] == HTTPStatus.OK:
+            key = (scope["path"], scope["query_string"], etag, encoding)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        encoder = self.encoders[encoding]
+        if len(body) >= settings.compression.thread_size:
+            # keep the event loop serving other requests
+            compressed = await anyio.to_thread.run_sync(encoder, body)
+        else:
+            compressed = encoder(body)
+
+        if key:
+            self.cache.set(key, compressed)
+        return compressed
@@ -0,0 +1,191 @@
+import asyncio
+import hashlib
+import logging
+import secrets
+from http import HTTPStatus
+
+import orjson
+from fastapi.responses import ORJSONResponse
+from redis.exceptions import RedisError
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import Message
+
+from config.base import settings
+from db.utils.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = ("POST", "PUT")
+REPLAY_HEADER = "Idempotent-Replayed"
+
+# the lock is deleted by its owner only, an expired owner can't
+# delete the lock of the request that took over
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class IdempotencyMiddleware(BaseHTTPMiddleware):
+    """
+    Store the first response of a POST/PUT request sent with the
+    Idempotency-Key header and replay it for the retries of the request.
+    """
+
+    async def dispatch(
+            self, request: Request, call_next: RequestResponseEndpoint
+    ) -> Response:
+        key = request.headers.get(settings.idempotency.header)
+        redis = await get_redis()
+        if request.method not in IDEMPOTENT_METHODS or not key or not redis:
+            return await call_next(request)
+
+        body = await request.body()
+        request = self.with_body(request, body)
+        fingerprint = self.get_fingerprint(request, body)
+
+        cache_key = self.get_cache_key(request, key)
+        lock_key = f"{cache_key}:lock"
+        owner = secrets.token_hex(16)
+        try:
+            stored, is_locked = await self.acquire(
+                redis, cache_key, lock_key, owner
+            )
+        except RedisError as exc:
+            logger.warning(f"Idempotency storage is unavailable: {exc}")
+            return await call_next(request)
+
+        if stored:
+            return self.replay(stored, fingerprint, key)
+        if not is_locked:
+            return ORJSONResponse(
+                status_code=HTTPStatus.CONFLICT,
+                content={
+                    "detail": f"Request with the idempotency key {key}"
+                              f" is still in progress"
+                },
+            )
+
+        try:
+            response = await call_next(request)
+            body = b"".join([chunk async for chunk in response.body_iterator])
+        except BaseException:
+            await self.release(redis, lock_key, owner)
+            raise
+
+        if response.status_code < HTTPStatus.INTERNAL_SERVER_ERROR:
+            await self.store(redis, cache_key, response, body, fingerprint)
+        await self.release(redis, lock_key, owner)
+
+        return Response(
+            content=body,
+            status_code=response.status_code,
+            headers=dict(response.headers),
+        )
+
+    @staticmethod
+    async def store(
+            redis, cache_key: str, response: Response, body: bytes,
+            fingerprint: str,
+    ):
+        stored = {
+            "fingerprint": fingerprint,
+            "status": response.status_code,
+            "body": body.decode(),
+            "media_type": response.headers.get("content-type"),
+        }
+        try:
+            await redis.set(
+                cache_key, orjson.dumps(stored), ex=settings.idempotency.ttl
+            )
+        except RedisError as exc:
+            logger.warning(f"Idempotency storage is unavailable: {exc}")
+
+    @staticmethod
+    async def release(redis, lock_key: str, owner: str):
+        try:
+            await redis.eval(RELEASE_SCRIPT, 1, lock_key, owner)
+        except RedisError as exc:
+            # the lock expires on its own after lock_ttl
+            logger.warning(f"Idempotency storage is unavailable: {exc}")
+
+    @staticmethod
+    def get_cache_key(request: Request, key: str) -> str:
+        # keys are scoped by the caller, so clients can't replay each other
+        scope = "\n".join(
+            (
+                request.headers.get("authorization", ""),
+                request.method,
+                request.url.path,
+                key,
+            )
+        )
+        return f"idempotency:{hashlib.sha256(scope.encode()).hexdigest()}"
+
+    @staticmethod
+    def get_fingerprint(request: Request, body: bytes) -> str:
+        """A retry has to be the very same request as the first one."""
+        digest = hashlib.sha256()
+        for part in (
+                request.method.encode(),
+                request.url.path.encode(),
+                request.url.query.encode(),
+                body,
+        ):
+            digest.update(part)
+            digest.update(b"\n")
+        return digest.hexdigest()
+
+    @staticmethod
+    def with_body(request: Request, body: bytes) -> Request:
+        """The request for call_next, the endpoint reads the body again."""
+        sent = False
+
+        async def receive() -> Message:
+            nonlocal sent
+            if sent:
+                return await request.receive()
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        return Request(request.scope, receive)
+
+    @staticmethod
+    async def acquire(redis, cache_key: str, lock_key: str, owner: str):
+        # concurrent duplicates wait until the first request stores its response
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + settings.idempotency.wait_timeout
+        while True:
+            stored = await redis.get(cache_key)
+            if stored:
+                return stored, False
+            if await redis.set(
+                    lock_key, owner, nx=True, ex=settings.idempotency.lock_ttl
+            ):
+                return None, True
+            if loop.time() >= deadline:
+                return None, False
+            await asyncio.sleep(settings.idempotency.poll_interval)
+
+    @staticmethod
+    def replay(stored: bytes, fingerprint: str, key: str) -> Response:
+        stored = orjson.loads(stored)
+        # responses stored before fingerprinting are replayed as they are
+        if stored.get("fingerprint", fingerprint) != fingerprint:
+            return ORJSONResponse(
+                status_code=HTTPStatus.UNPROCESSABLE_ENTITY,
+                content={
+                    "detail": f"The idempotency key {key} was used"
+                              f" with a different request"
+                },
+            )
+        return Response(
+            content=stored["body"],
+            status_code=stored["status"],
+            media_type=stored["media_type"],
+            headers={REPLAY_HEADER: "true"},
+        )
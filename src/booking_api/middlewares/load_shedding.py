@@ -0,0 +1,139 @@
+import asyncio
+import time
+from collections import deque
+from http import HTTPStatus
+
+from fastapi.responses import ORJSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from config.base import settings
+
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+BOOKING_PREFIX = "/booking_api/v1/bookings"
+# long streamed responses, their latency says nothing about the load
+STREAMING_PATHS = ("/booking_api/v1/bookings/export",)
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit adjusted by AIMD: it grows by one per limit of
+    fast completions while it's saturated and shrinks by backoff_ratio
+    once per target latency window when completions are too slow.
+    Without a target latency the limit is fixed.
+    """
+
+    def __init__(self, limit: int, target_latency: float | None):
+        self.limit = float(limit)
+        self.target_latency = target_latency
+        self.in_flight = 0
+        self.waiters: deque[asyncio.Future] = deque()
+        self.last_decrease = 0.0
+        self.shed = 0
+
+    async def acquire(self) -> bool:
+        if self.in_flight < int(self.limit) and not self.waiters:
+            self.in_flight += 1
+            return True
+
+        if len(self.waiters) >= settings.load_shedding.queue_size:
+            self.shed += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        try:
+            # the slot is handed over by release()
+            await asyncio.wait_for(waiter, settings.load_shedding.queue_timeout)
+        except asyncio.TimeoutError:
+            self.shed += 1
+            return False
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # the slot was handed over to the cancelled request
+                self.in_flight -= 1
+                self.wake()
+            raise
+        return True
+
+    def release(self, latency: float):
+        saturated = self.in_flight >= int(self.limit)
+        self.in_flight -= 1
+        if self.target_latency is None:
+            self.wake()
+            return
+
+        now = time.monotonic()
+        if latency > self.target_latency:
+            if now - self.last_decrease > self.target_latency:
+                self.limit = max(
+                    settings.load_shedding.min_limit,
+                    self.limit * settings.load_shedding.backoff_ratio,
+                )
+                self.last_decrease = now
+        elif saturated:
+            self.limit = min(
+                settings.load_shedding.max_limit, self.limit + 1 / self.limit
+            )
+
+        self.wake()
+
+    def wake(self):
+        while self.waiters and self.in_flight < int(self.limit):
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+
+class LoadSheddingMiddleware:
+    """
+    Limit in-flight requests of the worker per route class, requests that
+    can't start within the queue timeout get 503 at once.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.limiters = {
+            route_class: AdaptiveLimiter(limit, target_latency)
+            for route_class, (limit, target_latency)
+            in settings.load_shedding.limits.items()
+        }
+        self.limiters.update(
+            (route_class, AdaptiveLimiter(limit, None))
+            for route_class, limit in settings.load_shedding.fixed_limits.items()
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not settings.load_shedding.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.limiters.get(self.get_route_class(scope))
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await limiter.acquire():
+            response = ORJSONResponse(
+                status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+                content={"detail": "Service is overloaded, retry later"},
+                headers={"Retry-After": str(settings.load_shedding.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        start = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(time.monotonic() - start)
+
+    @staticmethod
+    def get_route_class(scope: Scope) -> str:
+        if scope["path"] in STREAMING_PATHS:
+            return "export"
+        if scope["method"] in READ_METHODS:
+            return "read"
+        if scope["path"].startswith(BOOKING_PREFIX):
+            return "booking"
+        return "write"
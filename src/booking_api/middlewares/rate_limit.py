@@ -0,0 +1,141 @@
+import ipaddress
+import logging
+import math
+import time
+from collections import OrderedDict
+from http import HTTPStatus
+
+from fastapi.responses import ORJSONResponse
+from jwt.exceptions import InvalidTokenError
+from redis.exceptions import RedisError
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Match
+
+from booking_api.utils.authentication import get_token_payload
+from config.base import settings
+from db.utils.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or burst
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(retry_after)
+"""
+
+
+class LocalTokenBuckets:
+    """In-process token buckets, used while Redis is unavailable."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def take(self, key: str, rate: float, burst: int) -> float:
+        now = time.monotonic()
+        tokens, ts = self.buckets.pop(key, (burst, now))
+        tokens = min(burst, tokens + (now - ts) * rate)
+
+        retry_after = 0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            retry_after = (1 - tokens) / rate
+
+        self.buckets[key] = (tokens, now)
+        if len(self.buckets) > self.size:
+            self.buckets.popitem(last=False)
+        return retry_after
+
+
+class RateLimitMiddleware(BaseHTTPMiddleware):
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.local_buckets = LocalTokenBuckets(settings.rate_limit.local_buckets)
+        self.trusted_proxies = [
+            ipaddress.ip_network(proxy)
+            for proxy in settings.rate_limit.trusted_proxies
+        ]
+
+    async def dispatch(
+            self, request: Request, call_next: RequestResponseEndpoint
+    ) -> Response:
+        if not settings.rate_limit.enabled:
+            return await call_next(request)
+
+        route = self.get_route(request)
+        rate, burst = settings.rate_limit.routes.get(
+            route, (settings.rate_limit.rate, settings.rate_limit.burst)
+        )
+        key = f"rate_limit:{self.get_client(request, self.trusted_proxies)}:{route}"
+
+        retry_after = await self.take(key, rate, burst)
+        if retry_after > 0:
+            return ORJSONResponse(
+                status_code=HTTPStatus.TOO_MANY_REQUESTS,
+                content={"detail": "Too many requests"},
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+        return await call_next(request)
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        redis = await get_redis()
+        if redis is not None:
+            try:
+                return float(
+                    await redis.eval(TOKEN_BUCKET_SCRIPT, 1, key, rate, burst)
+                )
+            except RedisError as exc:
+                logger.warning(f"Rate limiter falls back to memory: {exc}")
+
+        return self.local_buckets.take(key, rate, burst)
+
+    @staticmethod
+    def get_route(request: Request) -> str:
+        for route in request.app.router.routes:
+            match, _ = route.matches(request.scope)
+            if match is Match.FULL:
+                return f"{request.method} {route.path}"
+        return f"{request.method} *"
+
+    @staticmethod
+    def get_client(request: Request, trusted_proxies: list) -> str:
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() == "bearer" and token:
+            try:
+                user_id = get_token_payload(token).get("user_id")
+            except (InvalidTokenError, KeyError):
+                user_id = None
+            if user_id:
+                return f"user:{user_id}"
+
+        client_ip = request.client and request.client.host
+        # any client could set the header, only our proxies are believed
+        if is_trusted(client_ip, trusted_proxies):
+            client_ip = request.headers.get("x-real-ip") or client_ip
+        return f"ip:{client_ip}"
+
+
+def is_trusted(address: str | None, trusted_proxies: list) -> bool:
+    try:
+        address = ipaddress.ip_address(address or "")
+    except ValueError:
+        return False
+    return any(address in network for network in trusted_proxies)
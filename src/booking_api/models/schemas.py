@@ -1,7 +1,10 @@
+import enum
 import uuid
-from datetime import datetime
+from datetime import date, datetime
 from datetime import time
 
+from pydantic import conint
+
 from booking_api.models.mixin import MixinModel
 from db.tables import SeatType, BookingStatus
 
@@ -46,6 +49,77 @@ class EventDetails(EventInput):
         orm_mode = True
 
 
+class SeatFormat(str, enum.Enum):
+    VERBOSE = "verbose"
+    COMPACT = "compact"
+
+
+class ExportFormat(str, enum.Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+    PARQUET = "parquet"
+
+
+class SeatLayout(MixinModel):
+    location_id: uuid.UUID
+    version: str
+    rows: list[list[int | None]]
+    seat_ids: list[uuid.UUID]
+
+
+class EventCompactDetails(EventInput):
+    id: uuid.UUID
+    layout_version: str
+    seats_count: int
+    availability: str
+
+
+class EventSearchResult(EventSchema):
+    location_name: str
+    rank: float
+
+
+class EventNearby(EventSchema):
+    location_name: str
+    distance_km: float
+
+
+class EventListingItem(EventSchema):
+    location_name: str
+    seats: int
+    free_seats: int
+    free_seats_by_type: dict[str, int]
+
+
+class RecurrenceFrequency(str, enum.Enum):
+    DAILY = "daily"
+    WEEKLY = "weekly"
+
+
+class RecurrenceRule(MixinModel):
+    frequency: RecurrenceFrequency = RecurrenceFrequency.DAILY
+    interval: conint(ge=1) = 1
+    count: conint(ge=1) | None
+    until: datetime | None
+    weekdays: list[conint(ge=0, le=6)] | None
+
+
+class EventSeriesInput(MixinModel):
+    event: EventInput
+    recurrence: RecurrenceRule
+    skip_conflicts: bool = False
+
+
+class OccurrenceConflict(MixinModel):
+    start: datetime
+    reason: str
+
+
+class EventSeriesResult(MixinModel):
+    created: list[EventSchema]
+    conflicts: list[OccurrenceConflict]
+
+
 class LocationEdit(MixinModel):
     coordinates: str
     capacity: int
@@ -59,6 +133,7 @@ class LocationInput(LocationEdit):
 
 class LocationDetails(LocationInput):
     host_id: uuid.UUID | None
+    seats_count: int | None
 
     class Config:
         orm_mode = True
@@ -68,11 +143,28 @@ class LocationSchema(LocationDetails):
     id: uuid.UUID
 
 
+class LocationNearby(LocationSchema):
+    distance_km: float
+
+
+class FreeSlot(MixinModel):
+    start: datetime
+    end: datetime
+    duration: int
+
+
 class BookingInput(MixinModel):
     event_id: uuid.UUID
     seat_id: uuid.UUID | list[uuid.UUID]
 
 
+class SeatBlockInput(MixinModel):
+    event_id: uuid.UUID
+    count: conint(ge=1)
+    seat_types: list[SeatType] = []
+    reserve: bool = False
+
+
 class BookingBase(MixinModel):
     event_id: uuid.UUID
     status: int | BookingStatus
@@ -86,6 +178,13 @@ class BookingSchema(BookingBase):
         orm_mode = True
 
 
+class SeatBlock(MixinModel):
+    event_id: uuid.UUID
+    seats: list[SeatSchema]
+    score: float
+    bookings: list[BookingSchema] = []
+
+
 class BookingDetails(BookingBase):
     seats: SeatSchema
     event_name: str
@@ -94,3 +193,100 @@ class BookingDetails(BookingBase):
 
     class Config:
         orm_mode = True
+
+
+class BookingPeriod(str, enum.Enum):
+    ALL = "all"
+    UPCOMING = "upcoming"
+    PAST = "past"
+
+
+class BookingHistoryItem(BookingDetails):
+    id: uuid.UUID
+    location_id: uuid.UUID
+    location_name: str
+
+
+class BookingPage(MixinModel):
+    items: list[BookingHistoryItem]
+    next_cursor: str | None
+
+
+class PurchasedMovieInput(MixinModel):
+    movie_id: uuid.UUID
+    movie_name: str | None
+    release_date: date | None
+
+
+class PurchasedMoviesInput(MixinModel):
+    host_id: uuid.UUID
+    movies: list[PurchasedMovieInput]
+
+
+class PurchasedMoviesResult(MixinModel):
+    received: int
+    granted: int
+
+
+class WaitingRoomStatus(MixinModel):
+    event_id: uuid.UUID
+    position: int
+    eta: float
+    admission_token: str | None
+
+
+class CircuitBreakerStatus(MixinModel):
+    name: str
+    state: str
+    failure_rate: float
+    calls: int
+    rejected: int
+
+
+class OutboxStatus(MixinModel):
+    pending: int
+    oldest_age: float | None
+    relayed: int
+    last_lag: float | None
+
+
+class EventListingStatus(MixinModel):
+    events: int
+    last_rebuild: datetime | None
+    last_drift: int | None
+
+
+class OccupancyGranularity(str, enum.Enum):
+    HOUR = "hour"
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+
+class OccupancyDimension(str, enum.Enum):
+    LOCATION = "location"
+    MOVIE = "movie"
+    EVENT = "event"
+    SEAT_TYPE = "seat_type"
+
+
+class OccupancyBucket(MixinModel):
+    bucket: datetime | date
+    location_id: uuid.UUID | None
+    movie_id: uuid.UUID | None
+    event_id: uuid.UUID | None
+    seat_type: SeatType | None
+    seats: int
+    occupied: int
+    reserved: int
+    booked: int
+    released: int
+    fill_rate: float | None
+
+
+class PartitionRestoreResult(MixinModel):
+    partition: str
+    restored: int
+    # bookings of the events, seats or guests deleted since the archiving
+    dropped: int
+    restored_until: date
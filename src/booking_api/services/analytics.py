@@ -0,0 +1,349 @@
+import uuid
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from typing import Iterable
+
+from sqlalchemy import Date, Integer, cast, delete, func, literal_column
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from booking_api.models.schemas import (
+    OccupancyBucket, OccupancyDimension, OccupancyGranularity
+)
+from booking_api.utils.exceptions import BadRequestException
+from db.tables import (
+    BookingStatus, Event, OccupancyDaily, OccupancyHourly, Outbox,
+    OutboxMessage, Seat
+)
+
+COUNTERS = ("seats", "occupied", "reserved", "booked", "released")
+
+# occupied, reserved, booked and released changes per message type
+BOOKING_DELTAS = {
+    OutboxMessage.BOOKING_CREATED.value: {"occupied": 1, "reserved": 1},
+    OutboxMessage.BOOKING_DELETED.value: {"occupied": -1, "released": 1},
+}
+
+DIMENSIONS = {
+    OccupancyDimension.LOCATION: "location_id",
+    OccupancyDimension.MOVIE: "movie_id",
+    OccupancyDimension.EVENT: "event_id",
+    OccupancyDimension.SEAT_TYPE: "seat_type",
+}
+
+
+class AnalyticsService:
+    """
+    Occupancy rollups by the hour and by the day of the event start.
+    The outbox relay applies the relayed messages as counter deltas in
+    its transaction, so every change is counted exactly once.
+    """
+
+    @classmethod
+    async def apply(cls, session: AsyncSession, messages: list[Outbox]):
+        event_ids = {message.event_id for message in messages}
+        seat_ids = set()
+        for message in messages:
+            for payload in (message.payload, message.payload.get("previous") or {}):
+                if payload.get("seat_id"):
+                    seat_ids.add(uuid.UUID(payload["seat_id"]))
+                if payload.get("event_id"):
+                    event_ids.add(uuid.UUID(payload["event_id"]))
+
+        # the events and seats as they are now, deleted ones aren't counted
+        events = {
+            event.id: event for event in (
+                await session.execute(
+                    select(
+                        Event.id, Event.start, Event.host_id,
+                        Event.location_id, Event.movie_id,
+                    )
+                    .where(Event.id.in_(event_ids), Event.host_id.isnot(None))
+                )
+            ).all()
+        }
+        seat_types = dict(
+            (
+                await session.execute(
+                    select(Seat.id, cast(Seat.type, Integer))
+                    .where(Seat.id.in_(seat_ids))
+                )
+            ).all()
+        )
+
+        deltas: dict[tuple, Counter] = defaultdict(Counter)
+        for message in messages:
+            payload = message.payload
+            previous = payload.get("previous") or {}
+            seat_id = payload.get("seat_id")
+            seat_type = seat_id and seat_types.get(uuid.UUID(seat_id))
+
+            if message.type in BOOKING_DELTAS:
+                deltas[message.event_id, seat_type].update(
+                    BOOKING_DELTAS[message.type]
+                )
+            elif message.type == OutboxMessage.BOOKING_UPDATED.value and previous:
+                # the seat moved, bookings made and deleted stay as they are
+                previous_seat = (
+                    uuid.UUID(previous["event_id"]),
+                    seat_types.get(uuid.UUID(previous["seat_id"])),
+                )
+                deltas[previous_seat]["occupied"] -= 1
+                deltas[message.event_id, seat_type]["occupied"] += 1
+            elif message.type == OutboxMessage.BOOKING_STATUS_CHANGED.value:
+                was_booked = previous.get("status") == BookingStatus.BOOKED.value
+                is_booked = payload["status"] == BookingStatus.BOOKED.value
+                deltas[message.event_id, seat_type]["booked"] += (
+                    is_booked - was_booked
+                )
+            elif message.type == OutboxMessage.EVENT_CREATED.value:
+                event = events.get(message.event_id)
+                if event:
+                    for seat_type, seats in (
+                            await cls.get_seat_counts(session, event.location_id)
+                    ).items():
+                        deltas[message.event_id, seat_type]["seats"] += seats
+            elif message.type == OutboxMessage.EVENT_UPDATED.value:
+                await cls.move_event(session, message.event_id, events)
+            elif message.type == OutboxMessage.EVENT_DELETED.value:
+                await cls.remove_event(session, message.event_id)
+
+        rows = []
+        for (event_id, seat_type), counters in deltas.items():
+            event = events.get(event_id)
+            if event is None or seat_type is None or not any(counters.values()):
+                continue
+            rows.append(cls.to_row(event, seat_type, counters))
+        await cls.add(session, rows)
+
+    @classmethod
+    async def move_event(
+            cls, session: AsyncSession, event_id: uuid.UUID, events: dict
+    ):
+        """Move the event's counters to its new start hour, location or movie."""
+        event = events.get(event_id)
+        if event is None:
+            return
+
+        rows = (
+            await session.execute(
+                select(OccupancyHourly.__table__)
+                .where(OccupancyHourly.event_id == event_id)
+            )
+        ).all()
+        stale = [
+            row for row in rows
+            if (row.bucket, row.location_id, row.movie_id, row.host_id) != (
+                cls.get_hour(event.start), event.location_id,
+                event.movie_id, event.host_id,
+            )
+        ]
+        if not stale:
+            return
+
+        location_changed = any(
+            row.location_id != event.location_id for row in stale
+        )
+        await cls.remove_event(session, event_id, stale)
+
+        moved = defaultdict(Counter)
+        for row in stale:
+            moved[row.seat_type].update(
+                {counter: getattr(row, counter) for counter in COUNTERS}
+            )
+        if location_changed:
+            # the seats are the seats of the new location
+            for counters in moved.values():
+                counters["seats"] = 0
+            for seat_type, seats in (
+                    await cls.get_seat_counts(session, event.location_id)
+            ).items():
+                moved[seat_type]["seats"] = seats
+
+        await cls.add(
+            session,
+            [
+                cls.to_row(event, seat_type, counters)
+                for seat_type, counters in moved.items()
+            ],
+        )
+
+    @classmethod
+    async def remove_event(
+            cls, session: AsyncSession, event_id: uuid.UUID, rows=None
+    ):
+        if rows is None:
+            rows = (
+                await session.execute(
+                    select(OccupancyHourly.__table__)
+                    .where(OccupancyHourly.event_id == event_id)
+                )
+            ).all()
+        if not rows:
+            return
+
+        await cls.add_daily(
+            session,
+            [
+                {
+                    "bucket": row.bucket.date(),
+                    "host_id": row.host_id,
+                    "location_id": row.location_id,
+                    "movie_id": row.movie_id,
+                    "seat_type": row.seat_type,
+                    **{counter: -getattr(row, counter) for counter in COUNTERS},
+                }
+                for row in rows
+            ],
+        )
+        for row in rows:
+            await session.execute(
+                delete(OccupancyHourly)
+                .where(
+                    OccupancyHourly.bucket == row.bucket,
+                    OccupancyHourly.event_id == row.event_id,
+                    OccupancyHourly.seat_type == row.seat_type,
+                )
+                .execution_options(synchronize_session=False)
+            )
+
+    @classmethod
+    async def add(cls, session: AsyncSession, rows: list[dict]):
+        if not rows:
+            return
+
+        query = insert(OccupancyHourly).values(rows)
+        await session.execute(
+            query.on_conflict_do_update(
+                index_elements=["bucket", "event_id", "seat_type"],
+                set_={
+                    counter: getattr(OccupancyHourly, counter)
+                    + getattr(query.excluded, counter)
+                    for counter in COUNTERS
+                },
+            )
+        )
+
+        daily = defaultdict(Counter)
+        for row in rows:
+            key = (
+                row["bucket"].date(), row["host_id"], row["location_id"],
+                row["movie_id"], row["seat_type"],
+            )
+            daily[key].update({counter: row[counter] for counter in COUNTERS})
+        await cls.add_daily(
+            session,
+            [
+                {
+                    **dict(zip(
+                        ("bucket", "host_id", "location_id", "movie_id", "seat_type"),
+                        key,
+                    )),
+                    **{counter: counters[counter] for counter in COUNTERS},
+                }
+                for key, counters in daily.items()
+            ],
+        )
+
+    @staticmethod
+    async def add_daily(session: AsyncSession, rows: list[dict]):
+        if not rows:
+            return
+
+        query = insert(OccupancyDaily).values(rows)
+        await session.execute(
+            query.on_conflict_do_update(
+                index_elements=[
+                    "host_id", "bucket", "location_id", "movie_id", "seat_type"
+                ],
+                set_={
+                    counter: getattr(OccupancyDaily, counter)
+                    + getattr(query.excluded, counter)
+                    for counter in COUNTERS
+                },
+            )
+        )
+
+    @classmethod
+    def to_row(cls, event, seat_type: int, counters: Counter) -> dict:
+        return {
+            "bucket": cls.get_hour(event.start),
+            "event_id": event.id,
+            "seat_type": seat_type,
+            "host_id": event.host_id,
+            "location_id": event.location_id,
+            "movie_id": event.movie_id,
+            **{counter: counters[counter] for counter in COUNTERS},
+        }
+
+    @staticmethod
+    def get_hour(start: datetime) -> datetime:
+        return start.replace(minute=0, second=0, microsecond=0)
+
+    @staticmethod
+    async def get_seat_counts(
+            session: AsyncSession, location_id: uuid.UUID
+    ) -> dict[int, int]:
+        query = (
+            select(cast(Seat.type, Integer), func.count(Seat.id))
+            .where(Seat.location_id == location_id)
+            .group_by(Seat.type)
+        )
+        return dict((await session.execute(query)).all())
+
+    @classmethod
+    async def get_occupancy(
+            cls,
+            session: AsyncSession,
+            user_id: uuid.UUID,
+            granularity: OccupancyGranularity,
+            date_from: date,
+            date_to: date,
+            group_by: Iterable[OccupancyDimension] = (),
+    ) -> list[OccupancyBucket]:
+        if date_to < date_from:
+            raise BadRequestException(
+                message="date_to can't be before date_from"
+            )
+
+        hourly = granularity is OccupancyGranularity.HOUR
+        if OccupancyDimension.EVENT in group_by and not hourly:
+            raise BadRequestException(
+                message="Events are grouped by the hour only"
+            )
+
+        table = OccupancyHourly if hourly else OccupancyDaily
+        bucket = table.bucket
+        if granularity in (OccupancyGranularity.WEEK, OccupancyGranularity.MONTH):
+            # inlined, the grouping has to repeat the very same expression
+            unit = literal_column(f"'{granularity.value}'")
+            bucket = cast(func.date_trunc(unit, table.bucket), Date)
+        dimensions = [
+            getattr(table, DIMENSIONS[dimension]) for dimension in group_by
+        ]
+
+        query = (
+            select(
+                bucket.label("bucket"),
+                *dimensions,
+                *(
+                    func.sum(getattr(table, counter)).label(counter)
+                    for counter in COUNTERS
+                ),
+            )
+            .where(
+                table.host_id == user_id,
+                table.bucket >= date_from,
+                table.bucket < date_to + timedelta(days=1),
+            )
+            .group_by(bucket, *dimensions)
+            .order_by(bucket, *dimensions)
+        )
+        return [
+            OccupancyBucket(
+                **row._mapping,
+                fill_rate=row.seats and row.occupied / row.seats,
+            )
+            for row in (await session.execute(query)).all()
+        ]
@@ -28,7 +28,7 @@ class BaseService:
         if extra is None:
             extra = {"host_id": user_id}
 
-        data = data.dict()
+        data = cls.prepare_data(data.dict())
         data.update(extra)
 
         instance = cls.model(**data)
@@ -41,25 +41,30 @@ class BaseService:
             new_data: BaseModel,
             _id: uuid.UUID,
             user_id: uuid.UUID,
+            commit=True,
     ) -> Optional[BaseModel]:
         db_instance = await cls.validate_user(session, _id, user_id)
         await cls.validate(
             data=new_data, session=session, user_id=user_id, _id=_id
         )
 
-        for key, value in new_data.dict().items():
+        for key, value in cls.prepare_data(new_data.dict()).items():
             setattr(db_instance, key, value)
 
-        return await cls.save(session, db_instance)
+        return await cls.save(session, db_instance, commit)
 
     @classmethod
     async def delete(
-            cls, session: AsyncSession, _id: uuid.UUID, user_id: uuid.UUID
+            cls, session: AsyncSession, _id: uuid.UUID, user_id: uuid.UUID,
+            commit=True,
     ) -> Optional[BaseModel]:
         db_instance = await cls.validate_user(session, _id, user_id)
 
         await session.delete(db_instance)
-        await session.commit()
+        if commit:
+            await session.commit()
+        else:
+            await session.flush()
         return db_instance
 
     @classmethod
@@ -133,6 +138,10 @@ class BaseService:
     async def is_host(cls, host_id: uuid.UUID, user_id: uuid.UUID) -> bool:
         return True if str(host_id) == user_id else False
 
+    @classmethod
+    def prepare_data(cls, data: dict) -> dict:
+        return data
+
     @classmethod
     def model_to_dict(cls, model_instance: Base):
         return model_instance.__dict__
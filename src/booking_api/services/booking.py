@@ -1,22 +1,32 @@
 import uuid
-from typing import Iterable
+from datetime import datetime
+from typing import Iterable, Optional
 
-from sqlalchemy import func, Integer, cast
+from pydantic import BaseModel
+from sqlalchemy import func, Integer, cast, tuple_
 from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from booking_api.models.schemas import (
-    BookingInput, BookingSchema, BookingDetails
+    BookingDetails, BookingHistoryItem, BookingInput, BookingPage,
+    BookingPeriod, BookingSchema, SeatBlock, SeatBlockInput
 )
 from booking_api.services.base import BaseService
 from booking_api.services.events import EventService
+from booking_api.services.listing import EventListingService
+from booking_api.services.outbox import OutboxMessage, OutboxService
+from booking_api.services.waiting_room import WaitingRoomService
 from booking_api.utils.exceptions import (
     EventNotFound, SeatNotFound, BookingNotFound, BadRequestException,
     ForbiddenException
 )
-from db.tables import Seat, Event
+from booking_api.utils.pagination import decode_cursor, encode_cursor
+from booking_api.utils.single_flight import single_flight
+from config.base import settings
+from db.tables import Seat, Event, Location
 from db.tables.booking import BookingStatus, Booking
+from db.utils.redis import get_redis
 
 
 class BookingService(BaseService):
@@ -26,15 +36,164 @@ class BookingService(BaseService):
     @classmethod
     async def create(
             cls, session: AsyncSession, data: BookingInput,
-            user_id: uuid.UUID, extra: dict = None, commit=True
+            user_id: uuid.UUID, extra: dict = None, commit=True,
+            admission_token: str | None = None,
     ) -> BookingSchema:
-        await cls.validate(data, session=session)
+        async with WaitingRoomService.admit(
+                await get_redis(), data.event_id, user_id, admission_token
+        ):
+            event = await cls.validate(data, session=session)
 
-        extra = {'guest_id': user_id, 'status': BookingStatus.RESERVED.value}
-        booking = await super().create(session, data, user_id, extra)
+            extra = {
+                'guest_id': user_id,
+                'status': BookingStatus.RESERVED.value,
+                'event_start': event.start,
+            }
+            booking = await super().create(
+                session, data, user_id, extra, commit=False
+            )
+            await EventListingService.change_free_seats(
+                session, booking.event_id, booking.seat_id, -1
+            )
+            OutboxService.add_booking(
+                session, OutboxMessage.BOOKING_CREATED, booking
+            )
+            await EventService.bump_bookings_version(session, booking.event_id)
+            if commit:
+                await session.commit()
         return BookingSchema.from_orm(booking)
 
     @classmethod
+    async def find_best_seats(
+            cls, session: AsyncSession, data: SeatBlockInput,
+            user_id: uuid.UUID, admission_token: str | None = None,
+    ) -> SeatBlock:
+        if not data.reserve:
+            return await EventService.find_seat_block(session, data)
+
+        async with WaitingRoomService.admit(
+                await get_redis(), data.event_id, user_id, admission_token
+        ):
+            return await cls.reserve_block(session, data, user_id)
+
+    @classmethod
+    async def reserve_block(
+            cls, session: AsyncSession, data: SeatBlockInput, user_id: uuid.UUID
+    ) -> SeatBlock:
+        # single bookings take the event row in key share mode, so
+        # the occupied seats can't change until the block is booked
+        event_start = await session.scalar(
+            select(Event.start)
+            .where(Event.id == data.event_id)
+            .with_for_update()
+        )
+        if event_start is None:
+            raise EventNotFound(data.event_id)
+        block = await EventService.find_seat_block(session, data)
+
+        bookings = []
+        for seat in block.seats:
+            booking = await super().create(
+                session,
+                BookingInput(event_id=data.event_id, seat_id=seat.id),
+                user_id,
+                {
+                    'guest_id': user_id,
+                    'status': BookingStatus.RESERVED.value,
+                    'event_start': event_start,
+                },
+                commit=False,
+            )
+            await EventListingService.change_free_seats(
+                session, booking.event_id, booking.seat_id, -1
+            )
+            OutboxService.add_booking(
+                session, OutboxMessage.BOOKING_CREATED, booking
+            )
+            bookings.append(booking)
+
+        await EventService.bump_bookings_version(session, data.event_id)
+        await session.commit()
+        block.bookings = [BookingSchema.from_orm(booking) for booking in bookings]
+        return block
+
+    @classmethod
+    async def edit(
+            cls,
+            session: AsyncSession,
+            new_data: BaseModel,
+            _id: uuid.UUID,
+            user_id: uuid.UUID,
+            commit=True,
+            admission_token: str | None = None,
+    ) -> Optional[BaseModel]:
+        booking = await cls.get_by_id(session, _id)
+        previous = booking and (booking.event_id, booking.seat_id)
+        if previous == (new_data.event_id, new_data.seat_id):
+            return await cls.save_edit(
+                session, new_data, _id, user_id, previous, commit
+            )
+
+        # another seat is booked, through the waiting room if it's open
+        async with WaitingRoomService.admit(
+                await get_redis(), new_data.event_id, user_id, admission_token
+        ):
+            return await cls.save_edit(
+                session, new_data, _id, user_id, previous, commit
+            )
+
+    @classmethod
+    async def save_edit(
+            cls,
+            session: AsyncSession,
+            new_data: BaseModel,
+            _id: uuid.UUID,
+            user_id: uuid.UUID,
+            previous: tuple[uuid.UUID, uuid.UUID] | None,
+            commit=True,
+    ) -> Optional[BaseModel]:
+        booking = await super().edit(
+            session, new_data, _id, user_id, commit=False
+        )
+        # the booking moves to the partition of its new event
+        booking.event_start = await cls.get_first(
+            session, Event.start, (Event.id == booking.event_id,)
+        )
+        if previous != (booking.event_id, booking.seat_id):
+            await EventListingService.change_free_seats(session, *previous, 1)
+            await EventListingService.change_free_seats(
+                session, booking.event_id, booking.seat_id, -1
+            )
+        OutboxService.add_booking(
+            session, OutboxMessage.BOOKING_UPDATED, booking,
+            previous={"event_id": str(previous[0]), "seat_id": str(previous[1])},
+        )
+        await EventService.bump_bookings_version(
+            session, previous[0], booking.event_id
+        )
+        if commit:
+            await session.commit()
+        return booking
+
+    @classmethod
+    async def delete(
+            cls, session: AsyncSession, _id: uuid.UUID, user_id: uuid.UUID,
+            commit=True,
+    ) -> Optional[BaseModel]:
+        booking = await super().delete(session, _id, user_id, commit=False)
+        await EventListingService.change_free_seats(
+            session, booking.event_id, booking.seat_id, 1
+        )
+        OutboxService.add_booking(
+            session, OutboxMessage.BOOKING_DELETED, booking
+        )
+        await EventService.bump_bookings_version(session, booking.event_id)
+        if commit:
+            await session.commit()
+        return booking
+
+    @classmethod
+    @single_flight(ttl=settings.single_flight_ttl)
     async def get_booking(
             cls, session: AsyncSession, booking_id: uuid.UUID
     ) -> BookingDetails:
@@ -43,13 +202,80 @@ class BookingService(BaseService):
         booking = (await session.execute(query)).first()
         return BookingDetails.from_orm(booking)
 
+    @classmethod
+    async def get_version(cls, session: AsyncSession, booking_id: uuid.UUID):
+        query = (
+            select(
+                Booking.modified,
+                Event.modified.label('event_modified'),
+                Seat.modified.label('seat_modified'),
+            )
+            .join(Event, Event.id == Booking.event_id)
+            .join(Seat, Seat.id == Booking.seat_id)
+            .where(Booking.id == booking_id)
+        )
+        return (await session.execute(query)).first()
+
     @classmethod
     async def get_bookings(
-            cls, session: AsyncSession, user_id: uuid.UUID
-    ) -> list[BookingDetails]:
-        query = cls.get_booking_query(filters=(Booking.guest_id == user_id,))
+            cls,
+            session: AsyncSession,
+            user_id: uuid.UUID,
+            period: BookingPeriod = BookingPeriod.ALL,
+            status: int | None = None,
+            cursor: str | None = None,
+            limit: int = 20,
+    ) -> BookingPage:
+        """
+        A page of the guest's bookings: the upcoming ones from the
+        soonest, the past ones and all of them from the latest. The
+        cursor is the (event start, id) of the previous page's last item,
+        so every page is an index range scan however many bookings there are.
+        """
+        filters = [Booking.guest_id == user_id]
+        now = datetime.now()
+        if period is BookingPeriod.UPCOMING:
+            filters.append(Booking.event_start > now)
+        elif period is BookingPeriod.PAST:
+            filters.append(Booking.event_start <= now)
+        if status is not None:
+            try:
+                filters.append(Booking.status == BookingStatus(status))
+            except ValueError:
+                raise BadRequestException(message=f"Unknown status {status}")
+
+        ascending = period is BookingPeriod.UPCOMING
+        sort_key = tuple_(Booking.event_start, Booking.id)
+        if cursor:
+            last = tuple_(*decode_cursor(cursor))
+            filters.append(sort_key > last if ascending else sort_key < last)
+
+        query = (
+            cls.get_booking_query(filters=filters)
+            .add_columns(
+                Location.id.label("location_id"),
+                Location.name.label("location_name"),
+                Booking.event_start.label("sort_start"),
+            )
+            .join(Location, Location.id == Event.location_id)
+            .order_by(
+                *(
+                    (Booking.event_start, Booking.id) if ascending
+                    else (Booking.event_start.desc(), Booking.id.desc())
+                )
+            )
+            .limit(limit + 1)
+        )
         bookings = (await session.execute(query)).all()
-        return [BookingDetails.from_orm(booking) for booking in bookings]
+
+        next_cursor = None
+        if len(bookings) > limit:
+            bookings = bookings[:limit]
+            next_cursor = encode_cursor(bookings[-1].sort_start, bookings[-1].id)
+        return BookingPage(
+            items=[BookingHistoryItem.from_orm(booking) for booking in bookings],
+            next_cursor=next_cursor,
+        )
 
     @staticmethod
     def get_booking_query(filters: Iterable):
@@ -85,20 +311,34 @@ class BookingService(BaseService):
             new_status: int,
             user_id: uuid.UUID
     ) -> dict:
-        await cls.validate_user(session, booking_id, user_id)
+        booking = await cls.validate_user(session, booking_id, user_id)
+        previous_status = getattr(booking.status, "value", booking.status)
         query = (
             update(Booking)
             .where(Booking.id == booking_id)
             .values(status=new_status)
         )
         await session.execute(query)
+        await session.refresh(booking, ["status"])
+        OutboxService.add_booking(
+            session, OutboxMessage.BOOKING_STATUS_CHANGED, booking,
+            previous={"status": previous_status},
+        )
+        await EventService.bump_bookings_version(session, booking.event_id)
         await session.commit()
         return {"msg": "booking status was updated"}
 
     @classmethod
     async def validate(cls, data: BookingInput, *args, **kwargs):
         session = kwargs['session']
-        event = await EventService.get_by_id(session, data.event_id)
+        # conflicts with the lock of a seat block reservation only
+        event = (
+            await session.execute(
+                select(Event)
+                .where(Event.id == data.event_id)
+                .with_for_update(read=True, key_share=True)
+            )
+        ).scalars().first()
         if not event:
             raise EventNotFound(data.event_id)
 
@@ -111,13 +351,18 @@ class BookingService(BaseService):
 
         occupied_seats = await cls.get_all(
             session, Booking.seat_id,
-            filters=(Booking.event_id == data.event_id,)
+            filters=(
+                Booking.event_id == data.event_id,
+                Booking.event_start == event.start,
+            )
         )
         if data.seat_id in occupied_seats:
             raise BadRequestException(
                 message=f'Seat {data.seat_id} is already occupied'
             )
 
+        return event
+
     @classmethod
     async def validate_user(
             cls, session: AsyncSession, _id: uuid.UUID, user_id: uuid.UUID
@@ -1,26 +1,41 @@
+import itertools
+import re
 import uuid
 from datetime import datetime, timedelta
-from http import HTTPStatus
 from typing import Iterable
 
-import requests
-from fastapi import HTTPException
-from sqlalchemy import Date, Interval, String, cast
+from sqlalchemy import (
+    Date, DateTime, Interval, String, cast, column, desc, false, literal,
+    or_, update, values
+)
 from sqlalchemy import func
-from sqlalchemy.dialects.postgresql import ARRAY, JSON
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
-from booking_api.models.schemas import EventInput, EventDetails, EventSchema
+from booking_api.models.schemas import (
+    EventCompactDetails, EventInput, EventDetails, EventNearby, EventSchema,
+    EventSearchResult, EventSeriesInput, EventSeriesResult, OccurrenceConflict,
+    RecurrenceFrequency, RecurrenceRule, SeatBlock, SeatBlockInput, SeatLayout
+)
 from booking_api.services.base import BaseService
+from booking_api.services.listing import EventListingService
 from booking_api.services.locations import LocationService
+from booking_api.services.movies import (
+    FreeMovieService, PurchasedMovieService
+)
+from booking_api.services.outbox import OutboxService
+from booking_api.services.seats import SeatService
 from booking_api.utils.exceptions import (
     LocationNotFound, EventNotFound, BadRequestException, ForbiddenException
 )
+from booking_api.utils.seat_map import encode_availability
+from booking_api.utils.single_flight import single_flight
 from config.base import settings
-from db.tables import Event, Location, PurchasedMovie, PurchasedMovieHost, Seat
+from db.tables import Event, Location, OutboxMessage, PurchasedMovie, Seat
 from db.tables.base import Base
 from db.tables.booking import Booking
+from db.utils.redis import get_redis
 
 
 class EventService(BaseService):
@@ -33,69 +48,568 @@ class EventService(BaseService):
             user_id: uuid.UUID, extra: dict = None, commit=True
     ) -> EventSchema:
         await cls.validate(data, session=session, user_id=user_id)
-        event = await super().create(session, data, user_id)
+        event = await super().create(session, data, user_id, commit=False)
+        await EventListingService.refresh(session, (Event.id == event.id,))
+        OutboxService.add_event(session, OutboxMessage.EVENT_CREATED, event.id)
+        if commit:
+            await session.commit()
         return EventSchema.from_orm(event)
 
+    @classmethod
+    async def edit(
+            cls,
+            session: AsyncSession,
+            new_data: EventInput,
+            _id: uuid.UUID,
+            user_id: uuid.UUID,
+            commit=True,
+    ) -> Event:
+        event = await super().edit(session, new_data, _id, user_id, commit=False)
+        # the bookings follow the event to the partition of its new start
+        await session.execute(
+            update(Booking)
+            .where(Booking.event_id == _id, Booking.event_start != event.start)
+            .values(event_start=event.start)
+            .execution_options(synchronize_session=False)
+        )
+        await EventListingService.refresh(session, (Event.id == _id,))
+        OutboxService.add_event(session, OutboxMessage.EVENT_UPDATED, _id)
+        if commit:
+            await session.commit()
+        return event
+
+    @classmethod
+    async def delete(
+            cls, session: AsyncSession, _id: uuid.UUID, user_id: uuid.UUID,
+            commit=True,
+    ) -> Event:
+        event = await super().delete(session, _id, user_id, commit=False)
+        OutboxService.add_event(session, OutboxMessage.EVENT_DELETED, _id)
+        if commit:
+            await session.commit()
+        return event
+
     @classmethod
     async def get_events(cls, session: AsyncSession) -> list[EventDetails]:
-        query_seats = (
-            select(Booking.seat_id)
-            .filter(Booking.event_id == Event.id)
+        events = await cls.get_event_states(
+            session, (Event.start > datetime.now(),)
         )
-        filters = (Event.start > datetime.now(), ~Seat.id.in_(query_seats))
-        query = cls.get_event_query(filters)
-        events = (await session.execute(query)).all()
-        return [EventDetails.from_orm(event) for event in events]
+        return [
+            cls.to_details(event, layout, occupied)
+            for event, layout, occupied in events
+            if not occupied.issuperset(layout.seat_ids)
+        ]
 
     @classmethod
+    @single_flight(ttl=settings.single_flight_ttl)
     async def get_event(
             cls, session: AsyncSession, event_id: uuid.UUID
     ) -> EventDetails:
-        query = cls.get_event_query(filters=(Event.id == event_id,))
-        print(f'query: {query}, event_id: {event_id}')
-        event = (await session.execute(query)).first()
-        print(f'event: {event}')
-        if not event:
+        events = await cls.get_event_states(session, (Event.id == event_id,))
+        if not events:
             raise EventNotFound(event_id)
 
-        return EventDetails.from_orm(event)
+        return cls.to_details(*events[0])
+
+    @classmethod
+    async def get_events_compact(
+            cls, session: AsyncSession
+    ) -> list[EventCompactDetails]:
+        events = await cls.get_event_states(
+            session, (Event.start > datetime.now(),)
+        )
+        return [
+            cls.to_compact(event, layout, occupied)
+            for event, layout, occupied in events
+            if not occupied.issuperset(layout.seat_ids)
+        ]
+
+    @classmethod
+    @single_flight(ttl=settings.single_flight_ttl)
+    async def get_event_compact(
+            cls, session: AsyncSession, event_id: uuid.UUID
+    ) -> EventCompactDetails:
+        events = await cls.get_event_states(session, (Event.id == event_id,))
+        if not events:
+            raise EventNotFound(event_id)
+
+        return cls.to_compact(*events[0])
+
+    @classmethod
+    async def find_seat_block(
+            cls, session: AsyncSession, data: SeatBlockInput
+    ) -> SeatBlock:
+        if data.count > settings.seat_finder.max_seats:
+            raise BadRequestException(
+                message=f"At most {settings.seat_finder.max_seats} seats"
+                        f" can be found together"
+            )
+
+        events = await cls.get_event_states(
+            session, (Event.id == data.event_id,)
+        )
+        if not events:
+            raise EventNotFound(data.event_id)
+
+        _, layout, occupied = events[0]
+        block = SeatService.find_block(
+            layout, occupied, data.count, data.seat_types
+        )
+        if block is None:
+            raise BadRequestException(
+                message=f"There are no {data.count} free seats together"
+                        f" for the event {data.event_id}"
+            )
+
+        seats, score = block
+        return SeatBlock(event_id=data.event_id, seats=seats, score=score)
+
+    @classmethod
+    async def get_event_states(
+            cls, session: AsyncSession, filters: Iterable
+    ) -> list[tuple]:
+        """
+        Events with the seat layouts of their locations (cached per layout
+        version) and the ids of the occupied seats.
+        """
+        query = cls.get_event_header_query().where(*filters)
+        events = (await session.execute(query)).all()
+        if not events:
+            return []
+
+        occupied = await cls.get_occupied_seats(session, events)
+        layouts = await SeatService.get_layouts(
+            session,
+            {event.location_id: str(event.layout_version) for event in events},
+        )
+        return [
+            (event, layouts[event.location_id], occupied.get(event.id, set()))
+            for event in events
+        ]
+
+    @classmethod
+    async def get_occupied_seats(
+            cls, session: AsyncSession, events: list
+    ) -> dict[uuid.UUID, set[uuid.UUID]]:
+        # the event starts prune the booking partitions
+        query = (
+            select(Booking.event_id, Booking.seat_id)
+            .where(
+                Booking.event_id.in_({event.id for event in events}),
+                Booking.event_start.in_({event.start for event in events}),
+            )
+        )
+        occupied = {}
+        for event_id, seat_id in (await session.execute(query)).all():
+            occupied.setdefault(event_id, set()).add(seat_id)
+        return occupied
+
+    @staticmethod
+    def to_details(
+            event, layout: SeatLayout, occupied: set[uuid.UUID]
+    ) -> EventDetails:
+        return EventDetails(
+            name=event.name,
+            location_id=event.location_id,
+            start=event.start,
+            duration=event.duration,
+            movie_id=event.movie_id,
+            notes=event.notes,
+            participants=event.participants,
+            seats=SeatService.to_seats(layout, occupied),
+        )
+
+    @staticmethod
+    def to_compact(
+            event, layout: SeatLayout, occupied: set[uuid.UUID]
+    ) -> EventCompactDetails:
+        return EventCompactDetails(
+            id=event.id,
+            name=event.name,
+            location_id=event.location_id,
+            start=event.start,
+            duration=event.duration,
+            movie_id=event.movie_id,
+            notes=event.notes,
+            participants=event.participants,
+            layout_version=layout.version,
+            seats_count=len(layout.seat_ids),
+            availability=encode_availability(layout.seat_ids, occupied),
+        )
+
+    @staticmethod
+    def get_event_header_query():
+        return (
+            select(
+                Event.id, Event.name, Event.location_id, Event.start,
+                Event.duration, Event.movie_id, Event.notes,
+                Event.participants,
+                Location.modified.label('layout_version'),
+            )
+            .join(Location, Location.id == Event.location_id)
+        )
+
+    @classmethod
+    async def get_version(cls, session: AsyncSession, event_id: uuid.UUID):
+        query = (
+            select(
+                Event.modified,
+                Location.modified.label('location_modified'),
+                Event.bookings_version,
+                Event.bookings_modified,
+            )
+            .join(Location, Location.id == Event.location_id)
+            .where(Event.id == event_id)
+        )
+        return (await session.execute(query)).first()
+
+    @staticmethod
+    async def bump_bookings_version(
+            session: AsyncSession, *event_ids: uuid.UUID
+    ):
+        """
+        Called by the booking write paths, last before the commit: the
+        row lock orders the writers, so the version and the time only grow.
+        """
+        await session.execute(
+            update(Event)
+            .where(Event.id.in_(sorted(set(event_ids))))
+            .values(
+                bookings_version=Event.bookings_version + 1,
+                bookings_modified=func.greatest(
+                    Event.bookings_modified, func.now()
+                ),
+                # the event itself is not modified
+                modified=Event.modified,
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    @classmethod
+    async def search(
+            cls,
+            session: AsyncSession,
+            text: str,
+            date_from: datetime | None = None,
+            date_to: datetime | None = None,
+            available: bool | None = None,
+            limit: int = 20,
+            offset: int = 0,
+    ) -> list[EventSearchResult]:
+        words = re.findall(r"\w+", text)
+        prefix_query = func.to_tsquery(
+            'simple', ' & '.join(f"{word}:*" for word in words)
+        )
+        text = literal(text)
+
+        matched_locations = (
+            select(Location.id).where(text.op('<%')(Location.name))
+        )
+        matched_movies = (
+            select(PurchasedMovie.movie_id)
+            .where(text.op('<%')(PurchasedMovie.movie_name))
+        )
+        matches = [
+            text.op('<%')(Event.name),
+            Event.location_id.in_(matched_locations),
+            Event.movie_id.in_(matched_movies),
+        ]
+        rank = (
+            func.word_similarity(text, Event.name)
+            + 0.5 * func.word_similarity(text, Location.name)
+            + 0.5 * func.coalesce(
+                func.word_similarity(text, PurchasedMovie.movie_name), 0
+            )
+        )
+        if words:
+            matches.append(Event.search_vector.op('@@')(prefix_query))
+            rank += func.ts_rank(Event.search_vector, prefix_query)
+
+        filters = [or_(*matches)]
+        if date_from:
+            filters.append(Event.start >= date_from)
+        if date_to:
+            filters.append(Event.start <= date_to)
+        if available is not None:
+            free_seats = (
+                select(Seat.id)
+                .where(
+                    Seat.location_id == Event.location_id,
+                    ~(
+                        select(Booking.id)
+                        .where(
+                            Booking.event_id == Event.id,
+                            Booking.event_start == Event.start,
+                            Booking.seat_id == Seat.id,
+                        )
+                        .correlate_except(Booking)
+                        .exists()
+                    ),
+                )
+                .exists()
+            )
+            filters.append(free_seats if available else ~free_seats)
+
+        query = (
+            select(
+                Event.id, Event.name, Event.location_id, Event.start,
+                Event.duration, Event.movie_id, Event.notes,
+                Event.participants,
+                Location.name.label('location_name'),
+                rank.label('rank'),
+            )
+            .join(Location, Location.id == Event.location_id)
+            .outerjoin(
+                PurchasedMovie, PurchasedMovie.movie_id == Event.movie_id
+            )
+            .where(*filters)
+            .order_by(desc('rank'), Event.start, Event.id)
+            .limit(limit)
+            .offset(offset)
+        )
+        events = (await session.execute(query)).all()
+        return [EventSearchResult.from_orm(event) for event in events]
+
+    @classmethod
+    async def get_nearby(
+            cls,
+            session: AsyncSession,
+            latitude: float,
+            longitude: float,
+            radius_km: float,
+            date_from: datetime | None = None,
+            limit: int = 20,
+    ) -> list[EventNearby]:
+        # every location within the radius, the outer limit cuts the events
+        locations = (
+            LocationService.get_nearby_query(latitude, longitude, radius_km)
+            .order_by(None)
+            .subquery()
+        )
+        query = (
+            select(
+                Event.id, Event.name, Event.location_id, Event.start,
+                Event.duration, Event.movie_id, Event.notes,
+                Event.participants,
+                locations.c.name.label('location_name'),
+                locations.c.distance_km,
+            )
+            .join(locations, locations.c.id == Event.location_id)
+            .where(Event.start > (date_from or datetime.utcnow()))
+            .order_by(locations.c.distance_km, Event.start, Event.id)
+            .limit(limit)
+        )
+        events = (await session.execute(query)).all()
+        return [EventNearby.from_orm(event) for event in events]
 
     @classmethod
     async def validate(cls, data: EventInput | EventInput, *args, **kwargs):
-        session, user_id = kwargs['session'], kwargs['user_id']
-        location = await cls.validate_location(
-            session, data.location_id, user_id
+        await cls.validate_event(
+            kwargs['session'], data, kwargs['user_id'], kwargs.get('_id')
+        )
+
+    @classmethod
+    async def validate_event(
+            cls,
+            session: AsyncSession,
+            data: EventInput,
+            user_id: uuid.UUID,
+            _id: uuid.UUID | None = None,
+            check_overlap: bool = True,
+    ):
+        cls.validate_duration(data.start, data.duration)
+        cls.validate_participants(data.participants)
+
+        redis = await get_redis()
+        is_purchased = await PurchasedMovieService.get_cached_access(
+            redis, user_id, data.movie_id
+        )
+        plan = await cls.get_validation_plan(
+            session, data, user_id, _id,
+            check_overlap=check_overlap,
+            check_purchase=is_purchased is None,
+        )
+        await cls.validate_location(plan, data.location_id, user_id)
+        cls.validate_time(data.start, data.duration, plan)
+        cls.validate_capacity(data.participants, plan)
+
+        if is_purchased is None:
+            is_purchased = plan.is_purchased
+            await PurchasedMovieService.cache_entitlements(
+                session, redis, user_id
+            )
+        await cls.validate_movie_access(data.movie_id, is_purchased)
+        return plan
+
+    @classmethod
+    async def create_series(
+            cls, session: AsyncSession, data: EventSeriesInput,
+            user_id: uuid.UUID
+    ) -> EventSeriesResult:
+        starts = cls.get_occurrences(data.event.start, data.recurrence)
+        await cls.validate_event(
+            session, data.event, user_id, check_overlap=False
+        )
+        occupied = await cls.get_occupied_starts(
+            session, data.event.location_id, starts, data.event.duration
+        )
+        conflicts = [
+            OccurrenceConflict(
+                start=start,
+                reason="The location is already occupied for this period",
+            )
+            for start in starts if start in occupied
+        ]
+        if conflicts and not data.skip_conflicts:
+            return EventSeriesResult(created=[], conflicts=conflicts)
+
+        template = data.event.dict()
+        events = [
+            {**template, 'id': uuid.uuid4(), 'start': start, 'host_id': user_id}
+            for start in starts if start not in occupied
+        ]
+        if events:
+            await session.execute(insert(Event).values(events))
+            await EventListingService.refresh(
+                session, (Event.id.in_([event['id'] for event in events]),)
+            )
+            for event in events:
+                OutboxService.add_event(
+                    session, OutboxMessage.EVENT_CREATED, event['id']
+                )
+            await session.commit()
+
+        return EventSeriesResult(
+            created=[EventSchema(**event) for event in events],
+            conflicts=conflicts,
+        )
+
+    @classmethod
+    def get_occurrences(
+            cls, start: datetime, recurrence: RecurrenceRule
+    ) -> list[datetime]:
+        if not recurrence.count and not recurrence.until:
+            raise BadRequestException(
+                message="Either count or until should be set for the series"
+            )
+
+        step = timedelta(days=recurrence.interval)
+        if recurrence.frequency is RecurrenceFrequency.WEEKLY:
+            step = timedelta(weeks=recurrence.interval)
+
+        max_occurrences = settings.series_max_occurrences
+        if recurrence.count and recurrence.count > max_occurrences:
+            raise BadRequestException(
+                message=f"A series can't have more than {max_occurrences} events"
+            )
+
+        occurrences = []
+        for i in itertools.count():
+            occurrence = start + step * i
+            if recurrence.until and occurrence > recurrence.until:
+                break
+            # the weekdays of the steps repeat within a week
+            if i >= 7 and not occurrences:
+                break
+            if (
+                    not recurrence.weekdays
+                    or occurrence.weekday() in recurrence.weekdays
+            ):
+                occurrences.append(occurrence)
+            if len(occurrences) == recurrence.count:
+                break
+            if len(occurrences) > max_occurrences:
+                raise BadRequestException(
+                    message=f"A series can't have more than {max_occurrences}"
+                    f" events, set an earlier until"
+                )
+
+        if not occurrences:
+            raise BadRequestException(
+                message="The recurrence rule doesn't produce any event"
+            )
+        return occurrences
+
+    @classmethod
+    async def get_occupied_starts(
+            cls,
+            session: AsyncSession,
+            location_id: uuid.UUID,
+            starts: list[datetime],
+            duration: int,
+    ) -> set[datetime]:
+        occurrences = (
+            values(column('start', DateTime), name='occurrence')
+            .data([(start,) for start in starts])
         )
-        await cls.validate_time(
-            session, data.start, data.duration, location, kwargs.get('_id')
+        overlap = (
+            select(Event.id)
+            .where(
+                Event.location_id == location_id,
+                Event.start < occurrences.c.start + timedelta(seconds=duration),
+                occurrences.c.start < cls.get_event_finish(),
+            )
+            .exists()
         )
-        await cls.validate_participants(session, data.participants, location.id)
-        await cls.validate_movie_access(session, data.movie_id, user_id)
+        query = select(occurrences.c.start).where(overlap)
+        return set((await session.execute(query)).scalars().all())
+
+    @classmethod
+    async def get_validation_plan(
+            cls,
+            session: AsyncSession,
+            data: EventInput,
+            user_id: uuid.UUID,
+            _id: uuid.UUID | None = None,
+            check_overlap: bool = True,
+            check_purchase: bool = True,
+    ):
+        event_finish = data.start + timedelta(seconds=data.duration)
+        overlap_filters = (
+            Event.location_id == data.location_id,
+            (cast(Event.start, Date) == data.start.date()),
+            data.start < cls.get_event_finish(),
+            Event.start < event_finish,
+        )
+        if _id:
+            overlap_filters += (Event.id != _id,)
+
+        if check_overlap:
+            is_occupied = select(Event.id).where(*overlap_filters).exists()
+        else:
+            is_occupied = false()
+        if check_purchase:
+            is_purchased = PurchasedMovieService.is_purchased_query(
+                user_id, data.movie_id
+            )
+        else:
+            is_purchased = false()
+        query = (
+            select(
+                Location.id, Location.host_id, Location.open, Location.close,
+                Location.capacity,
+                is_occupied.label('is_occupied'),
+                is_purchased.label('is_purchased'),
+            )
+            .where(Location.id == data.location_id)
+        )
+        return (await session.execute(query)).first()
 
     @classmethod
     async def validate_location(
-            cls, session: AsyncSession, _id: uuid.UUID, user_id: uuid.UUID
+            cls, plan, _id: uuid.UUID, user_id: uuid.UUID
     ):
-        location = await LocationService.get_by_id(session, _id)
-        if not location:
+        if not plan:
             raise LocationNotFound(_id)
-        if location.host_id and not await LocationService.is_host(
-                location.host_id, user_id
+        if plan.host_id and not await LocationService.is_host(
+                plan.host_id, user_id
         ):
             raise ForbiddenException(
                 message=f"Only host can organize events at the location {_id}"
             )
-        return location
 
     @classmethod
-    async def validate_time(
-            cls,
-            session: AsyncSession,
-            event_start: datetime,
-            duration: int,
-            location: Location,
-            _id: uuid.UUID | None = None,
-    ):
+    def validate_duration(cls, event_start: datetime, duration: int):
         if duration < settings.minimum_time_interval:
             raise BadRequestException(
                 message="The event should last at least 30 minutes"
@@ -107,123 +621,59 @@ class EventService(BaseService):
                         " in increments of 30 minutes"
             )
 
-        now = datetime.utcnow()
-        event_finish = event_start + timedelta(seconds=duration)
-        if event_start < now:
+        if event_start < datetime.utcnow():
             raise BadRequestException(
                 message="Event can't be organized in the past",
             )
 
+    @classmethod
+    def validate_time(cls, event_start: datetime, duration: int, plan):
+        event_finish = event_start + timedelta(seconds=duration)
         if not (
-                location.close >= event_finish.time()
-                > event_start.time() >= location.open
+                plan.close >= event_finish.time()
+                > event_start.time() >= plan.open
         ):
             raise BadRequestException(
                 message=f"Event can be organized only at working hours:"
-                        f" between {location.open} and {location.close}"
-                        f" for {location.id}",
-            )
-
-        filters = (
-            Event.location_id == location.id,
-            (cast(Event.start, Date) == event_start.date()),
-            event_start < (
-                    Event.start + cast(
-                        cast(Event.duration, String) + " seconds",
-                        Interval
-                    )
-            ),
-            Event.start < event_finish,
-        )
-        if _id:
-            filters += (Event.id != _id,)
+                        f" between {plan.open} and {plan.close}"
+                        f" for {plan.id}",
+            )
 
-        if await cls.get_first(session, filters=filters):
+        if plan.is_occupied:
             raise BadRequestException(
                 message="The location is already occupied for this period",
             )
 
     @classmethod
-    async def validate_participants(
-            cls,
-            session: AsyncSession,
-            participants: int,
-            location_id: uuid.UUID,
-    ):
+    def validate_participants(cls, participants: int):
         if participants <= 0:
             raise BadRequestException(
                 message=f"The event should be organized "
                         f"with at least 1 participant, not {participants}",
             )
 
-        location_capacity = await cls.get_first(
-            session, Location.capacity, (Location.id == location_id,)
-        )
-        if participants > location_capacity:
+    @classmethod
+    def validate_capacity(cls, participants: int, plan):
+        if participants > plan.capacity:
             raise BadRequestException(
-                message=f"The capacity of {location_id} - {location_capacity}."
+                message=f"The capacity of {plan.id} - {plan.capacity}."
                         f" It is not enough for the {participants} people",
             )
 
     @classmethod
     async def validate_movie_access(
-            cls, session: AsyncSession, movie_id: uuid.UUID, user_id: uuid.UUID
+            cls, movie_id: uuid.UUID, is_purchased: bool
     ):
-        response = requests.get(url=settings.free_films_url)
-        if response.status_code != HTTPStatus.OK:
-            raise HTTPException(status_code=response.status_code,
-                                detail=response.text)
-
-        if str(movie_id) in response.json():
+        if is_purchased:
             return
 
-        purchased_movies = await cls.get_purchased_movies(
-            session, filters=(PurchasedMovieHost.c.host_id == user_id,)
-        )
-        if movie_id not in (movie.movie_id for movie in purchased_movies):
+        if str(movie_id) not in await FreeMovieService.get_free_movies():
             raise BadRequestException(
                 message=f"The {movie_id} neither free nor bought",
             )
 
-    @classmethod
-    async def get_purchased_movies(
-            cls, session: AsyncSession, filters: Iterable = ()
-    ) -> list[PurchasedMovie]:
-        stmt = (
-            select(PurchasedMovie)
-            .join(
-                PurchasedMovieHost,
-                PurchasedMovieHost.c.purchased_movie_id == PurchasedMovie.movie_id,
-            )
-            .where(*filters)
-        )
-
-        return (await session.execute(stmt)).scalars().all()
-
     @staticmethod
-    def get_event_query(filters: Iterable):
-        return (
-            select(
-                Event.name, Event.start, Event.duration, Event.host_id,
-                Event.participants, Event.notes, Event.movie_id,
-                Event.location_id,
-                func.array_agg(
-                    func.json_build_object(
-                        'id', Seat.id,
-                        'row', Seat.row,
-                        'seat', Seat.seat,
-                        'type', Seat.type
-                    ), type_=ARRAY(JSON)
-                ).label('seats'),
-            )
-            .select_from(Event)
-            .join(
-                Seat, Seat.location_id == Event.location_id,
-            )
-            .group_by(
-                Event.name, Event.start, Event.duration, Event.host_id,
-                Event.participants, Event.notes, Event.movie_id,
-                Event.location_id
-            )
-            .where(*filters)
+    def get_event_finish():
+        return Event.start + cast(
+            cast(Event.duration, String) + " seconds", Interval
         )
@@ -0,0 +1,245 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime
+from typing import Iterable
+
+from sqlalchemy import Integer, Text, case, cast, delete, func, tuple_, update
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, array, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from booking_api.models.schemas import EventListingItem
+from config.base import settings
+from db.tables import Booking, Event, EventListing, Location, Seat, SeatType
+from db.utils.postgres import async_session
+
+logger = logging.getLogger(__name__)
+
+LISTING_COLUMNS = (
+    "event_id", "name", "start", "duration", "notes", "participants",
+    "movie_id", "location_id", "location_name", "seats", "free_seats",
+    "free_seats_by_type", "refreshed",
+)
+# a row is rewritten only when one of them has changed
+COMPARED_COLUMNS = LISTING_COLUMNS[1:-1]
+
+
+class EventListingService:
+    """
+    Listing of the upcoming events with denormalized location name and
+    free seat counts. The write paths keep it current in their
+    transactions, a periodic rebuild repairs and reports the drift.
+    """
+
+    last_rebuild: datetime | None = None
+    last_drift: int | None = None
+
+    @classmethod
+    async def get_upcoming(
+            cls,
+            session: AsyncSession,
+            date_from: datetime | None = None,
+            date_to: datetime | None = None,
+            location_id: uuid.UUID | None = None,
+            limit: int = 20,
+            offset: int = 0,
+    ) -> list[EventListingItem]:
+        filters = [
+            EventListing.start > datetime.now(), EventListing.free_seats > 0
+        ]
+        if date_from:
+            filters.append(EventListing.start >= date_from)
+        if date_to:
+            filters.append(EventListing.start <= date_to)
+        if location_id:
+            filters.append(EventListing.location_id == location_id)
+
+        query = (
+            select(
+                EventListing.event_id.label("id"), EventListing.name,
+                EventListing.location_id, EventListing.start,
+                EventListing.duration, EventListing.movie_id,
+                EventListing.notes, EventListing.participants,
+                EventListing.location_name, EventListing.seats,
+                EventListing.free_seats, EventListing.free_seats_by_type,
+            )
+            .where(*filters)
+            .order_by(EventListing.start, EventListing.event_id)
+            .limit(limit)
+            .offset(offset)
+        )
+        events = (await session.execute(query)).all()
+        return [EventListingItem.from_orm(event) for event in events]
+
+    @classmethod
+    async def refresh(cls, session: AsyncSession, filters: Iterable) -> int:
+        """
+        Recompute the listing rows of the upcoming events matching the
+        filters, return the number of the rows that were missing or stale.
+        """
+        filters = (*filters, Event.start > datetime.now())
+        # bookings of the events update their rows first or wait for us,
+        # so the counts below can't miss a committed booking
+        await session.execute(
+            select(EventListing.event_id)
+            .join(Event, Event.id == EventListing.event_id)
+            .where(*filters)
+            .order_by(EventListing.event_id)
+            .with_for_update(of=EventListing)
+        )
+
+        query = insert(EventListing).from_select(
+            LISTING_COLUMNS, cls.get_listing_query(filters)
+        )
+        query = query.on_conflict_do_update(
+            index_elements=[EventListing.event_id],
+            set_={column: query.excluded[column] for column in LISTING_COLUMNS[1:]},
+            where=tuple_(
+                *(EventListing.__table__.c[column] for column in COMPARED_COLUMNS)
+            ).is_distinct_from(
+                tuple_(*(query.excluded[column] for column in COMPARED_COLUMNS))
+            ),
+        ).returning(EventListing.event_id)
+        return len((await session.execute(query)).all())
+
+    @classmethod
+    async def change_free_seats(
+            cls,
+            session: AsyncSession,
+            event_id: uuid.UUID,
+            seat_id: uuid.UUID,
+            delta: int,
+    ):
+        """Apply a booked (-1) or released (+1) seat to the event's row."""
+        seat_type = await session.scalar(
+            select(Seat.type).where(Seat.id == seat_id)
+        )
+        if seat_type is None:
+            return
+
+        free_of_type = EventListing.free_seats_by_type[seat_type.name].astext
+        await session.execute(
+            update(EventListing)
+            .where(EventListing.event_id == event_id)
+            .values(
+                free_seats=EventListing.free_seats + delta,
+                free_seats_by_type=func.jsonb_set(
+                    EventListing.free_seats_by_type,
+                    cast(array([seat_type.name]), ARRAY(Text)),
+                    func.to_jsonb(
+                        func.coalesce(cast(free_of_type, Integer), 0) + delta
+                    ),
+                ),
+                refreshed=func.now(),
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+    @classmethod
+    async def run(cls):
+        while True:
+            try:
+                await cls.rebuild()
+            except Exception:
+                logger.exception("Event listing rebuild failed")
+            await asyncio.sleep(settings.listing.rebuild_interval)
+
+    @classmethod
+    async def rebuild(cls):
+        async with async_session() as session:
+            event_ids = (
+                await session.execute(
+                    select(Event.id)
+                    .where(Event.start > datetime.now())
+                    .order_by(Event.id)
+                )
+            ).scalars().all()
+
+        drift = 0
+        batch_size = settings.listing.batch_size
+        for i in range(0, len(event_ids), batch_size):
+            async with async_session() as session, session.begin():
+                # another worker is rebuilding the listing
+                if not await cls.lock(session):
+                    return
+                drift += await cls.refresh(
+                    session, (Event.id.in_(event_ids[i:i + batch_size]),)
+                )
+
+        async with async_session() as session, session.begin():
+            if not await cls.lock(session):
+                return
+            await session.execute(
+                delete(EventListing)
+                .where(EventListing.start <= datetime.now())
+                .execution_options(synchronize_session=False)
+            )
+
+        if drift:
+            logger.warning(f"Event listing drift: {drift} rows were repaired")
+        cls.last_rebuild = datetime.now()
+        cls.last_drift = drift
+
+    @staticmethod
+    async def lock(session: AsyncSession) -> bool:
+        return (
+            await session.execute(
+                select(func.pg_try_advisory_xact_lock(settings.listing.lock_id))
+            )
+        ).scalar()
+
+    @classmethod
+    async def get_size(cls, session: AsyncSession) -> int:
+        return (
+            await session.execute(select(func.count(EventListing.event_id)))
+        ).scalar()
+
+    @staticmethod
+    def get_listing_query(filters: Iterable):
+        seat_type = case(
+            {seat_type.value: seat_type.name for seat_type in SeatType},
+            value=cast(Seat.type, Integer),
+        )
+        seat_counts = (
+            select(
+                Event.id.label("event_id"),
+                seat_type.label("type"),
+                func.count(Seat.id).label("seats"),
+                func.count(Seat.id)
+                .filter(Booking.id.is_(None))
+                .label("free_seats"),
+            )
+            .join(Seat, Seat.location_id == Event.location_id)
+            .outerjoin(
+                Booking,
+                (Booking.event_id == Event.id)
+                & (Booking.event_start == Event.start)
+                & (Booking.seat_id == Seat.id),
+            )
+            .where(*filters)
+            .group_by(Event.id, Seat.type)
+            .subquery()
+        )
+        return (
+            select(
+                Event.id, Event.name, Event.start, Event.duration,
+                Event.notes, Event.participants, Event.movie_id,
+                Event.location_id, Location.name,
+                cast(func.coalesce(func.sum(seat_counts.c.seats), 0), Integer),
+                cast(
+                    func.coalesce(func.sum(seat_counts.c.free_seats), 0), Integer
+                ),
+                func.coalesce(
+                    func.jsonb_object_agg(
+                        seat_counts.c.type, seat_counts.c.free_seats
+                    ).filter(seat_counts.c.type.isnot(None)),
+                    cast("{}", JSONB),
+                ),
+                func.now(),
+            )
+            .join(Location, Location.id == Event.location_id)
+            .outerjoin(seat_counts, seat_counts.c.event_id == Event.id)
+            .where(*filters)
+            .group_by(Event.id, Location.id)
+        )
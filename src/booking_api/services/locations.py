@@ -1,23 +1,84 @@
 import datetime
+import enum
 import uuid
 from typing import Optional
 
-from sqlalchemy import delete
+from sqlalchemy import delete, func
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm import selectinload, with_expression
 
 from booking_api.models.schemas import (
-    LocationEdit, LocationInput, SeatInput
+    FreeSlot, LocationDetails, LocationEdit, LocationInput, LocationNearby,
+    SeatInput
 )
 from booking_api.services.base import BaseService
-from booking_api.utils.exceptions import BadRequestException
-from db.tables import Location, Seat
+from booking_api.services.listing import EventListingService
+from booking_api.utils.exceptions import BadRequestException, LocationNotFound
+from booking_api.utils.single_flight import single_flight
+from booking_api.utils.slots import sweep_free_slots
+from config.base import settings
+from db.tables import Event, Location, Seat
 from db.tables.base import Base
+from db.utils.geo import point_wkt, to_point
+
+
+class LocationLoad(enum.Enum):
+    HEADER = "header"
+    SEAT_MAP = "seat_map"
+    SEAT_COUNT = "seat_count"
 
 
 class LocationService(BaseService):
     model: Base = Location
     instance: str = "location"
 
+    @classmethod
+    async def get_by_id(
+            cls,
+            session: AsyncSession,
+            _id: str | uuid.UUID,
+            model: Base = None,
+            load: LocationLoad = LocationLoad.HEADER,
+    ):
+        if model is not None and model is not Location:
+            return await super().get_by_id(session, _id, model)
+
+        query = cls.get_location_query(load).where(Location.id == _id)
+        return (await session.execute(query)).scalars().first()
+
+    @classmethod
+    @single_flight(ttl=settings.single_flight_ttl)
+    async def get_details(
+            cls, session: AsyncSession, _id: uuid.UUID
+    ) -> LocationDetails | None:
+        location = await cls.get_by_id(session, _id, load=LocationLoad.SEAT_COUNT)
+        return location and LocationDetails.from_orm(location)
+
+    @classmethod
+    async def get_version(cls, session: AsyncSession, _id: uuid.UUID):
+        query = select(Location.modified).where(Location.id == _id)
+        return (await session.execute(query)).first()
+
+    @staticmethod
+    def get_location_query(load: LocationLoad = LocationLoad.HEADER):
+        query = select(Location)
+        if load is LocationLoad.SEAT_MAP:
+            return query.options(selectinload(Location.seats))
+
+        if load is LocationLoad.SEAT_COUNT:
+            seats_count = (
+                select(func.count(Seat.id))
+                .where(Seat.location_id == Location.id)
+                .scalar_subquery()
+            )
+            # a location already in the session gets the count too
+            return query.options(
+                with_expression(Location.seats_count, seats_count)
+            ).execution_options(populate_existing=True)
+
+        return query
+
     @classmethod
     async def create(
             cls, session: AsyncSession, data: LocationInput,
@@ -34,6 +95,102 @@ class LocationService(BaseService):
         await session.execute(delete(Seat).where(Seat.location_id == _id, ))
         return await super().delete(session, _id, user_id)
 
+    @classmethod
+    def prepare_data(cls, data: dict) -> dict:
+        data["point"] = to_point(data["coordinates"])
+        return data
+
+    @staticmethod
+    def get_nearby_query(latitude: float, longitude: float, radius_km: float):
+        point = func.ST_GeogFromText(point_wkt(latitude, longitude))
+        return (
+            select(
+                Location.id, Location.name, Location.coordinates,
+                Location.capacity, Location.open, Location.close,
+                Location.host_id,
+                (func.ST_Distance(Location.point, point) / 1000)
+                .label("distance_km"),
+            )
+            .where(func.ST_DWithin(Location.point, point, radius_km * 1000))
+            .order_by(Location.point.distance_centroid(point))
+        )
+
+    @classmethod
+    async def get_nearby(
+            cls,
+            session: AsyncSession,
+            latitude: float,
+            longitude: float,
+            radius_km: float,
+            limit: int = 20,
+    ) -> list[LocationNearby]:
+        query = cls.get_nearby_query(latitude, longitude, radius_km)
+        locations = (await session.execute(query.limit(limit))).all()
+        return [LocationNearby.from_orm(location) for location in locations]
+
+    @classmethod
+    async def get_free_slots(
+            cls,
+            session: AsyncSession,
+            _id: uuid.UUID,
+            date_from: datetime.date,
+            date_to: datetime.date,
+            min_duration: int,
+    ) -> list[FreeSlot]:
+        if date_to < date_from:
+            raise BadRequestException(
+                message="date_to can't be before date_from"
+            )
+        if (date_to - date_from).days >= settings.free_slots_max_days:
+            raise BadRequestException(
+                message=f"The period can't be longer than"
+                        f" {settings.free_slots_max_days} days"
+            )
+
+        period_start = datetime.datetime.combine(date_from, datetime.time())
+        period_end = datetime.datetime.combine(
+            date_to + datetime.timedelta(days=1), datetime.time()
+        )
+        # one row per event, events last within their day
+        query = (
+            select(
+                Location.open, Location.close, Event.start, Event.duration
+            )
+            .outerjoin(
+                Event,
+                (Event.location_id == Location.id)
+                & (Event.start >= period_start)
+                & (Event.start < period_end),
+            )
+            .where(Location.id == _id)
+            .order_by(Event.start)
+        )
+        rows = (await session.execute(query)).all()
+        if not rows:
+            raise LocationNotFound(_id)
+
+        busy = [
+            (row.start, row.start + datetime.timedelta(seconds=row.duration))
+            for row in rows if row.start is not None
+        ]
+        slots = sweep_free_slots(
+            busy,
+            date_from,
+            date_to,
+            rows[0].open,
+            rows[0].close,
+            step=settings.minimum_time_interval,
+            min_duration=min_duration,
+            not_before=datetime.datetime.utcnow(),
+        )
+        return [
+            FreeSlot(
+                start=start, end=end,
+                duration=int((end - start).total_seconds()),
+            )
+            for start, end in slots
+        ]
+
     @classmethod
     async def prepare_seats_data(
             cls, seats_data: list[SeatInput], location_id: uuid.UUID
@@ -52,7 +209,10 @@ class LocationService(BaseService):
         await cls.validate_name(session, new_name)
 
         db_instance.name = new_name
-        return await cls.save(session, db_instance)
+        await cls.save(session, db_instance, commit=False)
+        await EventListingService.refresh(session, (Event.location_id == _id,))
+        await session.commit()
+        return db_instance
 
     @classmethod
     async def validate(cls, data: LocationInput | LocationEdit, *args, **kwargs):
@@ -0,0 +1,233 @@
+import asyncio
+import logging
+import uuid
+from http import HTTPStatus
+
+import anyio
+import requests
+from fastapi import HTTPException
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from booking_api.models.schemas import PurchasedMovieInput
+from booking_api.services.base import BaseService
+from booking_api.utils.circuit_breaker import CircuitOpenError, get_breaker
+from booking_api.utils.exceptions import (
+    NotFoundException, ServiceUnavailableException
+)
+from config.base import settings
+from db.tables import Host, PurchasedMovie, PurchasedMovieHost
+from db.tables.base import Base
+from db.utils.redis import get_bulk
+from db.utils.shared_cache import shared_cache
+
+logger = logging.getLogger(__name__)
+
+# keeps the set alive in Redis for hosts without any purchased movie
+CACHE_SENTINEL = "-"
+
+# The set is filled only if it's still absent and no purchase was
+# invalidated since the version was read, i.e. before the movies were.
+FILL_SCRIPT = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[1]
+        or redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+for i = 3, #ARGV, 1000 do
+    redis.call('SADD', KEYS[1], unpack(ARGV, i, math.min(i + 999, #ARGV)))
+end
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+
+
+class PurchasedMovieService(BaseService):
+    model: Base = PurchasedMovie
+    instance: str = "purchased movie"
+
+    @staticmethod
+    def cache_key(host_id: uuid.UUID | str) -> str:
+        return f"purchased_movies:{host_id}"
+
+    @staticmethod
+    def is_purchased_query(host_id: uuid.UUID | str, movie_id: uuid.UUID):
+        return (
+            select(PurchasedMovieHost.c.purchased_movie_id)
+            .where(
+                PurchasedMovieHost.c.host_id == host_id,
+                PurchasedMovieHost.c.purchased_movie_id == movie_id,
+            )
+            .exists()
+        )
+
+    @classmethod
+    async def get_cached_access(
+            cls, redis: Redis | None, host_id: uuid.UUID | str,
+            movie_id: uuid.UUID
+    ) -> bool | None:
+        if redis is None:
+            return None
+
+        key = cls.cache_key(host_id)
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                is_cached, is_member = await (
+                    pipe.exists(key).sismember(key, str(movie_id)).execute()
+                )
+        except RedisError as exc:
+            logger.warning(f"Purchased movies cache is unavailable: {exc}")
+            return None
+
+        if not is_cached:
+            return None
+        return bool(is_member)
+
+    @staticmethod
+    def version_key(host_id: uuid.UUID | str) -> str:
+        return f"purchased_movies:{host_id}:version"
+
+    @classmethod
+    async def cache_entitlements(
+            cls, session: AsyncSession, redis: Redis | None,
+            host_id: uuid.UUID | str
+    ):
+        if redis is None:
+            return
+
+        try:
+            version = await redis.get(cls.version_key(host_id)) or b"0"
+        except RedisError as exc:
+            logger.warning(f"Purchased movies cache is unavailable: {exc}")
+            return
+
+        movie_ids = (
+            await session.execute(
+                select(PurchasedMovieHost.c.purchased_movie_id)
+                .where(PurchasedMovieHost.c.host_id == host_id)
+            )
+        ).scalars().all()
+
+        try:
+            await get_bulk(redis).eval(
+                FILL_SCRIPT,
+                2,
+                cls.cache_key(host_id),
+                cls.version_key(host_id),
+                version,
+                settings.purchased_movies_cache_ttl,
+                CACHE_SENTINEL,
+                *map(str, movie_ids),
+            )
+        except RedisError as exc:
+            logger.warning(f"Purchased movies cache is unavailable: {exc}")
+
+    @classmethod
+    async def invalidate(cls, redis: Redis | None, host_id: uuid.UUID | str):
+        """Called after the purchases commit, fills in flight are dropped."""
+        if redis is None:
+            return
+
+        version_key = cls.version_key(host_id)
+        try:
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.incr(version_key)
+                pipe.expire(version_key, 2 * settings.purchased_movies_cache_ttl)
+                pipe.delete(cls.cache_key(host_id))
+                await pipe.execute()
+        except RedisError as exc:
+            logger.warning(f"Purchased movies cache is unavailable: {exc}")
+
+    @classmethod
+    async def bulk_purchase(
+            cls,
+            session: AsyncSession,
+            redis: Redis | None,
+            movies: list[PurchasedMovieInput],
+            host_id: uuid.UUID,
+    ) -> int:
+        if not await session.scalar(select(Host.id).where(Host.id == host_id)):
+            raise NotFoundException(message=f"Host {host_id} was not found")
+
+        movies = list({movie.movie_id: movie for movie in movies}.values())
+        batch_size = settings.purchased_movies_batch_size
+
+        granted = 0
+        for i in range(0, len(movies), batch_size):
+            batch = movies[i:i + batch_size]
+
+            # metadata of the known movies is the catalogue's, kept as is
+            await session.execute(
+                insert(PurchasedMovie)
+                .values([movie.dict() for movie in batch])
+                .on_conflict_do_nothing(index_elements=[PurchasedMovie.movie_id])
+            )
+
+            grants_stmt = (
+                insert(PurchasedMovieHost)
+                .values(
+                    [
+                        {"host_id": host_id, "purchased_movie_id": movie.movie_id}
+                        for movie in batch
+                    ]
+                )
+                .on_conflict_do_nothing(
+                    index_elements=["host_id", "purchased_movie_id"]
+                )
+            )
+            granted += (await session.execute(grants_stmt)).rowcount
+
+        await session.commit()
+        await cls.invalidate(redis, host_id)
+        return granted
+
+    @classmethod
+    async def validate(cls, data, *args, **kwargs):
+        ...
+
+
+class FreeMovieService:
+    shared_key: str = "free_movies"
+    breaker = get_breaker("free_movies")
+    # the last fetched list, served while the catalogue is unavailable
+    stale: list[str] | None = None
+
+    @staticmethod
+    def fetch() -> list[str]:
+        response = requests.get(
+            url=settings.free_films_url,
+            timeout=settings.circuit_breaker.timeouts["free_movies"],
+        )
+        if response.status_code != HTTPStatus.OK:
+            raise HTTPException(status_code=response.status_code,
+                                detail=response.text)
+        return response.json()
+
+    @classmethod
+    async def fetch_guarded(cls) -> list[str]:
+        free_movies = await cls.breaker.call(anyio.to_thread.run_sync, cls.fetch)
+        cls.stale = free_movies
+        return free_movies
+
+    @classmethod
+    async def get_free_movies(cls) -> list[str]:
+        free_movies = shared_cache.get_json(cls.shared_key)
+        if free_movies is not None:
+            return free_movies
+
+        try:
+            return await cls.fetch_guarded()
+        except (
+                CircuitOpenError, HTTPException, asyncio.TimeoutError,
+                requests.RequestException, ValueError,
+        ) as exc:
+            if cls.stale is not None:
+                logger.warning(f"Stale free movies are used: {exc!r}")
+                return cls.stale
+            if isinstance(exc, HTTPException):
+                raise
+            raise ServiceUnavailableException(
+                message="Movie catalogue is unavailable"
+            )
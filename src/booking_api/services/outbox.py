@@ -0,0 +1,175 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime
+
+import orjson
+from redis.exceptions import RedisError
+from sqlalchemy import delete, func, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from config.base import settings
+from booking_api.services.analytics import AnalyticsService
+from db.tables import Booking, Outbox, OutboxMessage
+from db.utils.postgres import async_session
+from db.utils.redis import get_bulk, get_redis
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxService:
+    """
+    Messages are written in the transaction of the change and relayed
+    to the Redis stream afterwards, at least once: consumers deduplicate
+    by the outbox id.
+    """
+
+    relayed = 0
+    last_lag: float | None = None
+
+    @staticmethod
+    def add_booking(
+            session: AsyncSession, message: OutboxMessage, booking: Booking,
+            previous: dict | None = None,
+    ):
+        status = booking.status
+        payload = {
+            "booking_id": str(booking.id),
+            "event_id": str(booking.event_id),
+            "seat_id": str(booking.seat_id),
+            "guest_id": booking.guest_id and str(booking.guest_id),
+            "status": getattr(status, "value", status),
+        }
+        # the values the change replaced
+        if previous:
+            payload["previous"] = previous
+        session.add(
+            Outbox(event_id=booking.event_id, type=message.value, payload=payload)
+        )
+
+    @staticmethod
+    def add_event(
+            session: AsyncSession, message: OutboxMessage, event_id: uuid.UUID
+    ):
+        session.add(
+            Outbox(
+                event_id=event_id,
+                type=message.value,
+                payload={"event_id": str(event_id)},
+            )
+        )
+
+    @classmethod
+    async def run(cls):
+        while True:
+            try:
+                relayed = await cls.relay()
+            except Exception:
+                logger.exception("Outbox relay failed")
+                relayed = 0
+            if relayed < settings.outbox.batch_size:
+                await asyncio.sleep(settings.outbox.poll_interval)
+
+    @classmethod
+    async def relay(cls) -> int:
+        async with async_session() as session, session.begin():
+            # one relaying worker at a time keeps the stream in id order
+            is_leader = (
+                await session.execute(
+                    select(func.pg_try_advisory_xact_lock(settings.outbox.lock_id))
+                )
+            ).scalar()
+            if not is_leader:
+                return 0
+
+            # the rollups are Postgres only, they go on without Redis
+            rolled_up = await cls.roll_up(session)
+            relayed = await cls.publish_batch(session)
+
+        return max(rolled_up, relayed)
+
+    @classmethod
+    async def roll_up(cls, session: AsyncSession) -> int:
+        query = (
+            select(Outbox)
+            .where(Outbox.rolled_up.is_(False))
+            .order_by(Outbox.id)
+            .limit(settings.outbox.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        messages = (await session.execute(query)).scalars().all()
+        if not messages:
+            return 0
+
+        await AnalyticsService.apply(session, messages)
+        await session.execute(
+            update(Outbox)
+            .where(Outbox.id.in_([message.id for message in messages]))
+            .values(rolled_up=True)
+            .execution_options(synchronize_session=False)
+        )
+        return len(messages)
+
+    @classmethod
+    async def publish_batch(cls, session: AsyncSession) -> int:
+        redis = await get_redis()
+        if redis is None:
+            return 0
+
+        query = (
+            select(Outbox)
+            .order_by(Outbox.id)
+            .limit(settings.outbox.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        messages = (await session.execute(query)).scalars().all()
+        if not messages:
+            return 0
+
+        try:
+            await cls.publish(redis, messages)
+        except RedisError as exc:
+            # the rows stay and go again with the next batch
+            logger.warning(f"Outbox relay is postponed: {exc}")
+            return 0
+
+        # rolled up rows only, the others are rolled up first
+        await session.execute(
+            delete(Outbox)
+            .where(
+                Outbox.id.in_([message.id for message in messages]),
+                Outbox.rolled_up.is_(True),
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+        cls.relayed += len(messages)
+        cls.last_lag = (datetime.now() - messages[0].created).total_seconds()
+        return len(messages)
+
+    @staticmethod
+    async def publish(redis, messages: list[Outbox]):
+        async with get_bulk(redis).pipeline(transaction=False) as pipe:
+            for message in messages:
+                pipe.xadd(
+                    settings.outbox.stream,
+                    {
+                        "id": message.id,
+                        "type": message.type,
+                        "event_id": str(message.event_id),
+                        "payload": orjson.dumps(message.payload),
+                        "created": message.created.isoformat(),
+                    },
+                    maxlen=settings.outbox.stream_max_length,
+                    approximate=True,
+                )
+            await pipe.execute()
+
+    @classmethod
+    async def get_backlog(cls, session: AsyncSession):
+        query = select(
+            func.count(Outbox.id).label("pending"),
+            func.min(Outbox.created).label("oldest"),
+        )
+        return (await session.execute(query)).first()
@@ -0,0 +1,208 @@
+import asyncio
+import gzip
+import logging
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import func, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.future import select
+
+from booking_api.utils.exceptions import BadRequestException, NotFoundException
+from config.base import settings
+from db.tables import Booking, Event
+from db.utils.partitions import (
+    add_months, attach_partition_statement, create_partition_statements,
+    list_partitions_query, month_start, parse_partition_name,
+    parse_restored_until, partition_name, restored_comment_statement
+)
+from db.utils.postgres import engine
+
+logger = logging.getLogger(__name__)
+
+
+class PartitionService:
+    """
+    Keeps monthly booking partitions ahead of the events and moves
+    the partitions of long ended events to gzipped CSV archives.
+    """
+
+    table: str = Booking.__tablename__
+    column: str = "event_start"
+
+    @classmethod
+    async def run(cls):
+        while True:
+            try:
+                await cls.maintain()
+            except Exception:
+                logger.exception("Partition maintenance failed")
+            await asyncio.sleep(settings.partitions.maintenance_interval)
+
+    @classmethod
+    async def maintain(cls):
+        async with engine.connect() as conn:
+            # one maintaining worker at a time, the lock lives with the session
+            is_leader = (
+                await conn.execute(
+                    select(func.pg_try_advisory_lock(settings.partitions.lock_id))
+                )
+            ).scalar()
+            await conn.commit()
+            if not is_leader:
+                return
+
+            try:
+                await cls.create_partitions(conn)
+                for name in await cls.get_expired(conn):
+                    await cls.archive(conn, name)
+            finally:
+                await conn.execute(
+                    select(func.pg_advisory_unlock(settings.partitions.lock_id))
+                )
+                await conn.commit()
+
+    @classmethod
+    async def get_partitions(cls, conn: AsyncConnection) -> dict[str, bool]:
+        rows = (await conn.execute(text(list_partitions_query(cls.table)))).all()
+        return {row.name: row.attached for row in rows}
+
+    @classmethod
+    async def create_partitions(cls, conn: AsyncConnection):
+        this_month = month_start(datetime.now())
+        months = {
+            add_months(this_month, offset)
+            for offset in range(settings.partitions.months_ahead + 1)
+        }
+        # events planned further ahead get their partitions too
+        event_months = await conn.execute(
+            select(func.date_trunc("month", Event.start).distinct())
+            .where(Event.start >= this_month)
+        )
+        months.update(month_start(month) for month, in event_months.all())
+        await conn.commit()
+
+        partitions = await cls.get_partitions(conn)
+        for month in sorted(months):
+            if partition_name(cls.table, month) not in partitions:
+                await cls.create_partition(conn, month)
+
+    @classmethod
+    async def create_partition(cls, conn: AsyncConnection, month: date):
+        for statement in create_partition_statements(cls.table, cls.column, month):
+            await conn.execute(text(statement))
+        await conn.commit()
+        logger.info(f"Partition {partition_name(cls.table, month)} is created")
+
+    @classmethod
+    async def get_expired(cls, conn: AsyncConnection) -> list[str]:
+        # months before the retention window, events there are long over
+        cutoff = add_months(
+            month_start(datetime.now()), -settings.partitions.retention_months
+        )
+        today = date.today()
+        rows = (await conn.execute(text(list_partitions_query(cls.table)))).all()
+        return [
+            row.name for row in rows
+            if parse_partition_name(row.name)[1] < cutoff
+            # restored ones are kept until their own deadline
+            and (parse_restored_until(row.comment) or today) <= today
+        ]
+
+    @classmethod
+    async def archive(cls, conn: AsyncConnection, name: str):
+        # detached quickly, the copy doesn't lock the booking table
+        if (await cls.get_partitions(conn)).get(name):
+            await conn.execute(
+                text(f"ALTER TABLE {cls.table} DETACH PARTITION {name}")
+            )
+            await conn.commit()
+
+        path = cls.archive_path(name)
+        tmp_path = path.with_suffix(".tmp")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        driver_connection = (await conn.get_raw_connection()).driver_connection
+        # asyncpg writes the file in a thread
+        with gzip.open(tmp_path, "wb") as file:
+            await driver_connection.copy_from_table(
+                name, output=file, format="csv", header=True
+            )
+        tmp_path.replace(path)
+
+        await conn.execute(text(f"DROP TABLE {name}"))
+        await conn.commit()
+        logger.info(f"Partition {name} is archived to {path}")
+
+    @classmethod
+    async def restore(
+            cls, conn: AsyncConnection, name: str
+    ) -> tuple[int, int, date]:
+        """Restored and dropped bookings and the date the partition is kept to."""
+        parsed = parse_partition_name(name)
+        if not parsed or parsed[0] != cls.table:
+            raise BadRequestException(message=f"{name} isn't a booking partition")
+
+        path = cls.archive_path(name)
+        if not path.exists():
+            raise NotFoundException(message=f"Archive of {name} was not found")
+        if name in await cls.get_partitions(conn):
+            raise BadRequestException(message=f"Partition {name} already exists")
+
+        create, move_default, _ = create_partition_statements(
+            cls.table, cls.column, parsed[1]
+        )
+        restored_until = date.today() + timedelta(
+            days=settings.partitions.restored_days
+        )
+        # one transaction, a failed attach leaves neither table nor rows
+        try:
+            await conn.execute(text(create))
+            driver_connection = (await conn.get_raw_connection()).driver_connection
+            with gzip.open(path, "rb") as file:
+                result = await driver_connection.copy_to_table(
+                    name, source=file, format="csv", header=True
+                )
+            dropped = await cls.drop_orphans(conn, name)
+            await conn.execute(text(move_default))
+            await conn.execute(
+                text(attach_partition_statement(cls.table, parsed[1]))
+            )
+            await conn.execute(text(restored_comment_statement(name, restored_until)))
+            await conn.commit()
+        except DBAPIError as error:
+            await conn.rollback()
+            logger.exception(f"Partition {name} restore failed")
+            raise BadRequestException(
+                message=f"Partition {name} can't be restored: {error.orig}"
+            )
+
+        path.unlink()
+        logger.info(
+            f"Partition {name} is restored from {path} until {restored_until},"
+            f" {dropped} orphaned bookings dropped"
+        )
+        # asyncpg returns the command status, e.g. "COPY 42"
+        return int(result.split()[-1]) - dropped, dropped, restored_until
+
+    @classmethod
+    async def drop_orphans(cls, conn: AsyncConnection, name: str) -> int:
+        """
+        Bookings of the events, seats and guests deleted after the
+        archiving, the cascade would have deleted them. Otherwise
+        the foreign keys fail the attach.
+        """
+        result = await conn.execute(
+            text(
+                f"DELETE FROM {name} b"
+                " WHERE NOT EXISTS (SELECT 1 FROM event e WHERE e.id = b.event_id)"
+                " OR NOT EXISTS (SELECT 1 FROM seat s WHERE s.id = b.seat_id)"
+                " OR b.guest_id IS NOT NULL"
+                " AND NOT EXISTS (SELECT 1 FROM guest g WHERE g.id = b.guest_id)"
+            )
+        )
+        return result.rowcount
+
+    @staticmethod
+    def archive_path(name: str) -> Path:
+        return Path(settings.partitions.archive_dir) / f"{name}.csv.gz"
@@ -0,0 +1,51 @@
+import asyncio
+import logging
+
+import orjson
+from fastapi import HTTPException
+from requests import RequestException
+
+from booking_api.services.movies import FreeMovieService
+from booking_api.services.seats import SeatService
+from booking_api.utils.circuit_breaker import CircuitOpenError
+from config.base import settings
+from db.utils.postgres import async_session
+from db.utils.shared_cache import shared_cache
+
+logger = logging.getLogger(__name__)
+
+
+class ReferenceDataService:
+    """Fills the host's shared cache with the rarely changed data."""
+
+    @classmethod
+    async def run(cls):
+        while True:
+            if shared_cache.is_leader():
+                try:
+                    await cls.publish()
+                except Exception:
+                    logger.exception("Shared cache refill failed")
+            await asyncio.sleep(settings.shared_cache.refresh_interval)
+
+    @classmethod
+    async def publish(cls):
+        items = {}
+        try:
+            free_movies = await FreeMovieService.fetch_guarded()
+        except (
+                CircuitOpenError, HTTPException, RequestException,
+                asyncio.TimeoutError, ValueError,
+        ) as exc:
+            logger.warning(f"Free movies aren't shared: {exc}")
+        else:
+            items[FreeMovieService.shared_key] = orjson.dumps(free_movies)
+
+        async with async_session() as session:
+            versions = await SeatService.get_active_versions(session)
+            layouts = await SeatService.load_layouts(session, versions)
+        for layout in layouts.values():
+            key = SeatService.cache_key(layout.location_id, layout.version)
+            items[key] = layout.json().encode()
+
+        shared_cache.publish(items)
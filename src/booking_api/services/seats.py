@@ -0,0 +1,253 @@
+import logging
+import uuid
+from datetime import datetime
+from typing import Sequence
+
+from pydantic import ValidationError
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from booking_api.models.schemas import SeatLayout, SeatSchema
+from booking_api.services.base import BaseService
+from booking_api.utils.lru import LRUCache
+from booking_api.utils.seat_finder import SeatGrid
+from booking_api.utils.seat_map import decode_rows, encode_rows
+from config.base import settings
+from db.tables import Event, Location, Seat, SeatType
+from db.tables.base import Base
+from db.utils.redis import get_bulk, get_redis
+from db.utils.shared_cache import shared_cache
+
+logger = logging.getLogger(__name__)
+
+
+class SeatService(BaseService):
+    model: Base = Seat
+    instance: str = "seat"
+
+    # layouts are immutable per location version, so cached copies never
+    # go stale: a changed location gets new keys and old ones age out
+    local_layouts = LRUCache(settings.seat_layout_cache_size)
+    grids = LRUCache(settings.seat_layout_cache_size)
+
+    @staticmethod
+    def cache_key(location_id: uuid.UUID, version: str) -> str:
+        return f"seat_layout:{location_id}:{version}"
+
+    @classmethod
+    async def get_layout(
+            cls, session: AsyncSession, location_id: uuid.UUID
+    ) -> SeatLayout | None:
+        version = await cls.get_first(
+            session, Location.modified, (Location.id == location_id,)
+        )
+        if version is None:
+            return None
+
+        layouts = await cls.get_layouts(session, {location_id: str(version)})
+        return layouts[location_id]
+
+    @classmethod
+    async def get_layouts(
+            cls, session: AsyncSession, versions: dict[uuid.UUID, str]
+    ) -> dict[uuid.UUID, SeatLayout]:
+        layouts = {}
+        for location_id, version in versions.items():
+            layout = cls.local_layouts.get((location_id, version))
+            if layout is None:
+                layout = cls.get_shared_layout(location_id, version)
+            if layout is not None:
+                layouts[location_id] = layout
+
+        missing = {
+            location_id: version for location_id, version in versions.items()
+            if location_id not in layouts
+        }
+        if not missing:
+            return layouts
+
+        redis = await get_redis()
+        cached = await cls.get_cached_layouts(redis, missing)
+        loaded = await cls.load_layouts(
+            session,
+            {
+                location_id: version for location_id, version in missing.items()
+                if location_id not in cached
+            },
+        )
+        if loaded:
+            await cls.cache_layouts(redis, loaded.values())
+
+        for layout in (*cached.values(), *loaded.values()):
+            cls.local_layouts.set((layout.location_id, layout.version), layout)
+            layouts[layout.location_id] = layout
+        return layouts
+
+    @classmethod
+    def get_shared_layout(
+            cls, location_id: uuid.UUID, version: str
+    ) -> SeatLayout | None:
+        # parsed once per worker and version, the bounded LRU keeps the
+        # hot layouts only, the snapshot holds all of them for the host
+        value = shared_cache.get_json(cls.cache_key(location_id, version))
+        if value is None:
+            return None
+
+        layout = SeatLayout.parse_obj(value)
+        cls.local_layouts.set((location_id, version), layout)
+        return layout
+
+    @classmethod
+    async def get_active_versions(
+            cls, session: AsyncSession
+    ) -> dict[uuid.UUID, str]:
+        query = (
+            select(Location.id, Location.modified)
+            .where(
+                select(Event.id)
+                .where(
+                    Event.location_id == Location.id,
+                    Event.start > datetime.now(),
+                )
+                .exists()
+            )
+        )
+        return {
+            location_id: str(modified)
+            for location_id, modified in (await session.execute(query)).all()
+        }
+
+    @classmethod
+    async def get_cached_layouts(
+            cls, redis: Redis | None, versions: dict[uuid.UUID, str]
+    ) -> dict[uuid.UUID, SeatLayout]:
+        if redis is None or not versions:
+            return {}
+
+        try:
+            values = await redis.mget(
+                [cls.cache_key(*item) for item in versions.items()]
+            )
+        except RedisError as exc:
+            logger.warning(f"Seat layout cache is unavailable: {exc}")
+            return {}
+
+        layouts = {}
+        for value in values:
+            if value is None:
+                continue
+            try:
+                layout = SeatLayout.parse_raw(value)
+            except ValidationError:
+                continue
+            layouts[layout.location_id] = layout
+        return layouts
+
+    @classmethod
+    async def cache_layouts(cls, redis: Redis | None, layouts):
+        if redis is None:
+            return
+
+        try:
+            async with get_bulk(redis).pipeline(transaction=False) as pipe:
+                for layout in layouts:
+                    pipe.set(
+                        cls.cache_key(layout.location_id, layout.version),
+                        layout.json(),
+                        ex=settings.seat_layout_cache_ttl,
+                    )
+                await pipe.execute()
+        except RedisError as exc:
+            logger.warning(f"Seat layout cache is unavailable: {exc}")
+
+    @classmethod
+    async def load_layouts(
+            cls, session: AsyncSession, versions: dict[uuid.UUID, str]
+    ) -> dict[uuid.UUID, SeatLayout]:
+        if not versions:
+            return {}
+
+        query = (
+            select(Seat.id, Seat.row, Seat.seat, Seat.type, Seat.location_id)
+            .where(Seat.location_id.in_(versions))
+            .order_by(Seat.location_id, Seat.row, Seat.seat, Seat.id)
+        )
+        seats = {location_id: [] for location_id in versions}
+        for seat in (await session.execute(query)).all():
+            seats[seat.location_id].append(seat)
+
+        return {
+            location_id: cls.to_layout(
+                location_id, versions[location_id], location_seats
+            )
+            for location_id, location_seats in seats.items()
+        }
+
+    @staticmethod
+    def to_layout(
+            location_id: uuid.UUID, version: str, seats: Sequence
+    ) -> SeatLayout:
+        return SeatLayout(
+            location_id=location_id,
+            version=version,
+            rows=encode_rows(seats),
+            seat_ids=[seat.id for seat in seats],
+        )
+
+    @staticmethod
+    def to_seats(
+            layout: SeatLayout, occupied: set[uuid.UUID] = frozenset()
+    ) -> list[SeatSchema]:
+        return [
+            SeatSchema(id=seat_id, row=row, seat=seat, type=seat_type)
+            for seat_id, (row, seat, seat_type) in zip(
+                layout.seat_ids, decode_rows(layout.rows)
+            )
+            if seat_id not in occupied
+        ]
+
+    @classmethod
+    def find_block(
+            cls,
+            layout: SeatLayout,
+            occupied: set[uuid.UUID],
+            count: int,
+            seat_types: list[SeatType],
+    ) -> tuple[list[SeatSchema], float] | None:
+        key = (layout.location_id, layout.version)
+        grid = cls.grids.get(key)
+        if grid is None:
+            grid = SeatGrid(layout.rows)
+            cls.grids.set(key, grid)
+
+        ordinals = {seat_id: i for i, seat_id in enumerate(layout.seat_ids)}
+        block = grid.find_block(
+            [ordinals[seat_id] for seat_id in occupied if seat_id in ordinals],
+            count,
+            [seat_type.value for seat_type in seat_types],
+            ideal_row=settings.seat_finder.ideal_row,
+            weights=(
+                settings.seat_finder.type_weight,
+                settings.seat_finder.middle_weight,
+                settings.seat_finder.row_weight,
+            ),
+        )
+        if block is None:
+            return None
+
+        block_ordinals, score = block
+        return [
+            SeatSchema(
+                id=layout.seat_ids[ordinal],
+                row=grid.seats[ordinal][0],
+                seat=grid.seats[ordinal][1],
+                type=grid.seats[ordinal][2],
+            )
+            for ordinal in block_ordinals
+        ], score
+
+    @classmethod
+    async def validate(cls, data, *args, **kwargs):
+        ...
@@ -0,0 +1,236 @@
+import logging
+import os
+import time
+import uuid
+from contextlib import asynccontextmanager
+
+import jwt
+from jwt.exceptions import InvalidTokenError
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from booking_api.models.schemas import WaitingRoomStatus
+from booking_api.utils.exceptions import (
+    BadRequestException, ForbiddenException, NotFoundException
+)
+from config.base import settings
+
+logger = logging.getLogger(__name__)
+
+TOKEN_SCOPE = "admission"
+
+# Every guest gets the next free admission slot, slots are 1/rate seconds
+# apart, so the queue is FIFO and drains at the configured rate.
+JOIN_SCRIPT = """
+local slot = redis.call('ZSCORE', KEYS[1], ARGV[1])
+if slot then
+    return slot
+end
+local now = tonumber(ARGV[2])
+local rate = tonumber(redis.call('HGET', KEYS[2], 'rate'))
+if not rate then
+    return false
+end
+local last_slot = tonumber(redis.call('HGET', KEYS[2], 'last_slot') or '0')
+-- tostring() keeps 14 digits only, the slot has to survive the round
+-- trip exactly: the admission token carries it back to CONSUME_SCRIPT
+slot = string.format('%.17g', math.max(now, last_slot + 1 / rate))
+redis.call('HSET', KEYS[2], 'last_slot', slot)
+redis.call('ZADD', KEYS[1], slot, ARGV[1])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return redis.call('ZSCORE', KEYS[1], ARGV[1])
+"""
+
+# The token is good for the slot it was issued for: the first booking
+# takes the guest out of the queue, a further one has to queue again.
+CONSUME_SCRIPT = """
+local slot = redis.call('ZSCORE', KEYS[1], ARGV[1])
+if not slot or tonumber(slot) ~= tonumber(ARGV[2]) then
+    return 0
+end
+redis.call('ZREM', KEYS[1], ARGV[1])
+return 1
+"""
+
+
+class WaitingRoomService:
+
+    @staticmethod
+    def queue_key(event_id: uuid.UUID) -> str:
+        return f"waiting_room:{event_id}"
+
+    @staticmethod
+    def meta_key(event_id: uuid.UUID) -> str:
+        return f"waiting_room:{event_id}:meta"
+
+    @classmethod
+    async def open(
+            cls, redis: Redis, event_id: uuid.UUID, rate: float | None = None
+    ):
+        if rate is not None and rate <= 0:
+            raise BadRequestException(message="Admission rate should be positive")
+
+        meta_key = cls.meta_key(event_id)
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.hset(
+                meta_key,
+                mapping={"rate": rate or settings.waiting_room.admission_rate},
+            )
+            pipe.expire(meta_key, settings.waiting_room.room_ttl)
+            await pipe.execute()
+
+    @classmethod
+    async def close(cls, redis: Redis, event_id: uuid.UUID):
+        await redis.delete(cls.queue_key(event_id), cls.meta_key(event_id))
+
+    @classmethod
+    async def is_active(cls, redis: Redis | None, event_id: uuid.UUID) -> bool:
+        if redis is None:
+            return False
+
+        try:
+            return bool(await redis.exists(cls.meta_key(event_id)))
+        except RedisError as exc:
+            logger.warning(f"Waiting room is unavailable: {exc}")
+            return False
+
+    @classmethod
+    async def join(
+            cls, redis: Redis, event_id: uuid.UUID, user_id: str
+    ) -> WaitingRoomStatus:
+        slot = await redis.eval(
+            JOIN_SCRIPT,
+            2,
+            cls.queue_key(event_id),
+            cls.meta_key(event_id),
+            user_id,
+            time.time(),
+            settings.waiting_room.room_ttl,
+        )
+        if slot is None:
+            raise NotFoundException(
+                message=f"There is no waiting room for the event {event_id}"
+            )
+        return await cls.get_status(redis, event_id, user_id, float(slot))
+
+    @classmethod
+    async def poll(
+            cls, redis: Redis, event_id: uuid.UUID, user_id: str
+    ) -> WaitingRoomStatus:
+        slot = await redis.zscore(cls.queue_key(event_id), user_id)
+        if slot is None:
+            raise NotFoundException(
+                message=f"User {user_id} isn't in the waiting room"
+                        f" of the event {event_id}"
+            )
+        return await cls.get_status(redis, event_id, user_id, slot)
+
+    @classmethod
+    async def get_status(
+            cls, redis: Redis, event_id: uuid.UUID, user_id: str, slot: float
+    ) -> WaitingRoomStatus:
+        now = time.time()
+        if slot <= now:
+            return WaitingRoomStatus(
+                event_id=event_id,
+                position=0,
+                eta=0,
+                admission_token=cls.issue_token(event_id, user_id, slot),
+            )
+
+        ahead = await redis.zcount(cls.queue_key(event_id), f"({now}", f"({slot}")
+        return WaitingRoomStatus(
+            event_id=event_id, position=ahead + 1, eta=slot - now
+        )
+
+    @staticmethod
+    def issue_token(event_id: uuid.UUID, user_id: str, slot: float) -> str:
+        payload = {
+            "scope": TOKEN_SCOPE,
+            "event_id": str(event_id),
+            "user_id": user_id,
+            "slot": slot,
+            "exp": int(time.time()) + settings.waiting_room.token_ttl,
+        }
+        return jwt.encode(payload, os.getenv("JWT_SECRET"), algorithm="HS256")
+
+    @classmethod
+    @asynccontextmanager
+    async def admit(
+            cls,
+            redis: Redis | None,
+            event_id: uuid.UUID,
+            user_id: str,
+            token: str | None,
+    ):
+        """
+        Consume the admission token for the booking in the block,
+        the guest gets the slot back if the booking fails.
+        """
+        slot = await cls.check_admission(redis, event_id, user_id, token)
+        try:
+            yield
+        except BaseException:
+            if slot is not None:
+                await cls.return_slot(redis, event_id, user_id, slot)
+            raise
+
+    @classmethod
+    async def check_admission(
+            cls,
+            redis: Redis | None,
+            event_id: uuid.UUID,
+            user_id: str,
+            token: str | None,
+    ) -> float | None:
+        """Consume the token, return its slot or None without a waiting room."""
+        if not await cls.is_active(redis, event_id):
+            return None
+
+        try:
+            payload = jwt.decode(
+                token or "", os.getenv("JWT_SECRET"), algorithms=["HS256"]
+            )
+        except InvalidTokenError:
+            payload = {}
+
+        if (
+                payload.get("scope") != TOKEN_SCOPE
+                or payload.get("event_id") != str(event_id)
+                or payload.get("user_id") != str(user_id)
+                or not isinstance(payload.get("slot"), (int, float))
+        ):
+            raise ForbiddenException(
+                message=f"Valid admission token from the waiting room"
+                        f" is required to book the event {event_id}"
+            )
+
+        try:
+            consumed = await redis.eval(
+                CONSUME_SCRIPT,
+                1,
+                cls.queue_key(event_id),
+                str(user_id),
+                repr(float(payload["slot"])),
+            )
+        except RedisError as exc:
+            logger.warning(f"Waiting room is unavailable: {exc}")
+            return None
+
+        if not consumed:
+            raise ForbiddenException(
+                message=f"The admission token was already used, join"
+                        f" the waiting room of the event {event_id} again"
+            )
+        return payload["slot"]
+
+    @classmethod
+    async def return_slot(
+            cls, redis: Redis, event_id: uuid.UUID, user_id: str, slot: float
+    ):
+        try:
+            await redis.zadd(
+                cls.queue_key(event_id), {str(user_id): slot}, nx=True
+            )
+        except RedisError as exc:
+            logger.warning(f"Admission slot wasn't returned: {exc}")
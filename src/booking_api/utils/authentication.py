@@ -8,6 +8,8 @@ from fastapi import HTTPException
 from fastapi.security import HTTPBearer
 from jwt.exceptions import DecodeError
 
+from config.base import settings
+
 
 def get_token_payload(token: str) -> dict[str, Any]:
     try:
@@ -31,4 +33,11 @@ def check_authorization(token):
     return user_id
 
 
+def check_admin(token):
+    user_id = check_authorization(token)
+    if user_id not in settings.admin_ids:
+        raise HTTPException(status_code=HTTPStatus.FORBIDDEN)
+    return user_id
+
+
 security = HTTPBearer()
@@ -0,0 +1,66 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from http import HTTPStatus
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+
+def make_etag(*parts) -> str:
+    version = ":".join(str(part) for part in parts)
+    return f'W/"{hashlib.md5(version.encode()).hexdigest()}"'
+
+
+def latest(*dates: datetime | None) -> datetime | None:
+    return max((date for date in dates if date), default=None)
+
+
+def is_not_modified(
+        request: Request, etag: str, last_modified: datetime | None
+) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        # weak comparison, W/ prefixes are ignored
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag.removeprefix("W/") in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return last_modified.replace(microsecond=0) <= since.replace(tzinfo=None)
+
+    return False
+
+
+def get_cache_headers(
+        etag: str, last_modified: datetime | None, cache_control: str
+) -> dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified:
+        headers["Last-Modified"] = format_datetime(
+            last_modified.replace(tzinfo=timezone.utc), usegmt=True
+        )
+    return headers
+
+
+def conditional_response(
+        request: Request,
+        response: Response,
+        etag: str,
+        last_modified: datetime | None,
+        cache_control: str,
+) -> Response | None:
+    """
+    Return 304 response if the client has the actual version,
+    otherwise add the validators to the response and return None.
+    """
+    headers = get_cache_headers(etag, last_modified, cache_control)
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=HTTPStatus.NOT_MODIFIED, headers=headers)
+
+    response.headers.update(headers)
+    return None
@@ -0,0 +1,142 @@
+import asyncio
+import enum
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, Type
+
+from config.base import settings
+
+logger = logging.getLogger(__name__)
+
+
+class BreakerState(str, enum.Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, name: str):
+        super().__init__(f"Circuit breaker {name} is open")
+
+
+class CircuitBreaker:
+    """
+    Trip when the failure rate of the calls within the window reaches
+    failure_rate, fail fast while open and let a probe call through
+    after reset_timeout: its success closes the breaker again.
+    """
+
+    def __init__(
+            self,
+            name: str,
+            timeout: float | None = None,
+            failures: tuple[Type[BaseException], ...] = (Exception,),
+            open_error: Callable[[str], Exception] = CircuitOpenError,
+    ):
+        self.name = name
+        self.timeout = timeout
+        self.failures = failures
+        self.open_error = open_error
+
+        self.state = BreakerState.CLOSED
+        self.outcomes: deque[tuple[float, bool]] = deque()
+        self.opened_at = 0.0
+        self.probing = False
+        self.rejected = 0
+
+    async def call(self, func: Callable[..., Awaitable], *args, **kwargs):
+        return await self.call_tolerating((), func, *args, **kwargs)
+
+    async def call_tolerating(
+            self,
+            tolerated: tuple[Type[BaseException], ...],
+            func: Callable[..., Awaitable],
+            *args,
+            **kwargs,
+    ):
+        """Like call, but the tolerated errors don't count as failures."""
+        self.before_call()
+        try:
+            if self.timeout:
+                result = await asyncio.wait_for(
+                    func(*args, **kwargs), self.timeout
+                )
+            else:
+                result = await func(*args, **kwargs)
+        except tolerated:
+            self.probing = False
+            raise
+        except self.failures + (asyncio.TimeoutError,):
+            self.record(False)
+            raise
+        except BaseException:
+            # not the dependency's fault, the probe slot is freed
+            self.probing = False
+            raise
+        self.record(True)
+        return result
+
+    def before_call(self):
+        if self.state is BreakerState.OPEN:
+            if time.monotonic() - self.opened_at < settings.circuit_breaker.reset_timeout:
+                self.rejected += 1
+                raise self.open_error(self.name)
+            self.state = BreakerState.HALF_OPEN
+
+        if self.state is BreakerState.HALF_OPEN:
+            if self.probing:
+                self.rejected += 1
+                raise self.open_error(self.name)
+            self.probing = True
+
+    def record(self, success: bool):
+        now = time.monotonic()
+        if self.state is BreakerState.HALF_OPEN:
+            self.probing = False
+            if success:
+                self.close()
+            else:
+                self.open(now)
+            return
+
+        self.outcomes.append((now, success))
+        window_start = now - settings.circuit_breaker.window
+        while self.outcomes and self.outcomes[0][0] < window_start:
+            self.outcomes.popleft()
+
+        if (
+                self.state is BreakerState.CLOSED
+                and len(self.outcomes) >= settings.circuit_breaker.minimum_calls
+                and self.failure_rate >= settings.circuit_breaker.failure_rate
+        ):
+            self.open(now)
+
+    def open(self, now: float):
+        logger.warning(f"Circuit breaker {self.name} is open")
+        self.state = BreakerState.OPEN
+        self.opened_at = now
+        self.outcomes.clear()
+
+    def close(self):
+        logger.info(f"Circuit breaker {self.name} is closed")
+        self.state = BreakerState.CLOSED
+        self.outcomes.clear()
+
+    @property
+    def failure_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        failed = sum(1 for _, success in self.outcomes if not success)
+        return failed / len(self.outcomes)
+
+
+breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(name: str, **kwargs) -> CircuitBreaker:
+    if name not in breakers:
+        kwargs.setdefault("timeout", settings.circuit_breaker.timeouts.get(name))
+        breakers[name] = CircuitBreaker(name, **kwargs)
+    return breakers[name]
@@ -20,6 +20,13 @@ class ForbiddenException(HTTPException):
         super().__init__(status_code=HTTPStatus.FORBIDDEN, detail=message)
 
 
+class ServiceUnavailableException(HTTPException):
+    def __init__(self, message: str):
+        super().__init__(
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE, detail=message
+        )
+
+
 class BookingNotFound(NotFoundException):
     def __init__(self, booking_id: uuid.UUID):
         super().__init__(message=f'Booking {booking_id} was not found')
@@ -0,0 +1,146 @@
+import csv
+import io
+import uuid
+from datetime import datetime
+from typing import Sequence
+
+import orjson
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# name and type of every exported column, in the order of the query
+EXPORT_COLUMNS = (
+    ("booking_id", uuid.UUID),
+    ("status", int),
+    ("created", datetime),
+    ("event_id", uuid.UUID),
+    ("event_name", str),
+    ("event_start", datetime),
+    ("seat_id", uuid.UUID),
+    ("row", int),
+    ("seat", int),
+    ("seat_type", int),
+    ("guest_id", uuid.UUID),
+    ("guest_name", str),
+)
+
+
+class CsvEncoder:
+    media_type = "text/csv"
+    extension = "csv"
+
+    def __init__(self):
+        self.header = True
+
+    def encode(self, rows: Sequence[Sequence]) -> bytes:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if self.header:
+            writer.writerow(name for name, _ in EXPORT_COLUMNS)
+            self.header = False
+        writer.writerows(rows)
+        return buffer.getvalue().encode()
+
+    def finish(self) -> bytes:
+        # an empty export still has the header
+        return self.encode(()) if self.header else b""
+
+
+class NdjsonEncoder:
+    media_type = "application/x-ndjson"
+    extension = "ndjson"
+
+    def encode(self, rows: Sequence[Sequence]) -> bytes:
+        names = [name for name, _ in EXPORT_COLUMNS]
+        return b"".join(
+            orjson.dumps(dict(zip(names, row))) + b"\n" for row in rows
+        )
+
+    def finish(self) -> bytes:
+        return b""
+
+
+class ChunkSink:
+    """Write target of the Parquet writer handing out the written bytes."""
+
+    def __init__(self):
+        self.chunks: list[bytes] = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+class ParquetEncoder:
+    """Every chunk becomes a row group, the footer is written on finish."""
+
+    media_type = "application/vnd.apache.parquet"
+    extension = "parquet"
+
+    def __init__(self):
+        types = {
+            uuid.UUID: pyarrow.string(),
+            int: pyarrow.int32(),
+            datetime: pyarrow.timestamp("us"),
+            str: pyarrow.string(),
+        }
+        self.schema = pyarrow.schema(
+            [(name, types[column_type]) for name, column_type in EXPORT_COLUMNS]
+        )
+        self.sink = ChunkSink()
+        self.writer = pyarrow.parquet.ParquetWriter(
+            pyarrow.PythonFile(self.sink, mode="w"), self.schema,
+            compression="zstd",
+        )
+
+    def encode(self, rows: Sequence[Sequence]) -> bytes:
+        columns = list(zip(*rows)) or [()] * len(EXPORT_COLUMNS)
+        table = pyarrow.table(
+            [
+                [
+                    value if column_type is not uuid.UUID or value is None
+                    else str(value)
+                    for value in column
+                ]
+                for column, (_, column_type) in zip(columns, EXPORT_COLUMNS)
+            ],
+            schema=self.schema,
+        )
+        self.writer.write_table(table)
+        return self.sink.drain()
+
+    def finish(self) -> bytes:
+        self.writer.close()
+        return self.sink.drain()
+
+
+ENCODERS = {
+    "csv": CsvEncoder,
+    "ndjson": NdjsonEncoder,
+    "parquet": ParquetEncoder,
+}
+
+
+def is_available(export_format: str) -> bool:
+    return export_format != "parquet" or pyarrow is not None
@@ -0,0 +1,28 @@
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class LRUCache:
+    """Bounded in-process cache, the least recently used items go first."""
+
+    def __init__(self, max_items: int):
+        self.max_items = max_items
+        self.items: OrderedDict[Hashable, Any] = OrderedDict()
+
+    def get(self, key: Hashable, default=None):
+        if key not in self.items:
+            return default
+        self.items.move_to_end(key)
+        return self.items[key]
+
+    def set(self, key: Hashable, value):
+        self.items[key] = value
+        self.items.move_to_end(key)
+        if len(self.items) > self.max_items:
+            self.items.popitem(last=False)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.items
+
+    def __len__(self) -> int:
+        return len(self.items)
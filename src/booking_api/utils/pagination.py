@@ -0,0 +1,22 @@
+import base64
+import uuid
+from datetime import datetime
+
+import orjson
+
+from booking_api.utils.exceptions import BadRequestException
+
+
+def encode_cursor(start: datetime, _id: uuid.UUID) -> str:
+    """Opaque keyset cursor: the sort key of the last item of the page."""
+    return base64.urlsafe_b64encode(
+        orjson.dumps([start.isoformat(), str(_id)])
+    ).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        start, _id = orjson.loads(base64.urlsafe_b64decode(cursor))
+        return datetime.fromisoformat(start), uuid.UUID(_id)
+    except (ValueError, TypeError):
+        raise BadRequestException(message="Invalid cursor")
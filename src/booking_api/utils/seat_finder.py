@@ -0,0 +1,99 @@
+from typing import Collection, Sequence
+
+import numpy as np
+
+from booking_api.utils.seat_map import decode_rows
+
+
+def window_sums(grid: np.ndarray, width: int) -> np.ndarray:
+    """Sums of every width long window along the rows of the grid."""
+    sums = np.zeros((grid.shape[0], grid.shape[1] + 1), dtype=np.int32)
+    np.cumsum(grid, axis=1, out=sums[:, 1:])
+    return sums[:, width:] - sums[:, :-width]
+
+
+class SeatGrid:
+    """
+    Seats of a layout placed on a row x seat number grid, adjacent
+    cells of a row are the seats with consecutive numbers. Seats
+    without row or number can't be placed and are never offered.
+    """
+
+    def __init__(self, runs: Sequence[Sequence]):
+        self.seats = decode_rows(runs)
+        placed = [
+            (ordinal, row, seat, seat_type)
+            for ordinal, (row, seat, seat_type) in enumerate(self.seats)
+            if row is not None and seat is not None
+        ]
+        self.size = len(self.seats)
+        if not placed:
+            self.ordinals = np.full((0, 0), -1, dtype=np.int32)
+            return
+
+        ordinals, rows, numbers, types = (np.array(column) for column in zip(*placed))
+        self.row_numbers = np.unique(rows)
+        self.cells = (
+            np.searchsorted(self.row_numbers, rows), numbers - numbers.min()
+        )
+        shape = (len(self.row_numbers), int(numbers.max() - numbers.min()) + 1)
+
+        self.placed = ordinals
+        self.ordinals = np.full(shape, -1, dtype=np.int32)
+        self.ordinals[self.cells] = ordinals
+        self.types = np.zeros(shape, dtype=np.int8)
+        self.types[self.cells] = types
+
+        # the middle and the half width of every row, in cells
+        exists = self.ordinals >= 0
+        columns = np.arange(shape[1])
+        first = np.where(exists, columns, shape[1]).min(axis=1)
+        last = np.where(exists, columns, -1).max(axis=1)
+        self.row_middles = (first + last) / 2
+        self.row_half_widths = np.maximum((last - first) / 2, 1)
+
+    def find_block(
+            self,
+            occupied: Collection[int],
+            count: int,
+            preferred_types: Collection[int] = (),
+            ideal_row: float = 0.5,
+            weights: tuple[float, float, float] = (1.0, 1.0, 1.0),
+    ) -> tuple[list[int], float] | None:
+        """
+        The best block of count free adjacent seats and its score:
+        the share of the preferred seat types minus the distance from
+        the middle of the row and from the ideal row (0 - the first row,
+        1 - the last one), every term is within 0..1 and weighted.
+        """
+        rows, columns = self.ordinals.shape
+        if count > columns:
+            return None
+
+        free = np.ones(self.size, dtype=bool)
+        free[list(occupied)] = False
+        free_grid = np.zeros(self.ordinals.shape, dtype=bool)
+        free_grid[self.cells] = free[self.placed]
+        valid = window_sums(free_grid, count) == count
+        if not valid.any():
+            return None
+
+        type_weight, middle_weight, row_weight = weights
+        block_middles = np.arange(columns - count + 1) + (count - 1) / 2
+        off_middle = (
+            np.abs(block_middles[None, :] - self.row_middles[:, None])
+            / self.row_half_widths[:, None]
+        )
+        off_row = np.abs(np.arange(rows) - ideal_row * (rows - 1)) / max(rows - 1, 1)
+        scores = (
+            - middle_weight * np.minimum(off_middle, 1)
+            - row_weight * off_row[:, None]
+        )
+        if preferred_types:
+            preferred = np.isin(self.types, list(preferred_types)) & free_grid
+            scores = scores + type_weight * window_sums(preferred, count) / count
+
+        scores = np.where(valid, scores, -np.inf)
+        row, column = np.unravel_index(np.argmax(scores), scores.shape)
+        block = self.ordinals[row, column:column + count]
+        return block.tolist(), float(scores[row, column])
@@ -0,0 +1,47 @@
+import base64
+import uuid
+from typing import Iterable, Sequence
+
+
+def encode_rows(seats: Sequence) -> list[list]:
+    """
+    Run-length encode seats ordered by row and seat number:
+    every run is [row, first seat, number of seats, seat type],
+    the seat numbers of a run go one by one.
+    """
+    runs = []
+    for seat in seats:
+        seat_type = seat.type.value
+        if runs:
+            row, first, count, run_type = runs[-1]
+            next_seat = None if first is None else first + count
+            if (row, next_seat, run_type) == (seat.row, seat.seat, seat_type):
+                runs[-1][2] += 1
+                continue
+        runs.append([seat.row, seat.seat, 1, seat_type])
+    return runs
+
+
+def encode_availability(
+        seat_ids: Sequence[uuid.UUID], occupied: Iterable[uuid.UUID]
+) -> str:
+    """
+    Base64 bitset indexed by the seat ordinal in the layout,
+    the most significant bit of the first byte is the first seat, 1 is free.
+    """
+    occupied = set(occupied)
+    bitset = bytearray((len(seat_ids) + 7) // 8)
+    for ordinal, seat_id in enumerate(seat_ids):
+        if seat_id not in occupied:
+            bitset[ordinal >> 3] |= 0x80 >> (ordinal & 7)
+    return base64.b64encode(bitset).decode()
+
+
+def decode_rows(runs: Iterable[Sequence]) -> list[tuple]:
+    """Expand row runs back to (row, seat, seat type) in the layout order."""
+    seats = []
+    for row, first, count, seat_type in runs:
+        for offset in range(count):
+            seat = None if first is None else first + offset
+            seats.append((row, seat, seat_type))
+    return seats
@@ -0,0 +1,69 @@
+import asyncio
+import functools
+import time
+from typing import Awaitable, Callable, Hashable
+
+from booking_api.utils.lru import LRUCache
+
+
+class SingleFlight:
+    """
+    Concurrent calls with the same key share one in-flight call,
+    its result is kept for `ttl` seconds after it's done.
+    """
+
+    def __init__(self, ttl: float = 0, max_results: int = 1024):
+        self.ttl = ttl
+        self.calls: dict[Hashable, asyncio.Task] = {}
+        self.results = LRUCache(max_results)
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable]):
+        while True:
+            expires, result = self.results.get(key, (0, None))
+            if expires > time.monotonic():
+                return result
+
+            task = self.calls.get(key)
+            if task is None:
+                task = asyncio.ensure_future(call())
+                self.calls[key] = task
+                task.add_done_callback(functools.partial(self.done, key))
+                # cancelling the leader cancels the call
+                return await task
+
+            try:
+                return await asyncio.shield(task)
+            except asyncio.CancelledError:
+                if not task.cancelled():
+                    raise
+                # the leader went away, the next caller leads the call
+
+    def done(self, key: Hashable, task: asyncio.Task):
+        if self.calls.get(key) is task:
+            del self.calls[key]
+        if self.ttl and not task.cancelled() and task.exception() is None:
+            self.results.set(key, (time.monotonic() + self.ttl, task.result()))
+
+
+def single_flight(ttl: float = 0):
+    """
+    Coalesce concurrent calls of a service read method `(cls, session, *args)`
+    in the worker, the session of the leading call is used.
+
+    Calls are keyed by the arguments after the session and the optional
+    `version` keyword, so results shared within the ttl never outlive the
+    data version seen by the caller. Results are shared, don't mutate them.
+    """
+    def decorator(func):
+        flight = SingleFlight(ttl)
+
+        @functools.wraps(func)
+        async def wrapper(cls, session, *args, version: Hashable = None):
+            return await flight.do(
+                (cls, *args, version), lambda: func(cls, session, *args)
+            )
+
+        wrapper.flight = flight
+        return wrapper
+
+    return decorator
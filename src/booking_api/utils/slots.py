@@ -0,0 +1,60 @@
+from datetime import date, datetime, time, timedelta
+from typing import Iterable
+
+
+def align_up(value: datetime, step: int) -> datetime:
+    """Round up to the step (s) counted from the midnight."""
+    seconds = (value - datetime.combine(value.date(), time())).total_seconds()
+    return value + timedelta(seconds=-seconds % step)
+
+
+def align_down(value: datetime, step: int) -> datetime:
+    seconds = (value - datetime.combine(value.date(), time())).total_seconds()
+    return value - timedelta(seconds=seconds % step)
+
+
+def sweep_free_slots(
+        busy: Iterable[tuple[datetime, datetime]],
+        date_from: date,
+        date_to: date,
+        open_time: time,
+        close_time: time,
+        step: int,
+        min_duration: int,
+        not_before: datetime | None = None,
+) -> list[tuple[datetime, datetime]]:
+    """
+    Free windows of the working hours of every day of the period:
+    a single sweep over the busy intervals ordered by their start,
+    the window bounds are aligned to the step (s) inward.
+    """
+    busy = sorted(busy)
+    slots = []
+    i = 0
+    day = date_from
+    while day <= date_to:
+        cursor = datetime.combine(day, open_time)
+        if not_before and cursor < not_before:
+            cursor = not_before
+        day_close = datetime.combine(day, close_time)
+
+        # intervals ended before the day's hours don't matter anymore
+        while i < len(busy) and busy[i][1] <= cursor:
+            i += 1
+
+        j = i
+        while cursor < day_close:
+            if j < len(busy) and busy[j][0] < day_close:
+                window_end, busy_end = busy[j]
+                j += 1
+            else:
+                window_end, busy_end = day_close, day_close
+
+            start = align_up(cursor, step)
+            end = align_down(min(window_end, day_close), step)
+            if (end - start).total_seconds() >= min_duration:
+                slots.append((start, end))
+            cursor = max(cursor, busy_end)
+
+        day += timedelta(days=1)
+    return slots
@@ -31,12 +31,195 @@ class RedisSettings(BaseSettings):
         env_prefix = "REDIS_"
 
 
+class IdempotencySettings(BaseSettings):
+    header: str = "Idempotency-Key"
+    ttl: int = Field(default=24 * 60 * 60, description="Stored response TTL, s")
+    lock_ttl: int = Field(default=30, description="In-flight lock TTL, s")
+    wait_timeout: float = 10
+    poll_interval: float = 0.05
+
+    class Config:
+        env_prefix = "IDEMPOTENCY_"
+
+
+class WaitingRoomSettings(BaseSettings):
+    admission_rate: float = Field(
+        default=10, gt=0, description="Admissions per second"
+    )
+    token_ttl: int = Field(default=10 * 60, description="Admission token TTL, s")
+    room_ttl: int = Field(default=24 * 60 * 60, description="Queue TTL, s")
+
+    class Config:
+        env_prefix = "WAITING_ROOM_"
+
+
+class RateLimitSettings(BaseSettings):
+    enabled: bool = True
+    rate: float = Field(default=10, description="Requests per second")
+    burst: int = 20
+    # "METHOD /route/path": (rate, burst)
+    routes: dict[str, tuple[float, int]] = {
+        "GET /booking_api/v1/events/": (1, 5),
+        "GET /booking_api/v1/events/search": (2, 10),
+        "GET /booking_api/v1/events/nearby": (2, 10),
+        "GET /booking_api/v1/locations/nearby": (2, 10),
+    }
+    local_buckets: int = Field(
+        default=10_000, description="Buckets kept in memory without Redis"
+    )
+    # addresses or networks of the proxies whose X-Real-IP is trusted
+    trusted_proxies: list[str] = ["127.0.0.1", "::1"]
+
+    class Config:
+        env_prefix = "RATE_LIMIT_"
+
+
+class CompressionSettings(BaseSettings):
+    minimum_size: int = Field(default=1000, description="Smaller bodies, B")
+    gzip_level: int = 6
+    brotli_quality: int = 5
+    zstd_level: int = 3
+    thread_size: int = Field(
+        default=256 * 1024, description="Bigger bodies compress in a thread, B"
+    )
+    cache_size: int = Field(
+        default=64 * 1024 * 1024, description="Pre-compressed bodies cache, B"
+    )
+
+    class Config:
+        env_prefix = "COMPRESSION_"
+
+
+class SharedCacheSettings(BaseSettings):
+    enabled: bool = True
+    path: str = Field(
+        default="/dev/shm/booking_api", description="Directory on tmpfs"
+    )
+    refresh_interval: int = Field(default=60, description="Leader refill, s")
+
+    class Config:
+        env_prefix = "SHARED_CACHE_"
+
+
+class LoadSheddingSettings(BaseSettings):
+    enabled: bool = True
+    # route class: (initial concurrency limit, target latency, s)
+    limits: dict[str, tuple[int, float]] = {
+        "read": (50, 0.25),
+        "booking": (10, 0.5),
+        "write": (10, 0.5),
+    }
+    # route class: concurrency limit kept as is, for streamed responses
+    fixed_limits: dict[str, int] = {"export": 4}
+    min_limit: int = 2
+    max_limit: int = 200
+    backoff_ratio: float = Field(default=0.9, description="Limit decrease")
+    queue_size: int = Field(default=100, description="Waiting requests")
+    queue_timeout: float = Field(
+        default=0.5, description="Time a request may wait to start, s"
+    )
+    retry_after: int = 1
+
+    class Config:
+        env_prefix = "LOAD_SHEDDING_"
+
+
+class CircuitBreakerSettings(BaseSettings):
+    # dependency: call timeout, s
+    timeouts: dict[str, float] = {
+        "free_movies": 2.0, "redis": 0.25, "redis_bulk": 5.0
+    }
+    failure_rate: float = 0.5
+    minimum_calls: int = Field(default=10, description="Calls to trip")
+    window: float = Field(default=30, description="Failure rate window, s")
+    reset_timeout: float = Field(default=5, description="Open state, s")
+
+    class Config:
+        env_prefix = "CIRCUIT_BREAKER_"
+
+
+class OutboxSettings(BaseSettings):
+    stream: str = "booking_events"
+    stream_max_length: int = Field(
+        default=1_000_000, description="Approximate stream trimming"
+    )
+    batch_size: int = 500
+    poll_interval: float = Field(default=1, description="Idle relay pause, s")
+    # advisory lock of the relaying worker
+    lock_id: int = 4_310_001
+
+    class Config:
+        env_prefix = "OUTBOX_"
+
+
+class PartitionSettings(BaseSettings):
+    months_ahead: int = Field(default=12, description="Partitions created ahead")
+    retention_months: int = Field(
+        default=12, description="Months of ended events kept attached"
+    )
+    restored_days: int = Field(
+        default=30, description="Days a restored partition is kept attached"
+    )
+    archive_dir: str = "/var/lib/booking_api/archive"
+    maintenance_interval: int = Field(default=60 * 60, description="s")
+    # advisory lock of the maintaining worker
+    lock_id: int = 4_310_002
+
+    class Config:
+        env_prefix = "PARTITIONS_"
+
+
+class ListingSettings(BaseSettings):
+    rebuild_interval: int = Field(default=10 * 60, description="s")
+    batch_size: int = Field(default=500, description="Events per transaction")
+    # advisory lock of the rebuilding worker
+    lock_id: int = 4_310_003
+
+    class Config:
+        env_prefix = "LISTING_"
+
+
+class SeatFinderSettings(BaseSettings):
+    max_seats: int = Field(default=10, description="Largest block to find")
+    ideal_row: float = Field(
+        default=0.6, description="0 - the first row, 1 - the last one"
+    )
+    type_weight: float = 2.0
+    middle_weight: float = 1.0
+    row_weight: float = 1.0
+
+    class Config:
+        env_prefix = "SEAT_FINDER_"
+
+
 class Settings(BaseSettings):
     project_name = Field("tickets_booker", env="PROJECT_NAME")
     free_films_url = "http://127.0.0.1:8000/booking_api/v1/movies/free_movies"
     minimum_time_interval = 1800
+    purchased_movies_cache_ttl = 3600
+    purchased_movies_batch_size = 1000
+    series_max_occurrences = 366
+    free_slots_max_days = 31
+    export_chunk_size = 5000
+    seat_layout_cache_ttl = 24 * 60 * 60
+    seat_layout_cache_size = 1024
+    single_flight_ttl = 0.3
+    public_cache_control = "public, max-age=2, stale-while-revalidate=10"
+    private_cache_control = "private, no-cache"
+    admin_ids: list[str] = []
     postgres: PostgresConfig = PostgresConfig()
     redis: RedisSettings = RedisSettings()
+    idempotency: IdempotencySettings = IdempotencySettings()
+    waiting_room: WaitingRoomSettings = WaitingRoomSettings()
+    rate_limit: RateLimitSettings = RateLimitSettings()
+    compression: CompressionSettings = CompressionSettings()
+    shared_cache: SharedCacheSettings = SharedCacheSettings()
+    load_shedding: LoadSheddingSettings = LoadSheddingSettings()
+    circuit_breaker: CircuitBreakerSettings = CircuitBreakerSettings()
+    outbox: OutboxSettings = OutboxSettings()
+    partitions: PartitionSettings = PartitionSettings()
+    listing: ListingSettings = ListingSettings()
+    seat_finder: SeatFinderSettings = SeatFinderSettings()
 
 
 @lru_cache
@@ -0,0 +1,76 @@
+"""location point
+
+Revision ID: 1d443b6faa81
+Revises: 72efa6f8af8b
+Create Date: 2026-10-19 11:48:03.402957
+
+"""
+import uuid
+
+import geoalchemy2
+import sqlalchemy as sa
+from alembic import op
+
+from db.utils.geo import parse_coordinates, point_wkt
+
+# revision identifiers, used by Alembic.
+revision = "1d443b6faa81"
+down_revision = "72efa6f8af8b"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS postgis")
+    op.add_column(
+        "location",
+        sa.Column(
+            "point",
+            geoalchemy2.types.Geography(
+                geometry_type="POINT", srid=4326, spatial_index=False
+            ),
+            nullable=True,
+            comment="location point parsed from coordinates",
+        ),
+    )
+    op.create_index(
+        "ix_location_point", "location", ["point"], postgresql_using="gist"
+    )
+    backfill_points()
+
+
+def backfill_points() -> None:
+    conn = op.get_bind()
+    select_batch = sa.text(
+        "SELECT id, coordinates FROM location"
+        " WHERE point IS NULL AND id > :last_id"
+        " ORDER BY id LIMIT :batch_size"
+    )
+    update_point = sa.text(
+        "UPDATE location SET point = ST_GeogFromText(:point) WHERE id = :id"
+    )
+
+    last_id = uuid.UUID(int=0)
+    while True:
+        rows = conn.execute(
+            select_batch, {"last_id": last_id, "batch_size": BATCH_SIZE}
+        ).all()
+        if not rows:
+            break
+
+        points = []
+        for _id, coordinates in rows:
+            parsed = parse_coordinates(coordinates)
+            if parsed:
+                points.append({"id": _id, "point": point_wkt(*parsed)})
+
+        if points:
+            conn.execute(update_point, points)
+        last_id = rows[-1][0]
+
+
+def downgrade() -> None:
+    op.drop_index("ix_location_point", table_name="location")
+    op.drop_column("location", "point")
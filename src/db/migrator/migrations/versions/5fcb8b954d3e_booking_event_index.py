@@ -0,0 +1,24 @@
+"""booking event index
+
+Revision ID: 5fcb8b954d3e
+Revises: 1d443b6faa81
+Create Date: 2026-10-19 13:21:54.672089
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5fcb8b954d3e"
+down_revision = "1d443b6faa81"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_booking_event_id_seat_id", "booking", ["event_id", "seat_id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_booking_event_id_seat_id", table_name="booking")
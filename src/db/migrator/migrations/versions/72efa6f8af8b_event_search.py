@@ -0,0 +1,74 @@
+"""event search
+
+Revision ID: 72efa6f8af8b
+Revises: d9277842daa3
+Create Date: 2026-10-19 11:02:17.530941
+
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "72efa6f8af8b"
+down_revision = "d9277842daa3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column(
+        "event",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('simple', coalesce(name, '')), 'A')"
+                " || setweight(to_tsvector('simple', coalesce(notes, '')), 'B')",
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        "ix_event_search_vector",
+        "event",
+        ["search_vector"],
+        postgresql_using="gin",
+    )
+    op.create_index(
+        "ix_event_name_trgm",
+        "event",
+        ["name"],
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+    op.create_index("ix_event_start", "event", ["start"])
+    op.create_index("ix_event_location_id_start", "event", ["location_id", "start"])
+    op.create_index("ix_event_movie_id", "event", ["movie_id"])
+    op.create_index(
+        "ix_location_name_trgm",
+        "location",
+        ["name"],
+        postgresql_using="gin",
+        postgresql_ops={"name": "gin_trgm_ops"},
+    )
+    op.create_index(
+        "ix_purchased_movie_movie_name_trgm",
+        "purchased_movie",
+        ["movie_name"],
+        postgresql_using="gin",
+        postgresql_ops={"movie_name": "gin_trgm_ops"},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_purchased_movie_movie_name_trgm", table_name="purchased_movie")
+    op.drop_index("ix_location_name_trgm", table_name="location")
+    op.drop_index("ix_event_movie_id", table_name="event")
+    op.drop_index("ix_event_location_id_start", table_name="event")
+    op.drop_index("ix_event_start", table_name="event")
+    op.drop_index("ix_event_name_trgm", table_name="event")
+    op.drop_index("ix_event_search_vector", table_name="event")
+    op.drop_column("event", "search_vector")
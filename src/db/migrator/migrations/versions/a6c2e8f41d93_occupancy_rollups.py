@@ -0,0 +1,109 @@
+"""occupancy rollups
+
+Revision ID: a6c2e8f41d93
+Revises: f1b8d3e60c27
+Create Date: 2026-10-19 18:47:12.903418
+
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "a6c2e8f41d93"
+down_revision = "f1b8d3e60c27"
+branch_labels = None
+depends_on = None
+
+
+def counter_columns() -> list[sa.Column]:
+    return [
+        sa.Column(
+            "seats", sa.Integer(), nullable=False, comment="Number of seats"
+        ),
+        sa.Column(
+            "occupied", sa.Integer(), nullable=False,
+            comment="Seats taken by bookings",
+        ),
+        sa.Column(
+            "reserved", sa.Integer(), nullable=False, comment="Bookings made"
+        ),
+        sa.Column(
+            "booked", sa.Integer(), nullable=False, comment="Bookings confirmed"
+        ),
+        sa.Column(
+            "released", sa.Integer(), nullable=False, comment="Bookings deleted"
+        ),
+    ]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "occupancy_hourly",
+        *counter_columns(),
+        sa.Column("bucket", sa.DateTime(), nullable=False),
+        sa.Column("event_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("seat_type", sa.Integer(), nullable=False),
+        sa.Column("host_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("location_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("movie_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.PrimaryKeyConstraint("bucket", "event_id", "seat_type"),
+    )
+    op.create_index(
+        "ix_occupancy_hourly_host_id_bucket",
+        "occupancy_hourly",
+        ["host_id", "bucket"],
+    )
+    op.create_index(
+        "ix_occupancy_hourly_event_id", "occupancy_hourly", ["event_id"]
+    )
+    op.create_table(
+        "occupancy_daily",
+        *counter_columns(),
+        sa.Column("host_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("bucket", sa.Date(), nullable=False),
+        sa.Column("location_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("movie_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("seat_type", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint(
+            "host_id", "bucket", "location_id", "movie_id", "seat_type"
+        ),
+    )
+
+    # the existing events and bookings, the outbox relay keeps them up
+    # to date from now on: apply with the outbox drained, messages pending
+    # at this point would be counted twice
+    op.execute(
+        "INSERT INTO occupancy_hourly"
+        " (bucket, event_id, seat_type, host_id, location_id, movie_id,"
+        " seats, occupied, reserved, booked, released)"
+        " SELECT date_trunc('hour', e.start), e.id, s.type, e.host_id,"
+        " e.location_id, e.movie_id, count(s.id), count(b.id), count(b.id),"
+        " count(b.id) FILTER (WHERE b.status = 2), 0"
+        " FROM event e"
+        " JOIN seat s ON s.location_id = e.location_id"
+        " LEFT JOIN booking b ON b.event_id = e.id"
+        " AND b.event_start = e.start AND b.seat_id = s.id"
+        " WHERE e.host_id IS NOT NULL"
+        " GROUP BY e.id, s.type"
+    )
+    op.execute(
+        "INSERT INTO occupancy_daily"
+        " (host_id, bucket, location_id, movie_id, seat_type,"
+        " seats, occupied, reserved, booked, released)"
+        " SELECT host_id, bucket::date, location_id, movie_id, seat_type,"
+        " sum(seats), sum(occupied), sum(reserved), sum(booked), sum(released)"
+        " FROM occupancy_hourly"
+        " GROUP BY host_id, bucket::date, location_id, movie_id, seat_type"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("occupancy_daily")
+    op.drop_index(
+        "ix_occupancy_hourly_event_id", table_name="occupancy_hourly"
+    )
+    op.drop_index(
+        "ix_occupancy_hourly_host_id_bucket", table_name="occupancy_hourly"
+    )
+    op.drop_table("occupancy_hourly")
@@ -0,0 +1,27 @@
+"""booking guest index
+
+Revision ID: b5d0e93a71c4
+Revises: a6c2e8f41d93
+Create Date: 2026-10-19 19:12:47.301846
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "b5d0e93a71c4"
+down_revision = "a6c2e8f41d93"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_booking_guest_id_event_start",
+        "booking",
+        ["guest_id", "event_start", "id"],
+        postgresql_include=["event_id", "seat_id", "status"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_booking_guest_id_event_start", table_name="booking")
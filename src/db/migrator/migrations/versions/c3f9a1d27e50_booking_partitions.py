@@ -0,0 +1,122 @@
+"""booking partitions
+
+Revision ID: c3f9a1d27e50
+Revises: b7e1f04c2a93
+Create Date: 2026-10-19 16:40:12.584310
+
+"""
+from datetime import datetime
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+from db.utils.partitions import (
+    add_months, create_partition_statements, default_partition_name,
+    month_start
+)
+
+# revision identifiers, used by Alembic.
+revision = "c3f9a1d27e50"
+down_revision = "b7e1f04c2a93"
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 12
+COLUMNS = "id, seat_id, event_id, guest_id, status, modified, created"
+
+
+def create_booking_table(name: str, partitioned: bool) -> None:
+    columns = [
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("seat_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("event_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("guest_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("status", sa.Integer(), nullable=False),
+        sa.Column("modified", sa.DateTime(), nullable=True),
+        sa.Column("created", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["event_id"], ["event.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["guest_id"], ["guest.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["seat_id"], ["seat.id"], ondelete="CASCADE"),
+    ]
+    if partitioned:
+        columns += [
+            sa.Column(
+                "event_start",
+                sa.DateTime(),
+                nullable=False,
+                comment="start of the event, the partition key",
+            ),
+            sa.PrimaryKeyConstraint("id", "event_start", name="booking_pkey"),
+        ]
+        op.create_table(
+            name, *columns, postgresql_partition_by="RANGE (event_start)"
+        )
+    else:
+        columns.append(sa.PrimaryKeyConstraint("id", name="booking_pkey"))
+        op.create_table(name, *columns)
+
+    op.create_index(
+        "ix_booking_event_id_seat_id", name, ["event_id", "seat_id"]
+    )
+
+
+def replace_booking_table(partitioned: bool, copy_query: str) -> None:
+    op.rename_table("booking", "booking_old")
+    op.execute("ALTER INDEX booking_pkey RENAME TO booking_old_pkey")
+    op.drop_index("ix_booking_event_id_seat_id", table_name="booking_old")
+
+    create_booking_table("booking", partitioned)
+    if partitioned:
+        create_partitions()
+    op.execute(copy_query)
+    op.drop_table("booking_old")
+
+
+def create_partitions() -> None:
+    op.execute(
+        f"CREATE TABLE {default_partition_name('booking')}"
+        f" PARTITION OF booking DEFAULT"
+    )
+
+    # months of the existing events and a year ahead,
+    # PartitionService keeps creating them after that
+    conn = op.get_bind()
+    this_month = month_start(datetime.now())
+    months = {add_months(this_month, offset) for offset in range(MONTHS_AHEAD)}
+    event_months = conn.execute(
+        sa.text(
+            "SELECT DISTINCT date_trunc('month', e.start) FROM event e"
+            " JOIN booking_old b ON b.event_id = e.id"
+        )
+    )
+    months.update(month_start(month) for month, in event_months)
+
+    for month in sorted(months):
+        for statement in create_partition_statements(
+                "booking", "event_start", month
+        ):
+            op.execute(statement)
+
+
+def upgrade() -> None:
+    replace_booking_table(
+        partitioned=True,
+        copy_query=(
+            f"INSERT INTO booking ({COLUMNS}, event_start)"
+            f" SELECT {', '.join(f'b.{column}' for column in COLUMNS.split(', '))},"
+            f" e.start"
+            f" FROM booking_old b JOIN event e ON e.id = b.event_id"
+        ),
+    )
+
+
+def downgrade() -> None:
+    # archived partitions have to be restored before the downgrade
+    replace_booking_table(
+        partitioned=False,
+        copy_query=(
+            f"INSERT INTO booking ({COLUMNS})"
+            f" SELECT {COLUMNS} FROM booking_old"
+        ),
+    )
@@ -0,0 +1,49 @@
+"""event bookings version
+
+Revision ID: c8e4f27a9d15
+Revises: b5d0e93a71c4
+Create Date: 2026-10-20 10:21:08.647913
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c8e4f27a9d15"
+down_revision = "b5d0e93a71c4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "event",
+        sa.Column(
+            "bookings_version",
+            sa.Integer(),
+            server_default="0",
+            nullable=False,
+            comment="Bumped by every change of the event's bookings",
+        ),
+    )
+    op.add_column(
+        "event",
+        sa.Column(
+            "bookings_modified",
+            sa.DateTime(),
+            nullable=True,
+            comment="Last change of the bookings",
+        ),
+    )
+    op.execute(
+        "UPDATE event e SET bookings_version = b.bookings,"
+        " bookings_modified = b.modified"
+        " FROM (SELECT event_id, count(*) AS bookings, max(modified) AS modified"
+        " FROM booking GROUP BY event_id) b"
+        " WHERE b.event_id = e.id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("event", "bookings_modified")
+    op.drop_column("event", "bookings_version")
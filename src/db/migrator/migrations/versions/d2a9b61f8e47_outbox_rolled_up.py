@@ -0,0 +1,36 @@
+"""outbox rolled up
+
+Revision ID: d2a9b61f8e47
+Revises: c8e4f27a9d15
+Create Date: 2026-10-20 14:37:52.118406
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "d2a9b61f8e47"
+down_revision = "c8e4f27a9d15"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # the pending rows were never applied, the relay did it on the way out
+    op.add_column(
+        "outbox",
+        sa.Column(
+            "rolled_up", sa.Boolean(), server_default=sa.false(), nullable=False
+        ),
+    )
+    op.create_index(
+        "ix_outbox_rolled_up",
+        "outbox",
+        ["id"],
+        postgresql_where=sa.text("NOT rolled_up"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_outbox_rolled_up", table_name="outbox")
+    op.drop_column("outbox", "rolled_up")
@@ -0,0 +1,39 @@
+"""purchased movies host index
+
+Revision ID: d9277842daa3
+Revises: 65c5ac7c6ea8
+Create Date: 2026-10-19 10:12:40.118204
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "d9277842daa3"
+down_revision = "65c5ac7c6ea8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        DELETE FROM purchased_movies a
+        USING purchased_movies b
+        WHERE a.ctid < b.ctid
+          AND a.host_id = b.host_id
+          AND a.purchased_movie_id = b.purchased_movie_id
+        """
+    )
+    op.create_index(
+        "ix_purchased_movies_host_id_purchased_movie_id",
+        "purchased_movies",
+        ["host_id", "purchased_movie_id"],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_purchased_movies_host_id_purchased_movie_id",
+        table_name="purchased_movies",
+    )
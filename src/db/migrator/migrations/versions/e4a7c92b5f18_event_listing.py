@@ -0,0 +1,72 @@
+"""event listing
+
+Revision ID: e4a7c92b5f18
+Revises: c3f9a1d27e50
+Create Date: 2026-10-19 17:25:48.201733
+
+"""
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "e4a7c92b5f18"
+down_revision = "c3f9a1d27e50"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # filled by the listing rebuild on the application startup
+    op.create_table(
+        "event_listing",
+        sa.Column("event_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("name", sa.String(), nullable=True),
+        sa.Column(
+            "start", sa.DateTime(), nullable=False,
+            comment="sort key of the listing",
+        ),
+        sa.Column(
+            "duration", sa.Integer(), nullable=False,
+            comment="Event duration, s",
+        ),
+        sa.Column("notes", sa.String(), nullable=True),
+        sa.Column("participants", sa.Integer(), nullable=False),
+        sa.Column("movie_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("location_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("location_name", sa.String(), nullable=False),
+        sa.Column(
+            "seats", sa.Integer(), nullable=False, comment="Number of seats"
+        ),
+        sa.Column("free_seats", sa.Integer(), nullable=False),
+        sa.Column(
+            "free_seats_by_type",
+            postgresql.JSONB(astext_type=sa.Text()),
+            nullable=False,
+            comment="free seats per seat type name",
+        ),
+        sa.Column("refreshed", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["event_id"], ["event.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("event_id"),
+    )
+    op.create_index(
+        "ix_event_listing_available_start",
+        "event_listing",
+        ["start", "event_id"],
+        postgresql_where=sa.text("free_seats > 0"),
+    )
+    op.create_index(
+        "ix_event_listing_location_id_start",
+        "event_listing",
+        ["location_id", "start"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_event_listing_location_id_start", table_name="event_listing"
+    )
+    op.drop_index(
+        "ix_event_listing_available_start", table_name="event_listing"
+    )
+    op.drop_table("event_listing")
@@ -0,0 +1,22 @@
+"""event host index
+
+Revision ID: f1b8d3e60c27
+Revises: e4a7c92b5f18
+Create Date: 2026-10-19 18:04:31.559027
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "f1b8d3e60c27"
+down_revision = "e4a7c92b5f18"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_event_host_id_start", "event", ["host_id", "start"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_event_host_id_start", table_name="event")
@@ -1,7 +1,10 @@
+from db.tables.analytics import OccupancyDaily, OccupancyHourly  # noqa
 from db.tables.booking import Booking, BookingStatus  # noqa
 from db.tables.event import Event  # noqa
+from db.tables.event_listing import EventListing  # noqa
 from db.tables.links import PurchasedMovieHost  # noqa
 from db.tables.location import Location  # noqa
+from db.tables.outbox import Outbox, OutboxMessage  # noqa
 from db.tables.purchased_movie import PurchasedMovie  # noqa
 from db.tables.seat import Seat, SeatType  # noqa
 from db.tables.user import Guest, Host  # noqa
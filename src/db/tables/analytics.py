@@ -0,0 +1,48 @@
+from sqlalchemy import Column, Date, DateTime, Index, Integer
+from sqlalchemy.dialects.postgresql import UUID
+
+from db.tables.base import Base
+
+
+class OccupancyCounters:
+    seats = Column(Integer, default=0, comment="Number of seats", nullable=False)
+    occupied = Column(
+        Integer, default=0, comment="Seats taken by bookings", nullable=False
+    )
+    reserved = Column(Integer, default=0, comment="Bookings made", nullable=False)
+    booked = Column(
+        Integer, default=0, comment="Bookings confirmed", nullable=False
+    )
+    released = Column(
+        Integer, default=0, comment="Bookings deleted", nullable=False
+    )
+
+
+class OccupancyHourly(OccupancyCounters, Base):
+    """Occupancy of every event per seat type, by the hour of its start."""
+
+    __tablename__ = "occupancy_hourly"
+    __table_args__ = (
+        Index("ix_occupancy_hourly_host_id_bucket", "host_id", "bucket"),
+        Index("ix_occupancy_hourly_event_id", "event_id"),
+    )
+
+    bucket = Column(DateTime, primary_key=True)
+    event_id = Column(UUID(as_uuid=True), primary_key=True)
+    seat_type = Column(Integer, primary_key=True)
+    host_id = Column(UUID(as_uuid=True), nullable=False)
+    location_id = Column(UUID(as_uuid=True), nullable=False)
+    movie_id = Column(UUID(as_uuid=True), nullable=False)
+
+
+class OccupancyDaily(OccupancyCounters, Base):
+    """Occupancy of the events per day of their start and seat type."""
+
+    __tablename__ = "occupancy_daily"
+
+    # the primary key serves the host's bucket range scans
+    host_id = Column(UUID(as_uuid=True), primary_key=True)
+    bucket = Column(Date, primary_key=True)
+    location_id = Column(UUID(as_uuid=True), primary_key=True)
+    movie_id = Column(UUID(as_uuid=True), primary_key=True)
+    seat_type = Column(Integer, primary_key=True)
@@ -1,6 +1,6 @@
 import enum
 
-from sqlalchemy import Column, ForeignKey, Integer
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy_utils import ChoiceType
 
@@ -16,6 +16,19 @@ class BookingStatus(enum.Enum):
 
 class Booking(SimplePrimaryKey, TimeStampMixin, Base):
     __tablename__ = 'booking'
+    __table_args__ = (
+        Index("ix_booking_event_id_seat_id", "event_id", "seat_id"),
+        # the guest's booking history is read from the index only
+        Index(
+            "ix_booking_guest_id_event_start",
+            "guest_id",
+            "event_start",
+            "id",
+            postgresql_include=["event_id", "seat_id", "status"],
+        ),
+        # monthly partitions are maintained by PartitionService
+        {"postgresql_partition_by": "RANGE (event_start)"},
+    )
 
     seat_id = Column(
         'seat_id',
@@ -35,6 +48,11 @@ class Booking(SimplePrimaryKey, TimeStampMixin, Base):
         ForeignKey("guest.id", ondelete="CASCADE"),
         nullable=True
     )
+    event_start = Column(
+        DateTime,
+        primary_key=True,
+        comment="start of the event, the partition key",
+    )
     status = Column(
         ChoiceType(BookingStatus, impl=Integer()),
         default=BookingStatus.EMPTY,
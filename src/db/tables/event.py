@@ -1,5 +1,5 @@
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, Computed, DateTime, ForeignKey, Index, Integer, String
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
 from sqlalchemy.orm import relationship
 
 from db.tables.base import Base
@@ -9,18 +9,47 @@ from db.tables.mixins import SimplePrimaryKey, TimeStampMixin
 
 class Event(SimplePrimaryKey, TimeStampMixin, Base):
     __tablename__ = "event"
+    __table_args__ = (
+        Index("ix_event_start", "start"),
+        Index("ix_event_location_id_start", "location_id", "start"),
+        Index("ix_event_movie_id", "movie_id"),
+        Index("ix_event_host_id_start", "host_id", "start"),
+        Index("ix_event_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_event_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+    )
 
     name = Column(String)
     start = Column(DateTime, nullable=False)
     duration = Column(Integer, comment="Event duration, s", nullable=False)
     notes = Column(String, comment="Extra information")
     participants = Column(Integer, comment="Number of participants", nullable=False)
+    bookings_version = Column(
+        Integer,
+        default=0,
+        server_default="0",
+        nullable=False,
+        comment="Bumped by every change of the event's bookings",
+    )
+    bookings_modified = Column(DateTime, comment="Last change of the bookings")
 
     movie_id = Column("movie_id", UUID(as_uuid=True), nullable=False)
     location_id = Column(
         "location_id", UUID(as_uuid=True), ForeignKey("location.id", ondelete="CASCADE")
     )
     host_id = Column(UUID(as_uuid=True), ForeignKey("host.id", ondelete="CASCADE"))
+    search_vector = Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('simple', coalesce(name, '')), 'A')"
+            " || setweight(to_tsvector('simple', coalesce(notes, '')), 'B')",
+            persisted=True,
+        ),
+    )
 
     location = relationship("Location", back_populates="events")
     host = relationship("Host", back_populates="events")
@@ -0,0 +1,39 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, sql
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+from db.tables.base import Base
+
+
+class EventListing(Base):
+    """Read model of the upcoming events, kept by EventListingService."""
+
+    __tablename__ = "event_listing"
+    __table_args__ = (
+        Index(
+            "ix_event_listing_available_start",
+            "start",
+            "event_id",
+            postgresql_where=sql.text("free_seats > 0"),
+        ),
+        Index("ix_event_listing_location_id_start", "location_id", "start"),
+    )
+
+    event_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("event.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    name = Column(String)
+    start = Column(DateTime, comment="sort key of the listing", nullable=False)
+    duration = Column(Integer, comment="Event duration, s", nullable=False)
+    notes = Column(String)
+    participants = Column(Integer, nullable=False)
+    movie_id = Column(UUID(as_uuid=True), nullable=False)
+    location_id = Column(UUID(as_uuid=True), nullable=False)
+    location_name = Column(String, nullable=False)
+    seats = Column(Integer, comment="Number of seats", nullable=False)
+    free_seats = Column(Integer, nullable=False)
+    free_seats_by_type = Column(
+        JSONB, comment="free seats per seat type name", nullable=False
+    )
+    refreshed = Column(DateTime, default=sql.func.now(), nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Table
+from sqlalchemy import Column, ForeignKey, Index, Table
 
 from db.tables.base import Base
 
@@ -9,4 +9,10 @@ PurchasedMovieHost = Table(
     Column(
         "purchased_movie_id", ForeignKey("purchased_movie.movie_id", ondelete="CASCADE")
     ),
+    Index(
+        "ix_purchased_movies_host_id_purchased_movie_id",
+        "host_id",
+        "purchased_movie_id",
+        unique=True,
+    ),
 )
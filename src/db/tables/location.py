@@ -1,6 +1,7 @@
-from sqlalchemy import Column, ForeignKey, Integer, String, Time
+from geoalchemy2 import Geography
+from sqlalchemy import Column, ForeignKey, Index, Integer, String, Time
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import query_expression, relationship
 
 from db.tables.base import Base
 from db.tables.mixins import SimplePrimaryKey, TimeStampMixin
@@ -8,9 +9,22 @@ from db.tables.mixins import SimplePrimaryKey, TimeStampMixin
 
 class Location(SimplePrimaryKey, TimeStampMixin, Base):
     __tablename__ = "location"
+    __table_args__ = (
+        Index("ix_location_point", "point", postgresql_using="gist"),
+        Index(
+            "ix_location_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+    )
 
     name = Column(String, comment="location name", unique=True, nullable=False)
     coordinates = Column(String, comment="location location", nullable=False)
+    point = Column(
+        Geography(geometry_type="POINT", srid=4326, spatial_index=False),
+        comment="location point parsed from coordinates",
+    )
     capacity = Column(Integer, comment="Number of seats", nullable=False)
     open = Column(Time, comment="location opening time", nullable=False)
     close = Column(Time, comment="location closing time", nullable=False)
@@ -18,5 +32,14 @@ class Location(SimplePrimaryKey, TimeStampMixin, Base):
         "host_id", UUID(as_uuid=True), ForeignKey("host.id", ondelete="CASCADE")
     )
 
-    seats = relationship("Seat", back_populates="location", uselist=True, lazy='selectin')
+    seats = relationship(
+        "Seat",
+        back_populates="location",
+        uselist=True,
+        order_by="[Seat.row, Seat.seat]",
+        lazy="raise",
+        passive_deletes=True,
+    )
     events = relationship("Event", back_populates="location", uselist=True)
+
+    seats_count = query_expression()
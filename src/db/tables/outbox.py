@@ -0,0 +1,40 @@
+import enum
+
+from sqlalchemy import (
+    BigInteger, Boolean, Column, DateTime, Identity, Index, String, sql
+)
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+from db.tables.base import Base
+
+
+class OutboxMessage(str, enum.Enum):
+    BOOKING_CREATED = "booking.created"
+    BOOKING_UPDATED = "booking.updated"
+    BOOKING_STATUS_CHANGED = "booking.status_changed"
+    BOOKING_DELETED = "booking.deleted"
+    EVENT_CREATED = "event.created"
+    EVENT_UPDATED = "event.updated"
+    EVENT_DELETED = "event.deleted"
+
+
+class Outbox(Base):
+    __tablename__ = "outbox"
+    __table_args__ = (
+        Index(
+            "ix_outbox_rolled_up",
+            "id",
+            postgresql_where=sql.text("NOT rolled_up"),
+        ),
+    )
+
+    # relayed in id order, so messages of an event keep their order
+    id = Column(BigInteger, Identity(), primary_key=True)
+    event_id = Column(UUID(as_uuid=True), nullable=False)
+    type = Column(String, nullable=False)
+    payload = Column(JSONB, nullable=False)
+    created = Column(DateTime, default=sql.func.now(), nullable=False)
+    # applied to the occupancy rollups, which don't wait for the relay
+    rolled_up = Column(
+        Boolean, default=False, server_default=sql.false(), nullable=False
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Date, String
+from sqlalchemy import Column, Date, Index, String
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -9,6 +9,14 @@ from db.tables.mixins import TimeStampMixin
 
 class PurchasedMovie(TimeStampMixin, Base):
     __tablename__ = "purchased_movie"
+    __table_args__ = (
+        Index(
+            "ix_purchased_movie_movie_name_trgm",
+            "movie_name",
+            postgresql_using="gin",
+            postgresql_ops={"movie_name": "gin_trgm_ops"},
+        ),
+    )
 
     movie_id = Column("movie_id", UUID(as_uuid=True), primary_key=True)
     movie_name = Column(String)
@@ -0,0 +1,35 @@
+import re
+
+from geoalchemy2 import WKTElement
+
+SRID = 4326
+
+# "55.7558, 37.6173", "55.7558 37.6173" or "(55.7558; 37.6173)"
+COORDINATES_RE = re.compile(
+    r"^\s*\(?\s*(-?\d+(?:\.\d+)?)\s*[,;\s]\s*(-?\d+(?:\.\d+)?)\s*\)?\s*$"
+)
+
+
+def parse_coordinates(value: str | None) -> tuple[float, float] | None:
+    """Parse a "latitude, longitude" string, None if it is not one."""
+    match = COORDINATES_RE.match(value or "")
+    if not match:
+        return None
+
+    latitude, longitude = float(match.group(1)), float(match.group(2))
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return None
+    return latitude, longitude
+
+
+def point_wkt(latitude: float, longitude: float) -> str:
+    return f"SRID={SRID};POINT({longitude} {latitude})"
+
+
+def to_point(value: str | None) -> WKTElement | None:
+    coordinates = parse_coordinates(value)
+    if coordinates is None:
+        return None
+
+    latitude, longitude = coordinates
+    return WKTElement(f"POINT({longitude} {latitude})", srid=SRID)
@@ -0,0 +1,82 @@
+import re
+from datetime import date, datetime
+
+PARTITION_RE = re.compile(r"^(?P<table>\w+)_y(?P<year>\d{4})m(?P<month>\d{2})$")
+RESTORED_RE = re.compile(r"^restored until (?P<until>\d{4}-\d{2}-\d{2})$")
+
+
+def month_start(value: date | datetime) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    month = value.year * 12 + value.month - 1 + months
+    return date(month // 12, month % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_y{month.year}m{month.month:02d}"
+
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+
+def parse_partition_name(name: str) -> tuple[str, date] | None:
+    match = PARTITION_RE.match(name)
+    if not match:
+        return None
+    return match["table"], date(int(match["year"]), int(match["month"]), 1)
+
+
+def create_partition_statements(
+        table: str, column: str, month: date
+) -> list[str]:
+    """
+    Create the month partition of the table, the rows of the month that
+    went to the default partition meanwhile are moved into it.
+    """
+    name = partition_name(table, month)
+    start, end = month.isoformat(), add_months(month, 1).isoformat()
+    return [
+        f"CREATE TABLE {name}"
+        f" (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)",
+        f"WITH moved AS ("
+        f"DELETE FROM {default_partition_name(table)}"
+        f" WHERE {column} >= '{start}' AND {column} < '{end}'"
+        f" RETURNING *"
+        f") INSERT INTO {name} SELECT * FROM moved",
+        attach_partition_statement(table, month),
+    ]
+
+
+def attach_partition_statement(table: str, month: date) -> str:
+    start, end = month.isoformat(), add_months(month, 1).isoformat()
+    return (
+        f"ALTER TABLE {table} ATTACH PARTITION {partition_name(table, month)}"
+        f" FOR VALUES FROM ('{start}') TO ('{end}')"
+    )
+
+
+def restored_comment_statement(name: str, until: date) -> str:
+    """Mark a partition restored from the archive, it's kept until then."""
+    return f"COMMENT ON TABLE {name} IS 'restored until {until.isoformat()}'"
+
+
+def parse_restored_until(comment: str | None) -> date | None:
+    match = RESTORED_RE.match(comment or "")
+    if not match:
+        return None
+    return date.fromisoformat(match["until"])
+
+
+def list_partitions_query(table: str) -> str:
+    """Month partitions of the table: attached and left detached."""
+    return (
+        "SELECT c.relname AS name, c.relispartition AS attached,"
+        " obj_description(c.oid, 'pg_class') AS comment"
+        " FROM pg_class c"
+        " WHERE c.relkind = 'r'"
+        f" AND c.relname ~ '^{table}_y[0-9]{{4}}m[0-9]{{2}}$'"
+        " ORDER BY c.relname"
+    )
@@ -1,6 +1,79 @@
 from typing import Optional
 
-from aioredis import Redis
+from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
+from redis.exceptions import ConnectionError, TimeoutError
+
+from booking_api.utils.circuit_breaker import get_breaker
+
+
+class RedisCircuitOpen(ConnectionError):
+    """Raised instead of calling Redis while its breaker is open."""
+
+
+# commands are bounded by the socket timeouts of the pool
+breaker = get_breaker(
+    "redis",
+    timeout=None,
+    failures=(ConnectionError, TimeoutError),
+    open_error=RedisCircuitOpen,
+)
+
+
+class GuardedPipeline(Pipeline):
+
+    async def execute(self, raise_on_error: bool = True):
+        return await breaker.call(super().execute, raise_on_error)
+
+
+class BulkPipeline(Pipeline):
+
+    async def execute(self, raise_on_error: bool = True):
+        return await breaker.call_tolerating(
+            (TimeoutError,), super().execute, raise_on_error
+        )
+
+
+class GuardedRedis(Redis):
+    """Redis client failing fast while Redis is unavailable."""
+
+    # the client for bulk calls, set up on startup
+    bulk: Optional["BulkRedis"] = None
+
+    async def execute_command(self, *args, **options):
+        return await breaker.call(super().execute_command, *args, **options)
+
+    def pipeline(
+            self, transaction: bool = True, shard_hint: Optional[str] = None
+    ) -> GuardedPipeline:
+        return GuardedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
+
+class BulkRedis(Redis):
+    """
+    Redis client for the big pipelines and scripts: its pool has longer
+    socket timeouts and its timeouts don't trip the breaker, a slow bulk
+    write doesn't mean Redis is down for the interactive commands.
+    """
+
+    async def execute_command(self, *args, **options):
+        return await breaker.call_tolerating(
+            (TimeoutError,), super().execute_command, *args, **options
+        )
+
+    def pipeline(
+            self, transaction: bool = True, shard_hint: Optional[str] = None
+    ) -> BulkPipeline:
+        return BulkPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
+
+def get_bulk(client: Redis) -> Redis:
+    return getattr(client, "bulk", None) or client
+
 
 redis: Optional[Redis] = None
 
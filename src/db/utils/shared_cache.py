@@ -0,0 +1,167 @@
+import fcntl
+import logging
+import mmap
+import os
+import struct
+from pathlib import Path
+
+import orjson
+
+from config.base import settings
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"BKSC"
+# magic, snapshot version, index length
+HEADER = struct.Struct("<4sQQ")
+COUNTER = struct.Struct("<Q")
+
+
+class SharedCache:
+    """
+    Read-mostly key-value snapshot shared by the workers of the host.
+
+    The leader (the worker holding the flock) writes a whole new snapshot
+    file, renames it over the old one and bumps the version counter.
+    Readers map the snapshot once per version and return zero-copy
+    memoryviews of the values; mappings of replaced snapshots stay
+    valid while they are referenced.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.data_path = self.directory / "snapshot"
+        self.counter_path = self.directory / "version"
+        self.lock_path = self.directory / "leader.lock"
+
+        self.enabled = False
+        self.version = 0
+        # value offsets are relative to the end of the index
+        self.index: dict[str, list[int]] = {}
+        self.payload_start = 0
+        self.data: mmap.mmap | None = None
+        self.counter: mmap.mmap | None = None
+        self.lock_file = None
+
+    def open(self):
+        if not settings.shared_cache.enabled:
+            return
+
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            fd = os.open(self.counter_path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                if os.fstat(fd).st_size < COUNTER.size:
+                    os.ftruncate(fd, COUNTER.size)
+                self.counter = mmap.mmap(fd, COUNTER.size)
+            finally:
+                os.close(fd)
+        except OSError as exc:
+            logger.warning(f"Shared cache is disabled: {exc}")
+            return
+        self.enabled = True
+
+    def close(self):
+        self.enabled = False
+        if self.lock_file:
+            self.lock_file.close()
+            self.lock_file = None
+        self.index, self.data, self.counter = {}, None, None
+
+    @property
+    def current_version(self) -> int:
+        return COUNTER.unpack_from(self.counter)[0]
+
+    def is_leader(self) -> bool:
+        if not self.enabled:
+            return False
+        if self.lock_file:
+            return True
+
+        lock_file = open(self.lock_path, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        # the lock is held until the process exits
+        self.lock_file = lock_file
+        return True
+
+    def refresh(self):
+        version = self.current_version
+        if version == self.version:
+            return
+
+        try:
+            with open(self.data_path, "rb") as file:
+                data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as exc:
+            logger.warning(f"Shared cache snapshot is unavailable: {exc}")
+            return
+
+        # a truncated or foreign file is a miss until the next snapshot
+        try:
+            magic, snapshot_version, index_length = HEADER.unpack_from(data)
+            if magic != MAGIC:
+                raise ValueError("bad magic")
+            payload_start = HEADER.size + index_length
+            index = orjson.loads(data[HEADER.size:payload_start])
+        except (struct.error, ValueError) as exc:
+            logger.warning(f"Shared cache snapshot is corrupted: {exc}")
+            self.index, self.data = {}, None
+            self.version = version
+            return
+
+        self.payload_start = payload_start
+        self.index = index
+        self.data = data
+        self.version = version
+
+    def get(self, key: str) -> memoryview | None:
+        if not self.enabled:
+            return None
+
+        self.refresh()
+        position = self.index.get(key)
+        if position is None:
+            return None
+
+        offset = self.payload_start + position[0]
+        if offset + position[1] > len(self.data):
+            return None
+        return memoryview(self.data)[offset:offset + position[1]]
+
+    def get_json(self, key: str):
+        value = self.get(key)
+        if value is None:
+            return None
+        try:
+            return orjson.loads(value)
+        except orjson.JSONDecodeError:
+            logger.warning(f"Shared cache value of {key} is corrupted")
+            return None
+
+    def publish(self, items: dict[str, bytes]):
+        """Replace the snapshot, only the leader writes."""
+        if not self.is_leader():
+            return
+
+        version = self.current_version + 1
+        index, offset = {}, 0
+        for key, value in items.items():
+            index[key] = [offset, len(value)]
+            offset += len(value)
+
+        encoded_index = orjson.dumps(index)
+        tmp_path = self.data_path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, version, len(encoded_index)))
+            file.write(encoded_index)
+            for value in items.values():
+                file.write(value)
+        os.replace(tmp_path, self.data_path)
+        COUNTER.pack_into(self.counter, 0, version)
+
+
+shared_cache = SharedCache(settings.shared_cache.path)
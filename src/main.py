@@ -1,12 +1,23 @@
+import asyncio
+
 import uvicorn as uvicorn
 from fastapi import FastAPI
 from fastapi.responses import ORJSONResponse
-from redis.asyncio import ConnectionPool, Redis
+from redis.asyncio import ConnectionPool
 
 from booking_api.api import router as booking_router
+from booking_api.middlewares.compression import CompressionMiddleware
+from booking_api.middlewares.idempotency import IdempotencyMiddleware
+from booking_api.middlewares.load_shedding import LoadSheddingMiddleware
+from booking_api.middlewares.rate_limit import RateLimitMiddleware
+from booking_api.services.listing import EventListingService
+from booking_api.services.outbox import OutboxService
+from booking_api.services.partitions import PartitionService
+from booking_api.services.reference import ReferenceDataService
 from config.base import settings
 from config.logger import LOGGING
 from db.utils import redis
+from db.utils.shared_cache import shared_cache
 
 app = FastAPI(
     title=settings.project_name,
@@ -18,15 +29,50 @@ app = FastAPI(
 
 @app.on_event("startup")
 async def startup():
-    pool = ConnectionPool.from_url(settings.redis.url, max_connections=20)
-    redis.redis = Redis(connection_pool=pool)
+    timeout = settings.circuit_breaker.timeouts["redis"]
+    pool = ConnectionPool.from_url(
+        settings.redis.url,
+        max_connections=20,
+        socket_timeout=timeout,
+        socket_connect_timeout=timeout,
+    )
+    redis.redis = redis.GuardedRedis(connection_pool=pool)
+
+    bulk_timeout = settings.circuit_breaker.timeouts["redis_bulk"]
+    bulk_pool = ConnectionPool.from_url(
+        settings.redis.url,
+        max_connections=5,
+        socket_timeout=bulk_timeout,
+        socket_connect_timeout=timeout,
+    )
+    redis.redis.bulk = redis.BulkRedis(connection_pool=bulk_pool)
+
+    shared_cache.open()
+    app.state.reference_data = asyncio.create_task(ReferenceDataService.run())
+    app.state.outbox_relay = asyncio.create_task(OutboxService.run())
+    app.state.partitions = asyncio.create_task(PartitionService.run())
+    app.state.event_listing = asyncio.create_task(EventListingService.run())
 
 
 @app.on_event("shutdown")
 async def shutdown():
+    app.state.reference_data.cancel()
+    app.state.outbox_relay.cancel()
+    app.state.partitions.cancel()
+    app.state.event_listing.cancel()
+    shared_cache.close()
+    await redis.redis.bulk.close()
     await redis.redis.close()
 
 
+# the last added is the outermost
+app.add_middleware(IdempotencyMiddleware)
+# outside of idempotency, so stored and replayed responses are uncompressed
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(LoadSheddingMiddleware)
+# throttled requests are rejected before they take a load shedding slot
+# and can't drag its concurrency limit down for everyone else
+app.add_middleware(RateLimitMiddleware)
 app.include_router(booking_router.router, prefix="/booking_api")
 
 
@@ -0,0 +1,18 @@
+import os
+
+import fakeredis.aioredis
+import pytest
+
+os.environ.setdefault("JWT_SECRET", "test_secret")
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def redis():
+    client = fakeredis.aioredis.FakeRedis()
+    yield client
+    await client.close()
@@ -0,0 +1,92 @@
+import httpx
+import pytest
+from fastapi import FastAPI, Request
+
+from booking_api.middlewares import idempotency
+from booking_api.middlewares.idempotency import (
+    REPLAY_HEADER, IdempotencyMiddleware,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def calls():
+    return []
+
+
+@pytest.fixture
+async def client(monkeypatch, redis, calls):
+    async def get_redis():
+        return redis
+
+    monkeypatch.setattr(idempotency, "get_redis", get_redis)
+
+    app = FastAPI()
+    app.add_middleware(IdempotencyMiddleware)
+
+    @app.post("/bookings/")
+    async def create_booking(request: Request):
+        calls.append(await request.json())
+        return {"id": len(calls)}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://t") as client:
+        yield client
+
+
+async def test_retry_is_replayed(client, calls):
+    headers = {"Idempotency-Key": "key"}
+
+    first = await client.post("/bookings/", json={"seat": 1}, headers=headers)
+    retry = await client.post("/bookings/", json={"seat": 1}, headers=headers)
+
+    assert first.json() == retry.json() == {"id": 1}
+    assert REPLAY_HEADER not in first.headers
+    assert retry.headers[REPLAY_HEADER] == "true"
+    assert calls == [{"seat": 1}]
+
+
+async def test_key_reused_with_another_body(client, calls):
+    headers = {"Idempotency-Key": "key"}
+
+    await client.post("/bookings/", json={"seat": 1}, headers=headers)
+    response = await client.post("/bookings/", json={"seat": 2}, headers=headers)
+
+    assert response.status_code == 422
+    assert calls == [{"seat": 1}]
+
+
+async def test_keys_are_scoped_by_caller(client, calls):
+    for token in ("a", "b"):
+        await client.post(
+            "/bookings/",
+            json={"seat": 1},
+            headers={"Idempotency-Key": "key", "Authorization": f"Bearer {token}"},
+        )
+
+    assert len(calls) == 2
+
+
+async def test_in_flight_duplicate_conflicts(client, redis, calls, monkeypatch):
+    monkeypatch.setattr(idempotency.settings.idempotency, "wait_timeout", 0)
+    scope = {"type": "http", "method": "POST", "path": "/bookings/", "headers": []}
+    cache_key = IdempotencyMiddleware.get_cache_key(Request(scope), "key")
+    await redis.set(f"{cache_key}:lock", "another request")
+
+    response = await client.post(
+        "/bookings/", json={"seat": 1}, headers={"Idempotency-Key": "key"}
+    )
+
+    assert response.status_code == 409
+    assert calls == []
+
+
+async def test_release_keeps_the_lock_of_another_owner(redis):
+    await redis.set("lock", "new owner")
+
+    await IdempotencyMiddleware.release(redis, "lock", "expired owner")
+    assert await redis.get("lock") == b"new owner"
+
+    await IdempotencyMiddleware.release(redis, "lock", "new owner")
+    assert await redis.get("lock") is None
@@ -0,0 +1,70 @@
+import pytest
+from redis.exceptions import RedisError
+
+from booking_api.services import outbox
+from booking_api.services.outbox import OutboxService
+from db.tables import Outbox
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeSession:
+    def __init__(self, messages):
+        self.messages = messages
+        self.statements = []
+
+    async def execute(self, query):
+        self.statements.append(str(query))
+        messages = self.messages
+
+        class Result:
+            def scalars(self):
+                return self
+
+            def all(self):
+                return messages
+
+        return Result()
+
+
+@pytest.fixture
+def applied(monkeypatch):
+    applied = []
+
+    async def apply(session, messages):
+        applied.extend(messages)
+
+    monkeypatch.setattr(outbox.AnalyticsService, "apply", apply)
+    return applied
+
+
+async def test_rollups_go_on_without_redis(monkeypatch, applied):
+    async def no_redis():
+        return None
+
+    monkeypatch.setattr(outbox, "get_redis", no_redis)
+    message = Outbox(id=1)
+    session = FakeSession([message])
+
+    assert await OutboxService.roll_up(session) == 1
+    assert await OutboxService.publish_batch(session) == 0
+    assert applied == [message]
+    assert not any(s.startswith("DELETE") for s in session.statements)
+
+
+async def test_failed_publish_keeps_rows(monkeypatch, applied):
+    class BrokenRedis:
+        pass
+
+    async def broken_redis():
+        return BrokenRedis()
+
+    async def publish(redis, messages):
+        raise RedisError("down")
+
+    monkeypatch.setattr(outbox, "get_redis", broken_redis)
+    monkeypatch.setattr(OutboxService, "publish", publish)
+    session = FakeSession([Outbox(id=1)])
+
+    assert await OutboxService.publish_batch(session) == 0
+    assert not any(s.startswith("DELETE") for s in session.statements)
@@ -0,0 +1,102 @@
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from booking_api.models.schemas import BookingPeriod
+from booking_api.services.booking import BookingService
+from booking_api.utils.exceptions import BadRequestException
+from booking_api.utils.pagination import decode_cursor, encode_cursor
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeSession:
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    async def execute(self, query):
+        self.statements.append(
+            str(query.compile(dialect=postgresql.dialect()))
+        )
+        rows = self.rows
+
+        class Result:
+            def all(self):
+                return rows
+
+        return Result()
+
+
+def make_booking(start: datetime):
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        event_id=uuid.uuid4(),
+        status=2,
+        seats={"id": uuid.uuid4(), "row": 1, "seat": 1, "type": 1},
+        event_name="Event",
+        event_start=start,
+        event_duration=3600,
+        location_id=uuid.uuid4(),
+        location_name="Location",
+        sort_start=start,
+    )
+
+
+def test_cursor_round_trip():
+    start, _id = datetime(2023, 1, 1, 20, 30, 0, 123456), uuid.uuid4()
+
+    assert decode_cursor(encode_cursor(start, _id)) == (start, _id)
+
+
+@pytest.mark.parametrize(
+    "cursor", ["not a cursor", encode_cursor(datetime.now(), uuid.uuid4())[:-4]]
+)
+def test_invalid_cursor(cursor):
+    with pytest.raises(BadRequestException):
+        decode_cursor(cursor)
+
+
+async def test_next_cursor_is_the_last_item_of_the_page():
+    start = datetime(2023, 1, 1)
+    bookings = [make_booking(start + timedelta(hours=i)) for i in range(3)]
+    session = FakeSession(bookings)
+
+    page = await BookingService.get_bookings(
+        session, uuid.uuid4(), BookingPeriod.UPCOMING, limit=2
+    )
+
+    assert [item.id for item in page.items] == [b.id for b in bookings[:2]]
+    assert decode_cursor(page.next_cursor) == (start + timedelta(hours=1), bookings[1].id)
+    assert "LIMIT %(param_1)s" in session.statements[0]
+
+
+async def test_last_page_has_no_cursor():
+    session = FakeSession([make_booking(datetime(2023, 1, 1))])
+
+    page = await BookingService.get_bookings(session, uuid.uuid4(), limit=2)
+
+    assert len(page.items) == 1
+    assert page.next_cursor is None
+
+
+@pytest.mark.parametrize(
+    "period, comparison, order",
+    [
+        (BookingPeriod.UPCOMING, ">", "booking.event_start, booking.id"),
+        (BookingPeriod.PAST, "<", "booking.event_start DESC, booking.id DESC"),
+        (BookingPeriod.ALL, "<", "booking.event_start DESC, booking.id DESC"),
+    ],
+)
+async def test_cursor_continues_after_the_last_item(period, comparison, order):
+    session = FakeSession([])
+    cursor = encode_cursor(datetime(2023, 1, 1), uuid.uuid4())
+
+    await BookingService.get_bookings(session, uuid.uuid4(), period, cursor=cursor)
+
+    statement = session.statements[0]
+    assert f"(booking.event_start, booking.id) {comparison} (" in statement
+    assert f"ORDER BY {order}" in statement
@@ -0,0 +1,80 @@
+import uuid
+
+import pytest
+
+from booking_api.services.movies import PurchasedMovieService
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeSession:
+    """Returns the host's movies as they are when they're read."""
+
+    def __init__(self, movie_ids, on_read=None):
+        self.movie_ids = movie_ids
+        self.on_read = on_read
+
+    async def execute(self, query):
+        if self.on_read:
+            await self.on_read()
+        movie_ids = list(self.movie_ids)
+
+        class Result:
+            def scalars(self):
+                return self
+
+            def all(self):
+                return movie_ids
+
+        return Result()
+
+
+async def test_entitlements_are_cached(redis):
+    host_id, movie_id = uuid.uuid4(), uuid.uuid4()
+    await PurchasedMovieService.cache_entitlements(
+        FakeSession([movie_id]), redis, host_id
+    )
+
+    assert await PurchasedMovieService.get_cached_access(
+        redis, host_id, movie_id
+    ) is True
+    assert await PurchasedMovieService.get_cached_access(
+        redis, host_id, uuid.uuid4()
+    ) is False
+
+
+async def test_purchase_during_fill_is_not_lost(redis):
+    host_id, movie_id = uuid.uuid4(), uuid.uuid4()
+
+    async def purchase():
+        # committed after the fill read its version, before it wrote
+        await PurchasedMovieService.invalidate(redis, host_id)
+
+    await PurchasedMovieService.cache_entitlements(
+        FakeSession([], on_read=purchase), redis, host_id
+    )
+
+    # the stale set isn't cached, the next check reads the database
+    assert await PurchasedMovieService.get_cached_access(
+        redis, host_id, movie_id
+    ) is None
+
+
+async def test_invalidate_drops_cached_set(redis):
+    host_id, movie_id = uuid.uuid4(), uuid.uuid4()
+    await PurchasedMovieService.cache_entitlements(FakeSession([]), redis, host_id)
+    await PurchasedMovieService.invalidate(redis, host_id)
+
+    assert await PurchasedMovieService.get_cached_access(
+        redis, host_id, movie_id
+    ) is None
+
+
+async def test_large_sets_are_cached(redis):
+    host_id = uuid.uuid4()
+    movie_ids = [uuid.uuid4() for _ in range(2500)]
+    await PurchasedMovieService.cache_entitlements(
+        FakeSession(movie_ids), redis, host_id
+    )
+
+    assert await redis.scard(PurchasedMovieService.cache_key(host_id)) == 2501
@@ -0,0 +1,92 @@
+import ipaddress
+import os
+
+import jwt
+import pytest
+from starlette.requests import Request
+
+from booking_api.middlewares import rate_limit
+from booking_api.middlewares.rate_limit import (
+    TOKEN_BUCKET_SCRIPT, LocalTokenBuckets, RateLimitMiddleware,
+)
+
+pytestmark = pytest.mark.anyio
+
+TRUSTED_PROXIES = [ipaddress.ip_network("10.0.0.0/8")]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: clock[0])
+    return clock
+
+
+def make_request(client_ip: str, headers: dict[str, str] | None = None):
+    return Request(
+        {
+            "type": "http",
+            "client": (client_ip, 1234),
+            "headers": [
+                (name.encode(), value.encode())
+                for name, value in (headers or {}).items()
+            ],
+        }
+    )
+
+
+def test_local_bucket_allows_the_burst(clock):
+    buckets = LocalTokenBuckets(size=10)
+
+    assert [buckets.take("key", rate=1, burst=3) for _ in range(3)] == [0, 0, 0]
+    assert buckets.take("key", rate=1, burst=3) == pytest.approx(1)
+
+
+def test_local_bucket_refills(clock):
+    buckets = LocalTokenBuckets(size=10)
+    for _ in range(2):
+        buckets.take("key", rate=2, burst=2)
+
+    clock[0] += 0.25
+    assert buckets.take("key", rate=2, burst=2) == pytest.approx(0.25)
+    clock[0] += 0.5
+    assert buckets.take("key", rate=2, burst=2) == 0
+
+
+def test_local_buckets_are_bounded(clock):
+    buckets = LocalTokenBuckets(size=2)
+    for key in ("a", "b", "c"):
+        buckets.take(key, rate=1, burst=1)
+
+    assert list(buckets.buckets) == ["b", "c"]
+    # the evicted client starts with a full bucket again
+    assert buckets.take("a", rate=1, burst=1) == 0
+
+
+async def test_redis_bucket(redis):
+    async def take():
+        return float(await redis.eval(TOKEN_BUCKET_SCRIPT, 1, "key", 1, 2))
+
+    assert [await take() for _ in range(2)] == [0, 0]
+    assert 0 < await take() <= 1
+    assert 0 < await redis.ttl("key") <= 3
+
+
+def test_client_is_the_token_user():
+    token = jwt.encode({"user_id": "user"}, os.environ["JWT_SECRET"])
+    request = make_request("10.0.0.1", {"authorization": f"Bearer {token}"})
+
+    assert RateLimitMiddleware.get_client(request, TRUSTED_PROXIES) == "user:user"
+
+
+@pytest.mark.parametrize(
+    "client_ip, client",
+    [
+        ("10.0.0.1", "ip:1.2.3.4"),
+        ("8.8.8.8", "ip:8.8.8.8"),
+    ],
+)
+def test_real_ip_from_trusted_proxies_only(client_ip, client):
+    request = make_request(client_ip, {"x-real-ip": "1.2.3.4"})
+
+    assert RateLimitMiddleware.get_client(request, TRUSTED_PROXIES) == client
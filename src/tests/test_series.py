@@ -0,0 +1,143 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from booking_api.models.schemas import (
+    EventInput, EventSeriesInput, RecurrenceFrequency, RecurrenceRule,
+)
+from booking_api.services import events
+from booking_api.services.events import EventService
+from booking_api.utils.exceptions import BadRequestException
+
+pytestmark = pytest.mark.anyio
+
+START = datetime(2023, 1, 2, 19)  # a Monday
+
+
+class FakeSession:
+    def __init__(self, occupied=()):
+        self.occupied = list(occupied)
+        self.statements = []
+        self.committed = False
+
+    async def execute(self, query):
+        self.statements.append(
+            str(query.compile(dialect=postgresql.dialect()))
+        )
+        occupied = self.occupied
+
+        class Result:
+            def scalars(self):
+                return self
+
+            def all(self):
+                return occupied
+
+        return Result()
+
+    async def commit(self):
+        self.committed = True
+
+
+@pytest.fixture
+def series(monkeypatch):
+    async def validate_event(*args, **kwargs):
+        pass
+
+    async def refresh(*args, **kwargs):
+        pass
+
+    monkeypatch.setattr(EventService, "validate_event", validate_event)
+    monkeypatch.setattr(events.EventListingService, "refresh", refresh)
+    monkeypatch.setattr(events.OutboxService, "add_event", lambda *args: None)
+
+    return EventSeriesInput(
+        event=EventInput(
+            name="Event",
+            location_id=uuid.uuid4(),
+            start=START,
+            duration=2 * 60 * 60,
+            movie_id=uuid.uuid4(),
+            participants=10,
+        ),
+        recurrence=RecurrenceRule(count=3),
+    )
+
+
+def test_occurrences_by_count():
+    rule = RecurrenceRule(count=3, interval=2)
+
+    assert EventService.get_occurrences(START, rule) == [
+        START, START + timedelta(days=2), START + timedelta(days=4)
+    ]
+
+
+def test_occurrences_until_on_weekdays():
+    rule = RecurrenceRule(until=START + timedelta(days=13), weekdays=[0, 2])
+
+    assert EventService.get_occurrences(START, rule) == [
+        START + timedelta(days=days) for days in (0, 2, 7, 9)
+    ]
+
+
+def test_weekly_occurrences():
+    rule = RecurrenceRule(frequency=RecurrenceFrequency.WEEKLY, count=2)
+
+    assert EventService.get_occurrences(START, rule) == [
+        START, START + timedelta(weeks=1)
+    ]
+
+
+@pytest.mark.parametrize(
+    "rule",
+    [
+        RecurrenceRule(),
+        RecurrenceRule(count=1000),
+        RecurrenceRule(until=START + timedelta(days=1000)),
+        # weekly from a Monday never lands on a Tuesday
+        RecurrenceRule(
+            frequency=RecurrenceFrequency.WEEKLY, weekdays=[1], count=3
+        ),
+    ],
+)
+def test_invalid_series(rule):
+    with pytest.raises(BadRequestException):
+        EventService.get_occurrences(START, rule)
+
+
+async def test_occupied_starts_overlap_the_event():
+    session = FakeSession()
+
+    await EventService.get_occupied_starts(
+        session, uuid.uuid4(), [START, START + timedelta(days=1)], 3600
+    )
+
+    statement = session.statements[0]
+    assert "FROM (VALUES" in statement
+    assert "event.start < occurrence.start + %(start_1)s" in statement
+    assert "occurrence.start < event.start + " in statement
+
+
+async def test_conflicts_are_reported(series):
+    session = FakeSession(occupied=[START + timedelta(days=1)])
+
+    result = await EventService.create_series(session, series, uuid.uuid4())
+
+    assert result.created == []
+    assert [c.start for c in result.conflicts] == [START + timedelta(days=1)]
+    assert not session.committed
+
+
+async def test_conflicts_are_skipped(series):
+    series.skip_conflicts = True
+    session = FakeSession(occupied=[START + timedelta(days=1)])
+
+    result = await EventService.create_series(session, series, uuid.uuid4())
+
+    assert [event.start for event in result.created] == [
+        START, START + timedelta(days=2)
+    ]
+    assert [c.start for c in result.conflicts] == [START + timedelta(days=1)]
+    assert session.committed
@@ -0,0 +1,92 @@
+import time
+import uuid
+
+import pytest
+
+from booking_api.services import waiting_room
+from booking_api.services.waiting_room import WaitingRoomService
+from booking_api.utils.exceptions import BadRequestException, ForbiddenException
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def now(monkeypatch):
+    # sub-second part longer than tostring() keeps in Lua
+    now = int(time.time()) + 0.123456789
+    monkeypatch.setattr(waiting_room.time, "time", lambda: now)
+    return now
+
+
+async def test_admitted_on_join_books_once(redis, now):
+    event_id, user_id = uuid.uuid4(), str(uuid.uuid4())
+    await WaitingRoomService.open(redis, event_id, rate=100)
+
+    status = await WaitingRoomService.join(redis, event_id, user_id)
+    assert status.position == 0
+    assert status.admission_token
+
+    async with WaitingRoomService.admit(
+            redis, event_id, user_id, status.admission_token
+    ):
+        pass
+
+    with pytest.raises(ForbiddenException):
+        await WaitingRoomService.check_admission(
+            redis, event_id, user_id, status.admission_token
+        )
+
+
+async def test_failed_booking_returns_slot(redis, now):
+    event_id, user_id = uuid.uuid4(), str(uuid.uuid4())
+    await WaitingRoomService.open(redis, event_id, rate=100)
+    status = await WaitingRoomService.join(redis, event_id, user_id)
+
+    with pytest.raises(RuntimeError):
+        async with WaitingRoomService.admit(
+                redis, event_id, user_id, status.admission_token
+        ):
+            raise RuntimeError("the seat is taken")
+
+    assert await WaitingRoomService.check_admission(
+        redis, event_id, user_id, status.admission_token
+    ) is not None
+
+
+async def test_queued_guest_gets_token_on_poll(redis, now, monkeypatch):
+    event_id = uuid.uuid4()
+    first, second = str(uuid.uuid4()), str(uuid.uuid4())
+    await WaitingRoomService.open(redis, event_id, rate=3)
+    await WaitingRoomService.join(redis, event_id, first)
+
+    status = await WaitingRoomService.join(redis, event_id, second)
+    assert status.position == 1
+    assert status.admission_token is None
+
+    monkeypatch.setattr(waiting_room.time, "time", lambda: now + 1)
+    status = await WaitingRoomService.poll(redis, event_id, second)
+    assert await WaitingRoomService.check_admission(
+        redis, event_id, second, status.admission_token
+    ) is not None
+
+
+async def test_token_of_another_guest_is_rejected(redis, now):
+    event_id = uuid.uuid4()
+    await WaitingRoomService.open(redis, event_id, rate=100)
+    status = await WaitingRoomService.join(redis, event_id, str(uuid.uuid4()))
+
+    with pytest.raises(ForbiddenException):
+        await WaitingRoomService.check_admission(
+            redis, event_id, str(uuid.uuid4()), status.admission_token
+        )
+
+
+async def test_closed_room_admits_everyone(redis):
+    assert await WaitingRoomService.check_admission(
+        redis, uuid.uuid4(), str(uuid.uuid4()), None
+    ) is None
+
+
+async def test_rate_should_be_positive(redis):
+    with pytest.raises(BadRequestException):
+        await WaitingRoomService.open(redis, uuid.uuid4(), rate=0)